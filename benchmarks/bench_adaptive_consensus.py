@@ -0,0 +1,73 @@
+# benchmarks/bench_adaptive_consensus.py
+"""AdaptiveConsensus over BENCH_UPDATES condition updates, predicting after each one.
+
+Compares the online SlidingWindowTrend (O(1) per update), a LinearRegression refit
+over the same bounded window, and the original refit over the unbounded history.
+The refit paths are far too slow to run a million times. The windowed refit is
+timed over BENCH_REFIT_SAMPLE updates and extrapolated. The unbounded refit costs
+grow with the history, so one fit is timed at a few history sizes and the total
+is integrated from them.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.blockchain.superBlockchain.ai_consensus import WINDOW_SIZE, AdaptiveConsensus
+
+UPDATES = int(os.getenv('BENCH_UPDATES', 1000000))
+REFIT_SAMPLE = int(os.getenv('BENCH_REFIT_SAMPLE', 2000))
+
+
+def refit_prediction(history):
+    """The batch path: fit a LinearRegression on (time step, condition) and predict the next step."""
+    X = np.arange(len(history)).reshape(-1, 1)
+    return LinearRegression().fit(X, history).predict([[len(history)]])[0]
+
+
+def main():
+    rng = np.random.default_rng(7)
+    conditions = (0.5 + 0.2 * np.sin(np.arange(UPDATES) / 5000) + rng.normal(0, 0.05, UPDATES)).tolist()
+    print(f"{UPDATES:,} condition updates, prediction after each, window of {WINDOW_SIZE}")
+
+    consensus = AdaptiveConsensus()
+    update, trend = consensus.update_network_conditions, consensus.trend
+    start = time.perf_counter()
+    for condition in conditions:
+        update(condition)
+        trend.predict()
+    online = time.perf_counter() - start
+    print(f"online trend:            {UPDATES / online:12,.0f} updates/s ({online:.1f} s)")
+
+    drift = abs(trend.predict() - refit_prediction(np.array(consensus.network_conditions)))
+    print(f"online vs. batch prediction after {UPDATES:,} updates: {drift:.2e} apart")
+
+    window = list(consensus.network_conditions)
+    start = time.perf_counter()
+    for condition in conditions[:REFIT_SAMPLE]:
+        window = window[1:] + [condition]
+        refit_prediction(np.array(window))
+    per_update = (time.perf_counter() - start) / REFIT_SAMPLE
+    print(f"windowed refit:          {1 / per_update:12,.0f} updates/s (~{per_update * UPDATES / 60:,.0f} min for {UPDATES:,})")
+
+    sizes = [size for size in (1000, 10000, 100000, 1000000) if size <= UPDATES]
+    fit_times = []
+    for size in sizes:
+        history = np.array(conditions[:size])
+        start = time.perf_counter()
+        for _ in range(5):
+            refit_prediction(history)
+        fit_times.append((time.perf_counter() - start) / 5)
+    # Total cost of refitting after every update: integrate the per-fit time over history sizes 1..UPDATES
+    total = np.interp(np.arange(1, UPDATES + 1, 1000), sizes, fit_times).sum() * 1000
+    print(f"unbounded refit:         fit takes {fit_times[0] * 1000:.2f} ms at {sizes[0]:,} conditions, "
+          f"{fit_times[-1] * 1000:.1f} ms at {sizes[-1]:,} (~{total / 3600:,.1f} h for {UPDATES:,})")
+
+
+if __name__ == "__main__":
+    main()
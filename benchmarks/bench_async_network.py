@@ -0,0 +1,57 @@
+# benchmarks/bench_async_network.py
+"""Broadcast throughput of the asyncio peer layer with 50-200 in-process peers on loopback."""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from async_network import AsyncNetwork
+
+PEER_COUNTS = [int(n) for n in os.getenv('BENCH_PEER_COUNTS', '50,100,200').split(',')]
+MESSAGES = int(os.getenv('BENCH_MESSAGES', 500))
+BODY = os.urandom(512)  # Roughly a small block or a batch of transactions
+
+
+async def run(peer_count):
+    hub = AsyncNetwork(port=0)
+    peers = [AsyncNetwork(port=0) for _ in range(peer_count)]
+    expected = peer_count * MESSAGES
+    received = 0
+    done = asyncio.Event()
+
+    async def on_message(peer, message, body):
+        nonlocal received
+        received += 1
+        if received == expected:
+            done.set()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Silence per-node start-up messages
+        for node in peers:
+            node.register_handler('tx', on_message)
+            await node.start_server()
+            await hub.add_peer((node.host, node.port))
+
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        await hub.broadcast({'type': 'tx', 'seq': i}, BODY)
+    await done.wait()
+    elapsed = time.perf_counter() - start
+
+    print(f"{peer_count:>4} peers: {expected:,} deliveries in {elapsed:.3f} s "
+          f"({expected / elapsed:,.0f} messages/s, {MESSAGES / elapsed:,.0f} broadcasts/s)")
+    for node in [hub] + peers:
+        await node.close()
+
+
+def main():
+    for peer_count in PEER_COUNTS:
+        asyncio.run(run(peer_count))
+
+
+if __name__ == "__main__":
+    main()
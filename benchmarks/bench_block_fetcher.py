@@ -0,0 +1,105 @@
+# benchmarks/bench_block_fetcher.py
+"""Block range download from a local mock JSON-RPC node: one request per block vs. BlockFetcher."""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from block_fetcher import BlockFetcher
+
+BLOCKS = int(os.getenv('BENCH_BLOCKS', 10000))
+TRANSACTIONS_PER_BLOCK = int(os.getenv('BENCH_TRANSACTIONS_PER_BLOCK', 20))
+LATENCY = float(os.getenv('BENCH_RPC_LATENCY_MS', 20)) / 1000  # Simulated round trip per HTTP request
+SEQUENTIAL_SAMPLE = 200
+
+
+def block_json(number):
+    transactions = [
+        {'hash': f"0x{number:032x}{i:032x}", 'from': f"0x{i:040x}", 'to': f"0x{number:040x}",
+         'value': hex(number * i), 'gas': '0x5208', 'gasPrice': '0x3b9aca00', 'nonce': hex(i), 'input': '0x',
+         'blockNumber': hex(number), 'transactionIndex': hex(i)}
+        for i in range(TRANSACTIONS_PER_BLOCK)
+    ]
+    return json.dumps({'number': hex(number), 'hash': f"0x{number:064x}", 'transactions': transactions}).encode()
+
+
+class MockRPC(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, as real nodes do
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        batch = request if isinstance(request, list) else [request]
+        replies = [b'{"jsonrpc":"2.0","id":%d,"result":%s}' % (item['id'], self.server.block(item['params'][0]))
+                   for item in batch]
+        body = b'[' + b','.join(replies) + b']' if isinstance(request, list) else replies[0]
+        self.reply(body)
+
+    def do_GET(self):
+        self.reply(self.server.bulk)  # Raw download of the same bytes, as a link bandwidth reference
+
+    def reply(self, body):
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.bytes_sent += len(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockRPC)
+    server.daemon_threads = True
+    template = block_json(0)
+    server.block = lambda height: template.replace(b'"number": "0x0"', b'"number": "%s"' % height.encode(), 1)
+    server.bulk = b','.join(server.block(hex(h)) for h in range(BLOCKS))
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_port}"
+    size = len(server.bulk)
+    print(f"{BLOCKS} blocks, {size / BLOCKS / 1024:.1f} KiB each, {LATENCY * 1000:.0f} ms simulated latency")
+
+    start = time.perf_counter()
+    requests.get(url).content
+    link = size / (time.perf_counter() - start)
+    print(f"link reference (one bulk download): {link / 2 ** 20:8.1f} MiB/s")
+
+    session = requests.Session()
+    start = time.perf_counter()
+    for height in range(SEQUENTIAL_SAMPLE):
+        session.post(url, json={'jsonrpc': '2.0', 'id': 1, 'method': 'eth_getBlockByNumber',
+                                'params': [hex(height), True]}).json()
+    per_block = (time.perf_counter() - start) / SEQUENTIAL_SAMPLE
+    print(f"one request per block:              {size / BLOCKS / per_block / 2 ** 20:8.1f} MiB/s "
+          f"({1 / per_block:,.0f} blocks/s, {BLOCKS * per_block:.0f} s for the range)")
+
+    fetcher = BlockFetcher(url)
+    server.bytes_sent = 0
+    start = time.perf_counter()
+    count = sum(1 for _ in fetcher.fetch_blocks(0, BLOCKS - 1))
+    elapsed = time.perf_counter() - start
+    assert count == BLOCKS
+    rate = server.bytes_sent / elapsed
+    print(f"BlockFetcher:                       {rate / 2 ** 20:8.1f} MiB/s "
+          f"({BLOCKS / elapsed:,.0f} blocks/s, {elapsed:.1f} s, {rate / link:.0%} of link, "
+          f"final batch size {fetcher.batch_size})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
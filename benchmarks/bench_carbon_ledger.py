@@ -0,0 +1,110 @@
+# benchmarks/bench_carbon_ledger.py
+"""Carbon credit ingestion: pd.concat per insert vs. the chunked columnar LedgerStore.
+
+Ingests BENCH_RECORDS records (1M by default) one append at a time, as /create_credit
+does, and in append_many batches of BENCH_BATCH_SIZE. The pd.concat path is quadratic,
+so only BENCH_CONCAT_SAMPLE inserts are timed and the cost of the full run is
+extrapolated from them. Reads compare serializing the whole table, as /get_credits
+did, with one page from the end of the store, and an owner's total computed by a
+scan with the incrementally kept one.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.blockchain.superBlockchain.ledger_store import LedgerStore
+
+RECORDS = int(os.getenv('BENCH_RECORDS', 1000000))
+BATCH_SIZE = int(os.getenv('BENCH_BATCH_SIZE', 10000))
+CONCAT_SAMPLE = int(os.getenv('BENCH_CONCAT_SAMPLE', 5000))
+OWNERS = 10000
+TYPES = ['forestry', 'solar', 'wind', 'methane capture']
+
+
+def make_records(count):
+    rng = np.random.default_rng(42)
+    owners = [f"owner{i}" for i in rng.integers(0, OWNERS, count)]
+    amounts = rng.uniform(0.1, 100, count).round(2)
+    types = [TYPES[i] for i in rng.integers(0, len(TYPES), count)]
+    return owners, amounts, types
+
+
+def concat_ingest(owners, amounts, types):
+    """The previous /create_credit storage: a one-row DataFrame concatenated per insert."""
+    frame = pd.DataFrame(columns=['id', 'owner', 'amount', 'type'])
+    for owner, amount, record_type in zip(owners, amounts, types):
+        row = pd.DataFrame({'id': [len(frame) + 1], 'owner': [owner], 'amount': [amount], 'type': [record_type]})
+        frame = pd.concat([frame, row], ignore_index=True)
+    return frame
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    owners, amounts, types = make_records(RECORDS)
+    amount_list = amounts.tolist()
+    print(f"{RECORDS:,} records, {OWNERS:,} owners")
+
+    _, elapsed = timed(concat_ingest, owners[:CONCAT_SAMPLE], amount_list[:CONCAT_SAMPLE], types[:CONCAT_SAMPLE])
+    # Each insert copies the whole frame, so the total grows with the square of the record count
+    estimate = elapsed * (RECORDS / CONCAT_SAMPLE) ** 2
+    print(f"pd.concat per insert:  {CONCAT_SAMPLE / elapsed:12,.0f} records/s over the first {CONCAT_SAMPLE:,} "
+          f"(~{estimate / 3600:,.1f} h for {RECORDS:,})")
+
+    path = tempfile.mkdtemp()
+    try:
+        store = LedgerStore(os.path.join(path, 'single'))
+        append = store.append
+
+        def ingest_one_by_one():
+            for owner, amount, record_type in zip(owners, amount_list, types):
+                append(owner, amount, record_type)
+            store.flush()
+
+        _, elapsed = timed(ingest_one_by_one)
+        print(f"LedgerStore.append:    {RECORDS / elapsed:12,.0f} records/s ({elapsed:.1f} s, {len(store.chunks)} chunks)")
+
+        batched = LedgerStore(os.path.join(path, 'batched'))
+
+        def ingest_batches():
+            for start in range(0, RECORDS, BATCH_SIZE):
+                end = start + BATCH_SIZE
+                batched.append_many(owners[start:end], amounts[start:end], types[start:end])
+            batched.flush()
+
+        _, elapsed = timed(ingest_batches)
+        print(f"LedgerStore.append_many: {RECORDS / elapsed:10,.0f} records/s ({elapsed:.1f} s)")
+
+        _, elapsed = timed(LedgerStore, os.path.join(path, 'single'))
+        print(f"reopen and rebuild totals: {elapsed * 1000:8.0f} ms")
+
+        frame = pd.DataFrame({'id': np.arange(1, RECORDS + 1), 'owner': owners, 'amount': amounts, 'type': types})
+        _, elapsed = timed(frame.to_dict, 'records')
+        print(f"to_dict of the whole table:   {elapsed * 1000:8.0f} ms")
+        page, elapsed = timed(store.page, RECORDS - 1000, 1000)
+        print(f"last page of 1,000 records:   {elapsed * 1000:8.1f} ms")
+
+        owner = owners[0]
+        scanned, scan_elapsed = timed(lambda: frame.loc[frame['owner'] == owner, 'amount'].sum())
+        kept, kept_elapsed = timed(store.total, owner)
+        assert abs(scanned - kept) < 1e-6 * abs(scanned)
+        print(f"owner total by scan:          {scan_elapsed * 1000:8.1f} ms, kept incrementally: "
+              f"{kept_elapsed * 1e6:.1f} us")
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
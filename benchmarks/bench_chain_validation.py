@@ -0,0 +1,44 @@
+# benchmarks/bench_chain_validation.py
+"""Chain validation throughput: serial, incremental and full parallel re-validation by worker count."""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from blockchain import Blockchain
+from chain_validator import ChainValidator
+
+CHAIN_LENGTH = int(os.getenv('BENCH_CHAIN_LENGTH', 200000))
+
+
+def build_chain(length):
+    blockchain = Blockchain()
+    for i in range(length - 1):
+        blockchain.create_block(data=f"Transfer {i} from Alice to Bob", previous_hash=blockchain.get_last_block().hash)
+    return blockchain
+
+
+def main():
+    blockchain = build_chain(CHAIN_LENGTH)
+    print(f"Chain length: {len(blockchain.chain)} blocks, {os.cpu_count()} CPU cores")
+
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in worker_counts:
+        validator = ChainValidator(blockchain.chain, workers=workers)
+        start = time.perf_counter()
+        assert validator.validate(full=True) is None
+        elapsed = time.perf_counter() - start
+        print(f"full, {workers:>2} workers: {elapsed:.3f} s ({len(blockchain.chain) / elapsed:,.0f} blocks/s)")
+
+    for i in range(1000):
+        blockchain.create_block(data=f"New block {i}", previous_hash=blockchain.get_last_block().hash)
+    start = time.perf_counter()
+    assert validator.validate() is None
+    elapsed = time.perf_counter() - start
+    print(f"incremental, 1000 new blocks: {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
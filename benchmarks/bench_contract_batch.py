@@ -0,0 +1,91 @@
+# benchmarks/bench_contract_batch.py
+"""Applying a block's contract calls: one execute_contract at a time vs. execute_batch by worker count.
+
+The last rows apply the calls as consecutive blocks of BENCH_BLOCK_CALLS calls, once
+reusing the manager's process pool and once restarting it for every block (at least
+two workers, so the pool is used).
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from smart_contract import SmartContractManager
+
+CONTRACTS = int(os.getenv('BENCH_CONTRACTS', 16))
+CALLS = int(os.getenv('BENCH_CALLS', 50000))
+BLOCK_CALLS = int(os.getenv('BENCH_BLOCK_CALLS', 1000))
+
+# Each contract differs by a constant so they get distinct IDs and separate state.
+CONTRACT = """
+FEE = {fee}
+if args[0] == 'mint':
+    state[args[1]] = state.get(args[1], 0) + args[2]
+else:
+    sender, recipient, amount = args[1], args[2], args[3]
+    if state.get(sender, 0) < amount + FEE:
+        raise ValueError('insufficient balance')
+    state[sender] -= amount + FEE
+    state[recipient] = state.get(recipient, 0) + amount
+    total = 0
+    for value in state.values():
+        total += value
+"""
+
+
+def make_calls(contract_ids):
+    rng = random.Random(3)
+    calls = [(contract_id, ('mint', 'user0', 10 ** 9)) for contract_id in contract_ids]
+    for _ in range(CALLS):
+        calls.append((rng.choice(contract_ids), ('transfer', f"user{rng.randrange(20)}", f"user{rng.randrange(20)}",
+                                                  rng.randrange(1, 1000))))
+    return calls
+
+
+def deploy(workers):
+    manager = SmartContractManager(workers=workers)
+    contract_ids = [manager.deploy_contract(CONTRACT.format(fee=fee)) for fee in range(CONTRACTS)]
+    return manager, contract_ids
+
+
+def main():
+    print(f"{CALLS} calls across {CONTRACTS} contracts, {os.cpu_count()} CPU cores")
+
+    manager, contract_ids = deploy(1)
+    calls = make_calls(contract_ids)
+    start = time.perf_counter()
+    for contract_id, args in calls:
+        manager.contracts[contract_id].call(args)
+    elapsed = time.perf_counter() - start
+    print(f"one call at a time:    {len(calls) / elapsed:>10,.0f} calls/s")
+    expected = [manager.get_contract_state(contract_id) for contract_id in contract_ids]
+
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        manager, contract_ids = deploy(workers)
+        start = time.perf_counter()
+        errors = manager.execute_batch(calls)
+        elapsed = time.perf_counter() - start
+        assert [manager.get_contract_state(contract_id) for contract_id in contract_ids] == expected
+        print(f"batch, {workers} worker(s):   {len(calls) / elapsed:>10,.0f} calls/s "
+              f"({sum(error is not None for error in errors)} rolled back)")
+        manager.close()
+
+    workers = max(os.cpu_count() or 1, 2)
+    for label, restart in (("pool kept", False), ("pool per block", True)):
+        manager, contract_ids = deploy(workers)
+        start = time.perf_counter()
+        for first in range(0, len(calls), BLOCK_CALLS):
+            manager.execute_batch(calls[first:first + BLOCK_CALLS])
+            if restart:
+                manager.close()
+        elapsed = time.perf_counter() - start
+        assert [manager.get_contract_state(contract_id) for contract_id in contract_ids] == expected
+        print(f"{BLOCK_CALLS}-call blocks, {label + ':':15} {len(calls) / elapsed:>10,.0f} calls/s")
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/bench_fraud_scoring.py
+"""Fraud scoring over HTTP: the original per-request DataFrame + model.predict vs. /predict.
+
+A RandomForestClassifier is trained on BENCH_TRAIN_ROWS synthetic transactions with
+30 features (Time, V1..V28, Amount) and served by a local threaded werkzeug server.
+The original handler is registered on the same app as /predict_legacy for comparison.
+BENCH_CLIENTS concurrent clients each post BENCH_REQUESTS one-row requests, which
+reports p50/p99 latency and rows/s. Bulk scoring posts BENCH_BULK_ROWS rows in
+requests of BENCH_BULK_SIZE rows as JSON columns and as a .npy array.
+"""
+
+import io
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import requests
+from flask import jsonify, request
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ['FRAUD_MODEL_PATH'] = os.path.join(DATA_DIR, 'fraud_model.pkl')
+os.environ['FRAUD_STATS_PATH'] = os.path.join(DATA_DIR, 'fraud_model_stats.json')
+
+from src.blockchain.superBlockchain import fraud_detection
+
+TRAIN_ROWS = int(os.getenv('BENCH_TRAIN_ROWS', 20000))
+CLIENTS = int(os.getenv('BENCH_CLIENTS', 16))
+REQUESTS = int(os.getenv('BENCH_REQUESTS', 50))
+BULK_ROWS = int(os.getenv('BENCH_BULK_ROWS', 100000))
+BULK_SIZE = int(os.getenv('BENCH_BULK_SIZE', 5000))
+COLUMNS = ['Time'] + [f'V{i}' for i in range(1, 29)] + ['Amount']
+
+
+def transactions(rows, rng):
+    data = pd.DataFrame(rng.normal(0, 1, (rows, len(COLUMNS))), columns=COLUMNS)
+    data['Time'] = rng.uniform(0, 172800, rows)
+    data['Amount'] = rng.exponential(90, rows)
+    return data
+
+
+def npy(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def run_clients(url, bodies):
+    """Post one body per request from CLIENTS threads; return (latencies, elapsed)."""
+    latencies = []
+
+    def client(offset):
+        session = requests.Session()
+        for body in bodies[offset::CLIENTS]:
+            began = time.perf_counter()
+            session.post(url, json=body).raise_for_status()
+            latencies.append(time.perf_counter() - began)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(CLIENTS)]
+    began = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), time.perf_counter() - began
+
+
+def main():
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = np.random.default_rng(11)
+    data = transactions(TRAIN_ROWS, rng)
+    data['Class'] = ((data['V1'] + data['V2'] > 3) | (data['Amount'] > 500)).astype(int)
+    stats = fraud_detection.compute_normalization(data)
+    fraud_detection.train_model(fraud_detection.preprocess_data(data, stats), stats)
+    fraud_detection.fraud_model.load_model()
+    legacy_model = joblib.load(fraud_detection.MODEL_PATH)
+
+    app = fraud_detection.app
+
+    @app.route('/predict_legacy', methods=['POST'])
+    def predict_legacy():
+        """The original handler: a DataFrame per request and model.predict."""
+        features = pd.DataFrame(request.get_json(force=True))
+        return jsonify({'prediction': legacy_model.predict(features).tolist()})
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{len(COLUMNS)} features, {CLIENTS} concurrent clients, {CLIENTS * REQUESTS:,} one-row requests")
+
+    rows = transactions(CLIENTS * REQUESTS, rng)
+    bodies = [{column: [value] for column, value in row.items()} for row in rows.to_dict(orient='records')]
+    for label, path in (("original", '/predict_legacy'), ("micro-batched", '/predict')):
+        latencies, elapsed = run_clients(url + path, bodies)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"{label + ':':15} p50 {p50:7.1f} ms, p99 {p99:7.1f} ms, {len(bodies) / elapsed:8,.0f} rows/s")
+
+    session = requests.Session()
+    rows = transactions(BULK_ROWS, rng)
+    for label, encode in (
+            ("bulk JSON columns", lambda batch: {'json': batch.to_dict(orient='list')}),
+            ("bulk .npy", lambda batch: {'data': npy(batch.to_numpy()),
+                                         'headers': {'Content-Type': 'application/x-npy'}})):
+        batches = [encode(rows[i:i + BULK_SIZE]) for i in range(0, BULK_ROWS, BULK_SIZE)]
+        began = time.perf_counter()
+        for kwargs in batches:
+            response = session.post(url + '/predict', **kwargs)
+            assert len(response.json()['prediction']) == BULK_SIZE, response.text
+        elapsed = time.perf_counter() - began
+        print(f"{label + ':':18} {BULK_ROWS / elapsed:10,.0f} rows/s ({BULK_SIZE} per request)")
+
+    server.shutdown()
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_gossip.py
+"""Loopback simulation: propagation latency and bytes sent for inventory gossip vs. full-message flooding."""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from async_network import AsyncNetwork
+from gossip import Gossip, SeenCache
+
+NODE_COUNTS = [int(n) for n in os.getenv('BENCH_NODE_COUNTS', '10,25,50,100').split(',')]
+DEGREE = int(os.getenv('BENCH_DEGREE', 8))
+ITEMS = int(os.getenv('BENCH_ITEMS', 20))
+BODY_SIZE = int(os.getenv('BENCH_BODY_SIZE', 2048))
+
+
+class Tracker:
+    """Records which nodes hold each item and when the last one got it."""
+
+    def __init__(self, node_count):
+        self.node_count = node_count
+        self.holders = {}
+        self.done = {}
+
+    def expect(self, item_id):
+        self.done[item_id] = asyncio.get_running_loop().create_future()
+
+    def arrived(self, node_index, item_id):
+        holders = self.holders.setdefault(item_id, set())
+        holders.add(node_index)
+        if len(holders) == self.node_count and not self.done[item_id].done():
+            self.done[item_id].set_result(time.perf_counter())
+
+
+async def build_topology(count):
+    """Start `count` nodes linked in a ring plus random extra links, about DEGREE links per node."""
+    rng = random.Random(7)
+    nodes = [AsyncNetwork(port=0) for _ in range(count)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for node in nodes:
+            await node.start_server()
+        for i, node in enumerate(nodes):
+            targets = {(i + 1) % count} | set(rng.sample(range(count), min(DEGREE // 2, count - 1)))
+            for j in targets - {i}:
+                await node.add_peer((nodes[j].host, nodes[j].port))
+    await asyncio.sleep(0.1)  # Let hello messages settle
+    return nodes
+
+
+def wire_gossip(nodes, tracker):
+    gossips = []
+    for index, node in enumerate(nodes):
+        async def on_item(kind, body, peer, index=index):
+            tracker.arrived(index, int.from_bytes(body[:4], 'big'))
+        gossips.append(Gossip(node, on_item=on_item))
+
+    async def publish(origin, body):
+        await gossips[origin].publish('block', body)
+    return publish
+
+
+def wire_flood(nodes, tracker):
+    """Naive baseline: every node forwards the full body to all its peers the first time it sees it."""
+    for index, node in enumerate(nodes):
+        seen = SeenCache()
+
+        async def on_flood(peer, message, body, index=index, node=node, seen=seen):
+            if seen.add(message['id']):
+                tracker.arrived(index, message['id'])
+                await node.broadcast(message, body)
+
+        node.register_handler('flood', on_flood)
+
+    async def publish(origin, body):
+        await nodes[origin].broadcast({'type': 'flood', 'id': int.from_bytes(body[:4], 'big')}, body)
+    return publish
+
+
+async def run(count, wire):
+    """Publish ITEMS items from random nodes; return mean/max full-propagation latency and bytes sent."""
+    nodes = await build_topology(count)
+    tracker = Tracker(count)
+    publish = wire(nodes, tracker)
+    rng = random.Random(11)
+    latencies = []
+    for item_id in range(ITEMS):
+        origin = rng.randrange(count)
+        body = item_id.to_bytes(4, 'big') + os.urandom(BODY_SIZE - 4)
+        tracker.expect(item_id)
+        start = time.perf_counter()
+        tracker.arrived(origin, item_id)
+        await publish(origin, body)
+        latencies.append(await asyncio.wait_for(tracker.done[item_id], 30) - start)
+    await asyncio.sleep(0.2)  # Let trailing announcements drain before counting bytes
+    sent = sum(peer.bytes_sent for node in nodes for peer in node.peers.values())
+    for node in nodes:
+        await node.close()
+    return sum(latencies) / len(latencies), max(latencies), sent
+
+
+def main():
+    print(f"{ITEMS} items of {BODY_SIZE} bytes, ~{DEGREE} links per node")
+    for count in NODE_COUNTS:
+        for label, wire in (("gossip", wire_gossip), ("flood", wire_flood)):
+            mean_latency, max_latency, sent = asyncio.run(run(count, wire))
+            print(f"{count:>4} nodes {label:<7} mean {mean_latency * 1000:7.1f} ms  max {max_latency * 1000:7.1f} ms  "
+                  f"{sent / ITEMS / 1024:9.1f} KiB sent per item")
+
+
+if __name__ == "__main__":
+    main()
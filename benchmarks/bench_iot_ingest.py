@@ -0,0 +1,89 @@
+# benchmarks/bench_iot_ingest.py
+"""IoT ingestion over HTTP: one /send_data POST per reading vs. /send_data_bulk batches.
+
+The Flask app is served by a local threaded werkzeug server. BENCH_DEVICES devices
+each report a temperature and humidity reading. Single ingestion posts
+BENCH_SINGLE_READINGS readings one by one. Bulk ingestion posts BENCH_BULK_READINGS
+readings in batches of BENCH_BATCH_SIZE as a JSON array and as NDJSON. Bulk rates are
+given both as acknowledged (the endpoint returns once the batch is queued) and as
+written (after the background writer has drained the queue).
+"""
+
+import atexit
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DATA_DIR = tempfile.mkdtemp()
+os.environ['IOT_DATA_DIR'] = DATA_DIR
+
+from src.blockchain.superBlockchain import iot_integration
+
+DEVICES = int(os.getenv('BENCH_DEVICES', 1000))
+SINGLE_READINGS = int(os.getenv('BENCH_SINGLE_READINGS', 3000))
+BULK_READINGS = int(os.getenv('BENCH_BULK_READINGS', 200000))
+BATCH_SIZE = int(os.getenv('BENCH_BATCH_SIZE', 5000))
+
+
+def readings(count, start):
+    """Readings round-robin over the devices, one second apart per device."""
+    return [{'device_id': f"sensor-{i % DEVICES}", 'timestamp': start + i // DEVICES,
+             'sensor_data': {'temperature': 20 + i % 7, 'humidity': 40 + i % 11}} for i in range(count)]
+
+
+def main():
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, iot_integration.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    session = requests.Session()
+    for i in range(DEVICES):
+        session.post(f"{url}/register_device", json={'device_id': f"sensor-{i}", 'device_name': f"Sensor {i}"})
+    print(f"{DEVICES} devices, 2 metrics per reading")
+
+    start = time.time() - 3600
+    items = readings(SINGLE_READINGS, start)
+    began = time.perf_counter()
+    for item in items:
+        session.post(f"{url}/send_data", json=item).raise_for_status()
+    elapsed = time.perf_counter() - began
+    print(f"single /send_data:   {SINGLE_READINGS / elapsed:10,.0f} readings/s")
+
+    writer = iot_integration.ingest_queue
+    for label, content_type, encode in (
+            ("bulk JSON array", 'application/json', json.dumps),
+            ("bulk NDJSON", 'application/x-ndjson', lambda batch: '\n'.join(map(json.dumps, batch)))):
+        start += BULK_READINGS // DEVICES + 1  # Keep every series in time order
+        items = readings(BULK_READINGS, start)
+        batches = [encode(items[i:i + BATCH_SIZE]) for i in range(0, BULK_READINGS, BATCH_SIZE)]
+        written = writer.stats['written']
+        began = time.perf_counter()
+        for body in batches:
+            response = session.post(f"{url}/send_data_bulk", data=body, headers={'Content-Type': content_type})
+            assert response.status_code == 202 and response.json()['rejected'] == 0, response.text
+        acknowledged = time.perf_counter() - began
+        writer.join()
+        elapsed = time.perf_counter() - began
+        assert writer.stats['written'] - written == 2 * BULK_READINGS
+        print(f"{label + ':':20} {BULK_READINGS / acknowledged:10,.0f} readings/s acknowledged, "
+              f"{BULK_READINGS / elapsed:,.0f} readings/s written ({BATCH_SIZE} per request)")
+
+    server.shutdown()
+    for close in (writer.close, iot_integration.device_data.close):
+        atexit.unregister(close)
+        close()
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
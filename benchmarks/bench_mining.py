@@ -0,0 +1,47 @@
+# benchmarks/bench_mining.py
+"""Proof-of-work hash rate: the original per-nonce f-string loop vs. the midstate miner, single and multi-process."""
+
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from miner import Miner, difficulty_to_target
+
+DIFFICULTIES = [int(d) for d in os.getenv('BENCH_DIFFICULTIES', '4,5,6').split(',')]
+BLOCK = (2, 'a3f1' * 16, 1700000000, "Alice pays Bob 50 PI; Charlie pays Dave 100 PI")
+
+
+def naive_mine(index, previous_hash, timestamp, data, difficulty):
+    """The original Consensus.mine_block loop: rebuild the string and compare hex prefixes."""
+    nonce = 0
+    while True:
+        block_hash = hashlib.sha256(f"{index}{previous_hash}{timestamp}{data}{nonce}".encode()).hexdigest()
+        if block_hash[:difficulty] == '0' * difficulty:
+            return nonce, block_hash
+        nonce += 1
+
+
+def report(label, difficulty, nonce, elapsed):
+    # Nonces are scanned in order (interleaved across workers), so the winning nonce approximates hashes tried.
+    print(f"difficulty {difficulty} {label:<22} {elapsed:8.3f} s {nonce / elapsed:>14,.0f} hashes/s")
+
+
+def main():
+    workers = os.cpu_count() or 1
+    for difficulty in DIFFICULTIES:
+        start = time.perf_counter()
+        nonce, _ = naive_mine(*BLOCK, difficulty)
+        report("naive", difficulty, nonce, time.perf_counter() - start)
+
+        for label, miner in (("midstate, 1 process", Miner(workers=1)),
+                             (f"midstate, {workers} processes", Miner(workers=workers))):
+            start = time.perf_counter()
+            nonce, _ = miner.mine(*BLOCK, difficulty_to_target(difficulty))
+            report(label, difficulty, nonce, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
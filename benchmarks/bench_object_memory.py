@@ -0,0 +1,73 @@
+# benchmarks/bench_object_memory.py
+"""Bytes per resident Transaction/Block: the original __dict__ classes vs. the __slots__ ones and their binary records."""
+
+import gc
+import hashlib
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from blockchain import Block
+from transaction import Transaction
+from utils import calculate_block_hash
+
+COUNT = int(os.getenv('BENCH_OBJECT_COUNT', 200000))
+
+
+class DictTransaction:
+    """The original Transaction layout: a per-instance __dict__ and a float amount."""
+
+    def __init__(self, sender, recipient, amount):
+        self.sender = sender
+        self.recipient = recipient
+        self.amount = amount
+        self.timestamp = int(time.time())
+        self.transaction_id = hashlib.sha256(
+            f"{self.sender}{self.recipient}{self.amount}{self.timestamp}".encode()).hexdigest()
+
+
+class DictBlock:
+    """The original Block layout: a per-instance __dict__."""
+
+    def __init__(self, index, previous_hash, timestamp, data, hash):
+        self.index = index
+        self.previous_hash = previous_hash
+        self.timestamp = timestamp
+        self.data = data
+        self.hash = hash
+
+
+def bytes_per_object(factory):
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(i) for i in range(COUNT)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / COUNT
+
+
+def main():
+    # Addresses are shared strings, as they would be for a set of active accounts.
+    senders = [f"sender{i}" for i in range(1000)]
+    recipients = [f"recipient{i}" for i in range(1000)]
+    block_hash = calculate_block_hash(1, '0', 0, "data")
+
+    rows = [
+        ("Transaction (dict)", lambda i: DictTransaction(senders[i % 1000], recipients[i % 1000], i * 0.5)),
+        ("Transaction (slots)", lambda i: Transaction(senders[i % 1000], recipients[i % 1000], i * 50000000)),
+        ("Transaction (bytes)", lambda i: Transaction(senders[i % 1000], recipients[i % 1000], i * 50000000).to_bytes()),
+        ("Block (dict)", lambda i: DictBlock(i, block_hash, 1700000000 + i, "data", block_hash)),
+        ("Block (slots)", lambda i: Block(i, block_hash, 1700000000 + i, "data", block_hash)),
+        ("Block (bytes)", lambda i: Block(i, block_hash, 1700000000 + i, "data", block_hash).to_bytes()),
+    ]
+    print(f"{COUNT:,} objects each")
+    for label, factory in rows:
+        print(f"  {label:<22} {bytes_per_object(factory):8.1f} bytes/object")
+
+
+if __name__ == "__main__":
+    main()
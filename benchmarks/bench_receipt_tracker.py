@@ -0,0 +1,121 @@
+# benchmarks/bench_receipt_tracker.py
+"""Waiting for many transaction receipts: a wait_for_transaction_receipt loop per caller vs. one shared ReceiptTracker.
+
+A local stand-in node mines every BENCH_BLOCK_TIME_MS and spreads the pending
+transactions over BENCH_BLOCKS blocks. Per-caller waits poll the node every
+BENCH_POLL_MS from their own thread, as the Flask endpoints did; the tracker polls
+once per interval for everyone.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from transaction_sender import ReceiptTracker
+from web3_provider import get_web3
+
+WAITERS = int(os.getenv('BENCH_WAITERS', 200))
+BLOCKS = int(os.getenv('BENCH_BLOCKS', 5))
+BLOCK_TIME = float(os.getenv('BENCH_BLOCK_TIME_MS', 1000)) / 1000
+POLL = float(os.getenv('BENCH_POLL_MS', 100)) / 1000
+
+
+class StandInNode(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def rpc(self, method, params):
+        node = self.server
+        if method == 'eth_blockNumber':
+            return hex(len(node.blocks) - 1)
+        if method == 'eth_getBlockByNumber':
+            number = int(params[0], 16)
+            return {'number': hex(number), 'hash': '0x%064x' % number, 'transactions': node.blocks[number]}
+        if method == 'eth_getTransactionReceipt':
+            return node.receipts.get(params[0])
+        raise ValueError(f"Unsupported method {method}")
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.calls += 1
+            reply = {'jsonrpc': '2.0', 'id': request['id'], 'result': self.rpc(request['method'], request['params'])}
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_node():
+    node = ThreadingHTTPServer(('127.0.0.1', 0), StandInNode)
+    node.daemon_threads = True
+    node.lock = threading.Lock()
+    node.blocks, node.receipts, node.pending, node.calls = [[]], {}, [], 0
+
+    def mine():
+        while True:
+            time.sleep(BLOCK_TIME)
+            with node.lock:
+                number = len(node.blocks)
+                block, node.pending = node.pending[:WAITERS // BLOCKS], node.pending[WAITERS // BLOCKS:]
+                for index, txn_hash in enumerate(block):
+                    node.receipts[txn_hash] = {
+                        'transactionHash': txn_hash, 'transactionIndex': hex(index), 'blockNumber': hex(number),
+                        'blockHash': '0x%064x' % number, 'from': '0x' + '42' * 20, 'to': '0x' + '12' * 20,
+                        'gasUsed': '0x5208', 'cumulativeGasUsed': '0x5208', 'effectiveGasPrice': '0x1',
+                        'contractAddress': None, 'logs': [], 'logsBloom': '0x' + '00' * 256, 'status': '0x1',
+                    }
+                node.blocks.append(block)
+
+    threading.Thread(target=node.serve_forever, daemon=True).start()
+    threading.Thread(target=mine, daemon=True).start()
+    return node
+
+
+def run(node, wait_all):
+    start_number = len(node.blocks)
+    hashes = ['0x%064x' % (start_number * 10 ** 6 + i) for i in range(WAITERS)]
+    with node.lock:
+        node.pending.extend(hashes)
+        node.calls = 0
+    start = time.perf_counter()
+    wait_all(hashes)
+    return time.perf_counter() - start
+
+
+def main():
+    node = start_node()
+    web3 = get_web3(f"http://127.0.0.1:{node.server_port}")
+    print(f"{WAITERS} waiters, mined over {BLOCKS} blocks of {BLOCK_TIME * 1000:.0f} ms, {POLL * 1000:.0f} ms polls")
+
+    def per_caller(hashes):
+        threads = [threading.Thread(target=web3.eth.wait_for_transaction_receipt, args=(txn_hash, 120, POLL))
+                   for txn_hash in hashes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def shared(hashes):
+        tracker = ReceiptTracker(web3, poll_interval=POLL)
+        for future in [tracker.track(txn_hash) for txn_hash in hashes]:
+            future.result()
+
+    for name, wait_all in (("wait per caller", per_caller), ("shared tracker", shared)):
+        elapsed = run(node, wait_all)
+        print(f"{name:16} {elapsed:5.1f} s  {node.calls:6} RPC requests  "
+              f"{WAITERS if wait_all is per_caller else 1:4} polling threads")
+    node.shutdown()
+
+
+if __name__ == "__main__":
+    main()
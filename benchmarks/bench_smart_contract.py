@@ -0,0 +1,60 @@
+# benchmarks/bench_smart_contract.py
+"""Calls per second for a hot contract: re-exec of the source each call vs. the cached, sandboxed code object."""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from smart_contract import SmartContractManager
+
+CALLS = int(os.getenv('BENCH_CALLS', 100000))
+
+# A token-like contract with a few functions and a short loop per call.
+CONTRACT = """
+def balance(owner):
+    return state.get(owner, 0)
+
+def transfer(sender, recipient, amount):
+    if balance(sender) < amount:
+        raise ValueError('insufficient balance')
+    state[sender] = balance(sender) - amount
+    state[recipient] = balance(recipient) + amount
+
+if args[0] == 'mint':
+    state[args[1]] = balance(args[1]) + args[2]
+elif args[0] == 'transfer':
+    for _ in range(args[3]):
+        transfer(args[1], args[2], 1)
+"""
+
+
+def legacy_execute(code, state, *args):
+    """The previous SmartContract.execute: parse and compile the source on every call."""
+    namespace = {'state': state, 'args': args}
+    exec(code, namespace)
+    return state
+
+
+def measure(label, call):
+    call('mint', 'alice', 10 ** 12)
+    start = time.perf_counter()
+    for i in range(CALLS):
+        call('transfer', 'alice', f"user{i % 100}", 3)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {CALLS / elapsed:>10,.0f} calls/s")
+
+
+def main():
+    print(f"{CALLS} calls of a {len(CONTRACT)} byte contract")
+    state = {}
+    measure("exec source every call", lambda *args: legacy_execute(CONTRACT, state, *args))
+
+    manager = SmartContractManager()
+    contract_id = manager.deploy_contract(CONTRACT)
+    measure("cached code, step limits", lambda *args: manager.execute_contract(contract_id, *args))
+
+
+if __name__ == "__main__":
+    main()
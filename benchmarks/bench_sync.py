@@ -0,0 +1,77 @@
+# benchmarks/bench_sync.py
+"""Loopback headers-first sync of a long chain from several local peers, timed per phase."""
+
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from async_network import AsyncNetwork
+from blockchain import Blockchain
+from sync import BlockSync
+from transaction import Transaction
+
+CHAIN_LENGTH = int(os.getenv('BENCH_CHAIN_LENGTH', 100000))
+PEERS = int(os.getenv('BENCH_PEERS', 4))
+TRANSACTIONS_PER_BLOCK = int(os.getenv('BENCH_TRANSACTIONS_PER_BLOCK', 2))
+
+
+def build_chain(length):
+    blockchain = Blockchain()
+    for i in range(length - 1):
+        transactions = [Transaction(sender=f"sender{i}", recipient=f"recipient{j}", amount=j + 1)
+                        for j in range(TRANSACTIONS_PER_BLOCK)]
+        blockchain.create_block(f"Block {i}", blockchain.get_last_block().hash, transactions)
+    return blockchain
+
+
+class TimedBlockSync(BlockSync):
+    """Records when the header phase ends, to split the sync time into its two phases."""
+
+    async def download_headers(self, *args):
+        headers = await super().download_headers(*args)
+        self.headers_done = time.perf_counter()
+        return headers
+
+
+async def run(source, peer_count):
+    serving_nodes = [AsyncNetwork(port=0) for _ in range(peer_count)]
+    new_node = AsyncNetwork(port=0)
+    new_chain = Blockchain()
+    block_sync = TimedBlockSync(new_node, new_chain)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for node in serving_nodes:
+            BlockSync(node, source)
+            await node.start_server()
+            await new_node.add_peer((node.host, node.port))
+
+    start = time.perf_counter()
+    added = await block_sync.sync()
+    elapsed = time.perf_counter() - start
+    assert added == len(source.chain) - 1
+    assert new_chain.get_last_block().hash == source.get_last_block().hash
+
+    await new_node.close()
+    for node in serving_nodes:
+        await node.close()
+    return block_sync.headers_done - start, elapsed
+
+
+def main():
+    start = time.perf_counter()
+    source = build_chain(CHAIN_LENGTH)
+    print(f"Built {len(source.chain)} blocks with {TRANSACTIONS_PER_BLOCK} transactions each "
+          f"in {time.perf_counter() - start:.1f} s, {os.cpu_count()} CPU cores")
+
+    for peer_count in sorted({1, PEERS}):
+        headers_time, elapsed = asyncio.run(run(source, peer_count))
+        print(f"{peer_count} peer(s): headers {headers_time:.2f} s, bodies {elapsed - headers_time:.2f} s, "
+              f"total {elapsed:.2f} s ({(len(source.chain) - 1) / elapsed:,.0f} blocks/s)")
+
+
+if __name__ == "__main__":
+    main()
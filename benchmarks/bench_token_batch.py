@@ -0,0 +1,143 @@
+# benchmarks/bench_token_batch.py
+"""Payroll-style token jobs against a local stand-in node: per-item calls vs. the bulk TokenManagement APIs.
+
+The stand-in mines every BENCH_BLOCK_TIME_MS and answers each HTTP request (single
+call or JSON-RPC batch) after BENCH_RPC_LATENCY_MS. It trusts the benchmark's single
+account instead of recovering signatures (a real node pays for that on its own CPU).
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import rlp
+from eth_account import Account
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+import transaction_sender
+from token_management import TokenManagement
+
+ITEMS = int(os.getenv('BENCH_ITEMS', 2000))
+SEQUENTIAL_SAMPLE = 200  # The get_balance loop is timed on a sample and scaled up
+BLOCK_TIME = float(os.getenv('BENCH_BLOCK_TIME_MS', 1000)) / 1000
+LATENCY = float(os.getenv('BENCH_RPC_LATENCY_MS', 20)) / 1000
+
+TOKEN_ABI = json.loads('[{"constant":true,"inputs":[{"name":"","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"payable":false,"stateMutability":"view","type":"function"},{"constant":false,"inputs":[{"name":"to","type":"address"},{"name":"amount","type":"uint256"}],"name":"transfer","outputs":[],"payable":false,"stateMutability":"nonpayable","type":"function"}]')
+TOKEN_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+ACCOUNT = Account.from_key('0x' + '42' * 32)
+
+
+class StandInNode(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def rpc(self, method, params):
+        node = self.server
+        if method == 'eth_chainId':
+            return '0x539'
+        if method == 'eth_blockNumber':
+            return hex(len(node.blocks) - 1)
+        if method == 'eth_getTransactionCount':
+            return hex(node.nonce + (len(node.pool) if params[1] == 'pending' else 0))
+        if method == 'eth_sendRawTransaction':
+            raw = bytes.fromhex(params[0][2:])
+            nonce = int.from_bytes(rlp.decode(raw)[0], 'big')
+            if nonce < node.nonce or nonce in node.pool:
+                raise ValueError('nonce too low')
+            txn_hash = Web3.to_hex(Web3.keccak(raw))
+            node.pool[nonce] = txn_hash
+            return txn_hash
+        if method == 'eth_getBlockByNumber':
+            number = int(params[0], 16)
+            return {'number': hex(number), 'hash': '0x%064x' % number, 'transactions': node.blocks[number]}
+        if method == 'eth_getTransactionReceipt':
+            return node.receipts.get(params[0])
+        if method == 'eth_call':
+            return '0x%064x' % int(params[0]['data'][-8:], 16)
+        raise ValueError(f"Unsupported method {method}")
+
+    def answer(self, request):
+        with self.server.lock:
+            try:
+                reply = {'result': self.rpc(request['method'], request['params'])}
+            except ValueError as e:
+                reply = {'error': {'code': -32000, 'message': str(e)}}
+        return dict(reply, jsonrpc='2.0', id=request['id'])
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(LATENCY)
+        reply = [self.answer(item) for item in request] if isinstance(request, list) else self.answer(request)
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_node():
+    node = ThreadingHTTPServer(('127.0.0.1', 0), StandInNode)
+    node.daemon_threads = True
+    node.lock = threading.Lock()
+    node.nonce, node.pool, node.blocks, node.receipts = 0, {}, [[]], {}
+
+    def mine():
+        while True:
+            time.sleep(BLOCK_TIME)
+            with node.lock:
+                number, block = len(node.blocks), []
+                while node.nonce in node.pool:
+                    txn_hash = node.pool.pop(node.nonce)
+                    node.receipts[txn_hash] = {
+                        'transactionHash': txn_hash, 'transactionIndex': hex(len(block)), 'blockNumber': hex(number),
+                        'blockHash': '0x%064x' % number, 'from': ACCOUNT.address.lower(), 'to': TOKEN_ADDRESS.lower(),
+                        'gasUsed': '0x5208', 'cumulativeGasUsed': '0x5208', 'effectiveGasPrice': '0x1',
+                        'contractAddress': None, 'logs': [], 'logsBloom': '0x' + '00' * 256, 'status': '0x1',
+                    }
+                    block.append(txn_hash)
+                    node.nonce += 1
+                node.blocks.append(block)
+
+    threading.Thread(target=node.serve_forever, daemon=True).start()
+    threading.Thread(target=mine, daemon=True).start()
+    return node
+
+
+def main():
+    transaction_sender.RECEIPT_POLL_INTERVAL = BLOCK_TIME / 4
+    node = start_node()
+    token = TokenManagement(f"http://127.0.0.1:{node.server_port}", TOKEN_ADDRESS, TOKEN_ABI)
+    addresses = [Web3.to_checksum_address('0x%040x' % i) for i in range(1, ITEMS + 1)]
+    print(f"{ITEMS} addresses, {BLOCK_TIME * 1000:.0f} ms blocks, {LATENCY * 1000:.0f} ms per HTTP request")
+
+    start = time.perf_counter()
+    balances = [token.get_balance(address) for address in addresses[:SEQUENTIAL_SAMPLE]]
+    elapsed = (time.perf_counter() - start) * ITEMS / SEQUENTIAL_SAMPLE
+    print(f"balances, get_balance loop:      {elapsed:6.2f} s (timed on {SEQUENTIAL_SAMPLE})")
+    start = time.perf_counter()
+    assert [balance for balance, _ in token.get_balances(addresses)][:SEQUENTIAL_SAMPLE] == balances
+    print(f"balances, get_balances:          {time.perf_counter() - start:6.2f} s")
+
+    start = time.perf_counter()
+    futures = [token.submit_transfer(ACCOUNT.address, ACCOUNT.key, address, 1) for address in addresses]
+    assert all(future.result()['status'] == 1 for future in futures)
+    elapsed = time.perf_counter() - start
+    print(f"transfers, submit_transfer loop: {elapsed:6.2f} s ({ITEMS / elapsed * 60:7,.0f} transfers/min)")
+    start = time.perf_counter()
+    results = token.transfer_many(ACCOUNT.address, ACCOUNT.key, [(address, 1) for address in addresses])
+    assert all(error is None for _, error in results)
+    elapsed = time.perf_counter() - start
+    print(f"transfers, transfer_many:        {elapsed:6.2f} s ({ITEMS / elapsed * 60:7,.0f} transfers/min)")
+    node.shutdown()
+
+
+if __name__ == "__main__":
+    main()
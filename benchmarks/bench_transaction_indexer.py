@@ -0,0 +1,66 @@
+# benchmarks/bench_transaction_indexer.py
+"""Address history lookups: SQLite index vs. scanning every block, and ingest throughput."""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from transaction_indexer import TransactionIndexer
+
+BLOCKS = int(os.getenv('BENCH_BLOCKS', 100000))
+TRANSACTIONS_PER_BLOCK = int(os.getenv('BENCH_TRANSACTIONS_PER_BLOCK', 10))
+ADDRESSES = int(os.getenv('BENCH_ADDRESSES', 50000))
+LOOKUPS = 200
+
+
+def synthetic_blocks(rng):
+    for number in range(BLOCKS):
+        yield {
+            'number': number,
+            'transactions': [
+                {
+                    'hash': rng.randbytes(32),
+                    'from': f"0x{rng.randrange(ADDRESSES):040x}",
+                    'to': f"0x{rng.randrange(ADDRESSES):040x}",
+                    'value': rng.randrange(10 ** 18),
+                    'blockNumber': number,
+                    'transactionIndex': position,
+                }
+                for position in range(TRANSACTIONS_PER_BLOCK)
+            ],
+        }
+
+
+def main():
+    rng = random.Random(5)
+    blocks = list(synthetic_blocks(rng))
+    with tempfile.TemporaryDirectory() as directory:
+        indexer = TransactionIndexer(web3=None, path=os.path.join(directory, 'index.sqlite3'))
+        start = time.perf_counter()
+        for batch_start in range(0, BLOCKS, indexer.batch_size):
+            indexer.index_blocks(blocks[batch_start:batch_start + indexer.batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {BLOCKS} blocks ({BLOCKS * TRANSACTIONS_PER_BLOCK} transactions) in {elapsed:.1f} s "
+              f"({BLOCKS * TRANSACTIONS_PER_BLOCK / elapsed:,.0f} tx/s)")
+
+        addresses = [f"0x{rng.randrange(ADDRESSES):040x}" for _ in range(LOOKUPS)]
+        start = time.perf_counter()
+        found = sum(len(indexer.get_transaction_history(address)) for address in addresses)
+        elapsed = time.perf_counter() - start
+        print(f"Index lookup:      {elapsed / LOOKUPS * 1000:8.3f} ms per address ({found / LOOKUPS:.1f} tx each)")
+
+        # What the explorer did before, minus the RPC round trip per block
+        start = time.perf_counter()
+        for address in addresses[:5]:
+            [txn for block in blocks for txn in block['transactions'] if address in (txn['from'], txn['to'])]
+        elapsed = time.perf_counter() - start
+        print(f"Scan every block:  {elapsed / 5 * 1000:8.3f} ms per address, before any RPC latency")
+        indexer.close()
+
+
+if __name__ == "__main__":
+    main()
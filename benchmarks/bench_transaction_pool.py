@@ -0,0 +1,59 @@
+# benchmarks/bench_transaction_pool.py
+"""Mempool operations at 100k-1M pending transactions: insert, select top-N and remove-included."""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from transaction import Transaction, TransactionPool
+
+POOL_SIZES = [int(n) for n in os.getenv('BENCH_POOL_SIZES', '100000,1000000').split(',')]
+BLOCK_SIZE = 2000
+
+
+def make_transactions(count):
+    rng = random.Random(42)
+    return [
+        Transaction(sender=f"sender{i % 5000}", recipient=f"recipient{i % 7919}", amount=1000000 + i,
+                    fee=rng.randint(100000, 100000000))
+        for i in range(count)
+    ]
+
+
+def add_quietly(pool, transactions):
+    with contextlib.redirect_stdout(io.StringIO()):  # Silence the pool's per-rejection message
+        return [pool.add_transaction(tx) for tx in transactions]
+
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:8.3f} s {count / elapsed:>14,.0f} ops/s")
+    return result
+
+
+def main():
+    for size in POOL_SIZES:
+        transactions = make_transactions(size)
+        print(f"{size:,} pending transactions")
+        pool = TransactionPool(max_count=size)
+        timed("insert", size, lambda: [pool.add_transaction(tx) for tx in transactions])
+        timed("reject duplicates", size, lambda: add_quietly(pool, transactions))
+        selected = timed(f"select top {BLOCK_SIZE}", BLOCK_SIZE, lambda: pool.select_transactions(BLOCK_SIZE))
+        timed(f"remove {BLOCK_SIZE} included", BLOCK_SIZE, lambda: pool.remove_transactions(selected))
+        timed(f"select next top {BLOCK_SIZE}", BLOCK_SIZE, lambda: pool.select_transactions(BLOCK_SIZE))
+
+        # Baseline: the old list pool had to sort everything to pick the best transactions.
+        pending = pool.get_transactions()
+        timed(f"full sort for top {BLOCK_SIZE}", BLOCK_SIZE,
+              lambda: sorted(pending, key=lambda tx: tx.fee, reverse=True)[:BLOCK_SIZE])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# benchmarks/bench_transaction_sender.py
+"""Token payouts against a local stand-in node: send-and-wait per transfer vs. pipelined submission.
+
+The stand-in mines every BENCH_BLOCK_TIME_MS and answers each RPC call after
+BENCH_RPC_LATENCY_MS. It trusts the benchmark's single account instead of recovering
+signatures (a real node pays for that on its own CPU), so signing is the only
+cryptography in this process.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import rlp
+from eth_account import Account
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+import transaction_sender
+from token_management import TokenManagement
+
+TRANSFERS = int(os.getenv('BENCH_TRANSFERS', 2000))
+BLOCK_TIME = float(os.getenv('BENCH_BLOCK_TIME_MS', 1000)) / 1000
+LATENCY = float(os.getenv('BENCH_RPC_LATENCY_MS', 20)) / 1000
+SEQUENTIAL_SAMPLE = 3
+
+TOKEN_ABI = json.loads('[{"constant":false,"inputs":[{"name":"to","type":"address"},{"name":"amount","type":"uint256"}],"name":"transfer","outputs":[],"payable":false,"stateMutability":"nonpayable","type":"function"}]')
+TOKEN_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+ACCOUNT = Account.from_key('0x' + '42' * 32)
+
+
+class StandInNode(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def rpc(self, method, params):
+        node = self.server
+        if method == 'eth_chainId':
+            return '0x539'
+        if method == 'eth_blockNumber':
+            return hex(len(node.blocks) - 1)
+        if method == 'eth_getTransactionCount':
+            return hex(node.nonce + (len(node.pool) if params[1] == 'pending' else 0))
+        if method == 'eth_sendRawTransaction':
+            raw = bytes.fromhex(params[0][2:])
+            nonce = int.from_bytes(rlp.decode(raw)[0], 'big')
+            if nonce < node.nonce or nonce in node.pool:
+                raise ValueError('nonce too low')
+            txn_hash = Web3.to_hex(Web3.keccak(raw))
+            node.pool[nonce] = txn_hash
+            return txn_hash
+        if method == 'eth_getBlockByNumber':
+            number = int(params[0], 16)
+            return {'number': hex(number), 'hash': '0x%064x' % number, 'transactions': node.blocks[number]}
+        if method == 'eth_getTransactionReceipt':
+            return node.receipts.get(params[0])
+        raise ValueError(f"Unsupported method {method}")
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(LATENCY)
+        with self.server.lock:
+            try:
+                reply = {'result': self.rpc(request['method'], request['params'])}
+            except ValueError as e:
+                reply = {'error': {'code': -32000, 'message': str(e)}}
+        body = json.dumps(dict(reply, jsonrpc='2.0', id=request['id'])).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_node():
+    node = ThreadingHTTPServer(('127.0.0.1', 0), StandInNode)
+    node.daemon_threads = True
+    node.lock = threading.Lock()
+    node.nonce, node.pool, node.blocks, node.receipts = 0, {}, [[]], {}
+
+    def mine():
+        while True:
+            time.sleep(BLOCK_TIME)
+            with node.lock:
+                number, block = len(node.blocks), []
+                while node.nonce in node.pool:
+                    txn_hash = node.pool.pop(node.nonce)
+                    node.receipts[txn_hash] = {
+                        'transactionHash': txn_hash, 'transactionIndex': hex(len(block)), 'blockNumber': hex(number),
+                        'blockHash': '0x%064x' % number, 'from': ACCOUNT.address.lower(), 'to': TOKEN_ADDRESS.lower(),
+                        'gasUsed': '0x5208', 'cumulativeGasUsed': '0x5208', 'effectiveGasPrice': '0x1',
+                        'contractAddress': None, 'logs': [], 'logsBloom': '0x' + '00' * 256, 'status': '0x1',
+                    }
+                    block.append(txn_hash)
+                    node.nonce += 1
+                node.blocks.append(block)
+
+    threading.Thread(target=node.serve_forever, daemon=True).start()
+    threading.Thread(target=mine, daemon=True).start()
+    return node
+
+
+def send_and_wait(token, recipient, amount):
+    """The previous TokenManagement flow: ask for the nonce, send, block on the receipt."""
+    web3 = token.web3
+    transaction = token.contract.functions.transfer(recipient, amount).build_transaction({
+        'from': ACCOUNT.address, 'gas': 2000000, 'gasPrice': web3.to_wei('50', 'gwei'),
+        'nonce': web3.eth.get_transaction_count(ACCOUNT.address),
+    })
+    signed_txn = web3.eth.account.sign_transaction(transaction, ACCOUNT.key)
+    txn_hash = web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+    return web3.eth.wait_for_transaction_receipt(txn_hash, poll_latency=0.05)
+
+
+def main():
+    transaction_sender.RECEIPT_POLL_INTERVAL = BLOCK_TIME / 4
+    node = start_node()
+    token = TokenManagement(f"http://127.0.0.1:{node.server_port}", TOKEN_ADDRESS, TOKEN_ABI)
+    recipient = Web3.to_checksum_address('0x' + '34' * 20)
+    print(f"{TRANSFERS} transfers, {BLOCK_TIME * 1000:.0f} ms blocks, {LATENCY * 1000:.0f} ms per RPC call")
+
+    start = time.perf_counter()
+    for amount in range(SEQUENTIAL_SAMPLE):
+        send_and_wait(token, recipient, amount)
+    per_transfer = (time.perf_counter() - start) / SEQUENTIAL_SAMPLE
+    print(f"send and wait:       {60 / per_transfer:9,.0f} transfers/min")
+
+    start = time.perf_counter()
+    futures = [token.submit_transfer(ACCOUNT.address, ACCOUNT.key, recipient, amount) for amount in range(TRANSFERS)]
+    submitted = time.perf_counter() - start
+    blocks = {future.result()['blockNumber'] for future in futures}
+    elapsed = time.perf_counter() - start
+    print(f"pipelined submit:    {TRANSFERS / elapsed * 60:9,.0f} transfers/min "
+          f"({elapsed:.1f} s, submit calls returned in {submitted * 1000:.0f} ms, {len(blocks)} blocks)")
+    node.shutdown()
+
+
+if __name__ == "__main__":
+    main()
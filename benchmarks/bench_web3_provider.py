@@ -0,0 +1,113 @@
+# benchmarks/bench_web3_provider.py
+"""Per-request service objects against a local mock node: a Web3 provider per object vs. the shared registry.
+
+Each simulated request runs in its own thread (as a threaded web server does), builds a
+TransactionManager-style object, checks the connection and makes one RPC call. With a
+provider per object, every request pays a health-check round trip, and web3 keeps its
+sessions per thread, so new request threads may open new connections. With web3_provider,
+requests reuse the pooled keep-alive connections and the health check is answered from cache.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+from web3_provider import get_web3, is_connected
+
+REQUESTS = int(os.getenv('BENCH_REQUESTS', 2000))
+CONCURRENCY = int(os.getenv('BENCH_CONCURRENCY', 16))
+LATENCY = float(os.getenv('BENCH_RPC_LATENCY_MS', 10)) / 1000  # Simulated round trip per RPC call
+HANDSHAKE = float(os.getenv('BENCH_HANDSHAKE_MS', 30)) / 1000  # Simulated TCP + TLS setup per new connection
+
+
+class MockRPC(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, as real nodes do
+
+    def setup(self):
+        super().setup()
+        time.sleep(HANDSHAKE)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.calls += 1
+        time.sleep(LATENCY)
+        body = json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': '0x2a'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockRPC)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def per_object(url):
+    web3 = Web3(Web3.HTTPProvider(url))
+    if not web3.is_connected():
+        raise ConnectionError(url)
+    return web3.eth.block_number
+
+
+def shared(url):
+    web3 = get_web3(url)
+    if not is_connected(url):
+        raise ConnectionError(url)
+    return web3.eth.block_number
+
+
+def run(server, url, handle):
+    """Serve REQUESTS requests, each in a fresh thread, at most CONCURRENCY at a time."""
+    server.connections = server.calls = 0
+    slots = threading.Semaphore(CONCURRENCY)
+
+    def request():
+        try:
+            assert handle(url) == 42
+        finally:
+            slots.release()
+
+    threads = []
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        slots.acquire()
+        thread = threading.Thread(target=request)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    server = start_server()
+    url = f"http://127.0.0.1:{server.server_port}"
+    print(f"{REQUESTS} requests, {CONCURRENCY} concurrent, {LATENCY * 1000:.0f} ms per call, "
+          f"{HANDSHAKE * 1000:.0f} ms per new connection")
+    for name, handle in (("provider per object", per_object), ("shared registry", shared)):
+        elapsed = run(server, url, handle)
+        print(f"{name:20} {REQUESTS / elapsed:7,.0f} requests/s  {server.connections:5} connections  "
+              f"{server.calls:5} RPC calls  {elapsed:.2f} s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/test_bench_hashing.py
+"""Hashing throughput on realistic block and transaction payloads, per call and batched.
+
+Run with pytest-benchmark installed:
+
+    pytest benchmarks/test_bench_hashing.py --benchmark-group-by=param:payload
+
+Per-call cases hash and hex-encode one payload at a time, the way the separate
+hash helpers used to; batched cases hand the whole list to hashing.hash_many and
+keep raw digests. Both are run for every supported algorithm.
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'blockchain', 'piOpenChain'))
+
+import hashing
+from merkle import LEAF_PREFIX, merkle_root
+from transaction import Transaction
+from utils import block_hash_prefix
+
+TRANSACTIONS_PER_BLOCK = int(os.getenv('BENCH_TRANSACTIONS_PER_BLOCK', 2000))
+BLOCKS = int(os.getenv('BENCH_BLOCKS', 100))
+
+TRANSACTIONS = [Transaction(sender=f"pi1sender{i:08d}", recipient=f"pi1recipient{i % 997:08d}",
+                            amount=(i + 1) * 10 ** 6, timestamp=1700000000 + i, nonce=i // 50)
+                for i in range(TRANSACTIONS_PER_BLOCK)]
+ROOT = merkle_root(TRANSACTIONS)
+PAYLOADS = {
+    # Canonical transaction encodings, as hashed for IDs and Merkle leaves
+    'transaction': [tx.to_bytes() for tx in TRANSACTIONS],
+    # Block hash inputs: a header and a coinbase-sized data field
+    'block_header': [block_hash_prefix(i, 'a3f1' * 16, 1700000000 + 10 * i,
+                                       {'miner': 'pi1miner', 'reward': 50, 'height': i}, ROOT)
+                     for i in range(BLOCKS)],
+    # Block hash inputs whose data carries the block's transactions in full
+    'full_block': [block_hash_prefix(i, 'a3f1' * 16, 1700000000 + 10 * i,
+                                     [tx.to_bytes().hex() for tx in TRANSACTIONS[:200]], ROOT)
+                   for i in range(BLOCKS)],
+}
+
+
+@pytest.mark.parametrize('algorithm', sorted(hashing.ALGORITHMS))
+@pytest.mark.parametrize('payload', sorted(PAYLOADS))
+def test_per_call_hexdigest(benchmark, payload, algorithm):
+    items = PAYLOADS[payload]
+    hexdigest = hashing.hexdigest
+    benchmark(lambda: [hexdigest(item, algorithm) for item in items])
+
+
+@pytest.mark.parametrize('algorithm', sorted(hashing.ALGORITHMS))
+@pytest.mark.parametrize('payload', sorted(PAYLOADS))
+def test_hash_many(benchmark, payload, algorithm):
+    items = PAYLOADS[payload]
+    digests = benchmark(hashing.hash_many, items, algorithm=algorithm)
+    assert len(digests) == len(items)
+
+
+@pytest.mark.parametrize('algorithm', sorted(hashing.ALGORITHMS))
+def test_hash_many_merkle_leaves(benchmark, algorithm):
+    items = PAYLOADS['transaction']
+    benchmark(hashing.hash_many, items, prefix=LEAF_PREFIX, algorithm=algorithm)
+
+
+@pytest.mark.parametrize('algorithm', sorted(hashing.ALGORITHMS))
+def test_merkle_root(benchmark, algorithm, monkeypatch):
+    monkeypatch.setattr(hashing.Config, 'HASH_ALGORITHM', algorithm)
+    benchmark(merkle_root, TRANSACTIONS)
@@ -1,11 +1,13 @@
 # src/blockchain/defi_integration.py
 
-from web3 import Web3
 import json
 import logging
 import requests
 from typing import Dict, List, Any, Optional, Union
 
+from . import piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from web3_provider import get_web3
+
 class DeFiIntegration:
     """
     Integration with DeFi protocols for advanced blockchain functionality.
@@ -22,7 +24,7 @@ class DeFiIntegration:
             provider_url (str): URL of the Ethereum provider (e.g., Infura, Alchemy)
             chain_id (int): Chain ID (1 for Ethereum mainnet, 137 for Polygon, etc.)
         """
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+        self.web3 = get_web3(provider_url)
         self.chain_id = chain_id
         self.logger = logging.getLogger(__name__)
         
@@ -2,8 +2,9 @@
 
 import requests
 import json
-from web3 import Web3
 from .config import Config
+from .. import piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from web3_provider import get_session, get_web3
 
 class ChainlinkClient:
     def __init__(self):
@@ -12,7 +13,8 @@ class ChainlinkClient:
         self.oracle_address = Config.CHAINLINK_ORACLE_ADDRESS
         self.job_id = Config.CHAINLINK_JOB_ID
         self.private_key = Config.CHAINLINK_PRIVATE_KEY
-        self.web3 = Web3(Web3.HTTPProvider(self.node_url))
+        self.web3 = get_web3(self.node_url)
+        self.session = get_session(self.node_url)
 
     def create_request(self, data):
         """Create a request to the Chainlink oracle."""
@@ -24,7 +26,7 @@ class ChainlinkClient:
             "privateKey": self.private_key
         }
         try:
-            response = requests.post(f"{self.node_url}/v2/requests", json=request_data)
+            response = self.session.post(f"{self.node_url}/v2/requests", json=request_data)
             response.raise_for_status()  # Raise an error for bad responses
             return response.json()
         except requests.RequestException as e:
@@ -33,7 +35,7 @@ class ChainlinkClient:
     def get_request_status(self, request_id):
         """Get the status of a Chainlink request."""
         try:
-            response = requests.get(f"{self.node_url}/v2/requests/{request_id}")
+            response = self.session.get(f"{self.node_url}/v2/requests/{request_id}")
             response.raise_for_status()  # Raise an error for bad responses
             return response.json()
         except requests.RequestException as e:
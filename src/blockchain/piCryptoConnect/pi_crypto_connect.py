@@ -1,16 +1,17 @@
 # pi_crypto_connect.py
 
-from web3 import Web3
+from .. import piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from web3_provider import get_web3, is_connected
 from .exceptions import ConnectionError, TransactionError, InsufficientFundsError
 
 class PiCryptoConnect:
     def __init__(self, provider_url, private_key):
         """Initialize the PiCryptoConnect instance."""
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+        self.web3 = get_web3(provider_url)
         self.private_key = private_key
         self.account = self.web3.eth.account.from_key(private_key)
 
-        if not self.web3.isConnected():
+        if not is_connected(provider_url):
             raise ConnectionError("Failed to connect to the blockchain network.")
 
     def get_balance(self):
@@ -1,16 +1,17 @@
 # piNFTMarketplace/nft_interactor.py
 
 import json
-from web3 import Web3
 from .config import Config
+from .. import piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from web3_provider import get_web3, is_connected
 
 class NFTInteractor:
     """Class to interact with the NFT smart contract."""
 
     def __init__(self, contract_address):
         # Initialize Web3 connection
-        self.web3 = Web3(Web3.HTTPProvider(Config.INFURA_URL))
-        if not self.web3.isConnected():
+        self.web3 = get_web3(Config.INFURA_URL)
+        if not is_connected(Config.INFURA_URL):
             raise Exception("Failed to connect to the Ethereum network.")
         
         # Load the contract instance
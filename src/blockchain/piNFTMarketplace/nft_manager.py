@@ -1,8 +1,8 @@
 # piNFTMarketplace/nft_manager.py
 
-import json
-from web3 import Web3
 from .config import Config
+from .. import piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from web3_provider import get_web3, is_connected
 from .nft_interactor import NFTInteractor
 
 class NFTManager:
@@ -10,8 +10,8 @@ class NFTManager:
 
     def __init__(self):
         # Initialize Web3 connection
-        self.web3 = Web3(Web3.HTTPProvider(Config.INFURA_URL))
-        if not self.web3.isConnected():
+        self.web3 = get_web3(Config.INFURA_URL)
+        if not is_connected(Config.INFURA_URL):
             raise Exception("Failed to connect to the Ethereum network.")
         
         # Initialize the NFT interactor
@@ -1,5 +1,15 @@
 # src/blockchain/piOpenChain/__init__.py
 
+import os
+import sys
+
+# piOpenChain's modules import each other by flat name (from config import Config), as when
+# run from this directory. Importing the package makes those names resolve from anywhere, so
+# other packages share the same module objects, e.g. web3_provider's one provider registry.
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+if PACKAGE_DIR not in sys.path:
+    sys.path.append(PACKAGE_DIR)
+
 __all__ = [
     "smart_contract",
     "transaction_manager",
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import struct
+
+from config import Config
+
+# Frame: u32 total length and u16 header length (big-endian), a JSON header, then an optional binary body.
+FRAME_PREFIX = struct.Struct('>IH')
+
+
+def encode_frame(message, body=b''):
+    """Encode a message dict (and optional raw body, e.g. a serialized block) as one frame."""
+    header = json.dumps(message, separators=(',', ':')).encode()
+    return FRAME_PREFIX.pack(2 + len(header) + len(body), len(header)) + header + body
+
+
+async def read_frame(reader, max_size=None):
+    """Read exactly one frame from a stream; return (message, body)."""
+    prefix = await reader.readexactly(FRAME_PREFIX.size)
+    length, header_length = FRAME_PREFIX.unpack(prefix)
+    if length > (max_size or Config.MAX_FRAME_SIZE):
+        raise ValueError(f"Frame of {length} bytes exceeds the maximum frame size.")
+    payload = await reader.readexactly(length - 2)
+    return json.loads(payload[:header_length]), payload[header_length:]
+
+
+class AsyncPeer:
+    """A persistent connection to one peer with a bounded outbound queue.
+
+    A writer task drains the queue, coalescing whatever frames are waiting into one
+    write before awaiting the socket. When the queue is full, senders wait, which
+    pushes back on producers; a peer that stays full past the send timeout is dropped.
+    """
+
+    def __init__(self, network, reader, writer, address=None):
+        self.network = network
+        self.reader = reader
+        self.writer = writer
+        self.address = address or writer.get_extra_info('peername')
+        self.queue = asyncio.Queue(maxsize=Config.PEER_QUEUE_SIZE)
+        self.closed = False
+        self.bytes_sent = 0
+        self.tasks = [asyncio.ensure_future(self.read_loop()), asyncio.ensure_future(self.write_loop())]
+
+    async def send(self, message, body=b'', timeout=None):
+        """Queue a message for this peer; return False if the peer is gone or too slow."""
+        return await self.send_frame(encode_frame(message, body), timeout)
+
+    async def send_frame(self, frame, timeout=None):
+        """Queue an already encoded frame (lets a broadcast encode once for every peer)."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)  # Fast path: no task or timer unless the queue is full
+            return True
+        except asyncio.QueueFull:
+            pass
+        try:
+            await asyncio.wait_for(self.queue.put(frame), timeout or Config.PEER_SEND_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            print(f"Dropping slow peer {self}.")
+            self.close()
+            return False
+
+    async def write_loop(self):
+        try:
+            while True:
+                frames = [await self.queue.get()]
+                while not self.queue.empty():
+                    frames.append(self.queue.get_nowait())
+                data = b''.join(frames)
+                self.writer.write(data)
+                self.bytes_sent += len(data)
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.close()
+
+    async def read_loop(self):
+        try:
+            while True:
+                message, body = await read_frame(self.reader)
+                await self.network.process_message(self, message, body)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            print(f"Error handling peer {self}: {e}")
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for task in self.tasks:
+            if task is not asyncio.current_task():
+                task.cancel()
+        self.writer.close()
+        self.network.remove_peer(self)
+
+    def __repr__(self):
+        return f"AsyncPeer({self.address})"
+
+
+class AsyncNetwork:
+    """asyncio peer-to-peer layer: persistent connections, framed messages and concurrent broadcast.
+
+    Handlers are coroutines registered per message type and called as
+    handler(peer, message, body). Outbound connections announce this node's
+    listening address with a 'hello' message so both sides key the peer by it.
+    """
+
+    def __init__(self, host=None, port=None):
+        self.host = host or Config.HOST
+        self.port = Config.PORT if port is None else port
+        self.peers = {}  # listening address -> AsyncPeer
+        self.handlers = {'hello': self.handle_hello}
+        self.server = None
+
+    async def start_server(self):
+        """Start listening for incoming peer connections."""
+        self.server = await asyncio.start_server(self.accept, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Server started at {self.host}:{self.port}")
+
+    async def accept(self, reader, writer):
+        peer = AsyncPeer(self, reader, writer)
+        self.peers[peer.address] = peer
+
+    async def connect(self, address):
+        """Return the connection to a peer, opening it if there is none yet."""
+        address = tuple(address)
+        peer = self.peers.get(address)
+        if peer is not None and not peer.closed:
+            return peer
+        reader, writer = await asyncio.open_connection(*address)
+        peer = AsyncPeer(self, reader, writer, address)
+        self.peers[address] = peer
+        await peer.send({'type': 'hello', 'address': [self.host, self.port]})
+        return peer
+
+    async def add_peer(self, address):
+        """Add a new peer to the network."""
+        peer = await self.connect(address)
+        print(f"Added peer: {peer}")
+        return peer
+
+    def remove_peer(self, peer):
+        if self.peers.get(peer.address) is peer:
+            del self.peers[peer.address]
+
+    def register_handler(self, message_type, handler):
+        """Call `handler(peer, message, body)` for every incoming message of this type."""
+        self.handlers[message_type] = handler
+
+    async def handle_hello(self, peer, message, body):
+        """Re-key an inbound peer by the listening address it announced."""
+        address = tuple(message['address'])
+        self.remove_peer(peer)
+        peer.address = address
+        self.peers.setdefault(address, peer)
+
+    async def process_message(self, peer, message, body):
+        """Dispatch an incoming message to the handler for its type."""
+        handler = self.handlers.get(message.get('type'))
+        if handler is None:
+            print(f"Received message: {message}")
+            return
+        await handler(peer, message, body)
+
+    async def broadcast(self, message, body=b'', peers=None):
+        """Send a message to all (or the given) peers concurrently; return how many accepted it."""
+        frame = encode_frame(message, body)
+        targets = list(self.peers.values()) if peers is None else peers
+        sent = 0
+        waiting = []
+        for peer in targets:
+            if peer.closed:
+                continue
+            if peer.queue.full():
+                waiting.append(peer.send_frame(frame))
+            else:
+                peer.queue.put_nowait(frame)
+                sent += 1
+        # Only peers with full queues are awaited, concurrently, so one slow peer delays the rest by at most the timeout.
+        if waiting:
+            sent += sum(await asyncio.gather(*waiting))
+        return sent
+
+    async def close(self):
+        """Stop the server and close every peer connection."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for peer in list(self.peers.values()):
+            peer.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    async def main():
+        node_a = AsyncNetwork(port=0)
+        node_b = AsyncNetwork(port=0)
+        await node_a.start_server()
+        await node_b.start_server()
+
+        received = asyncio.Event()
+
+        async def on_new_block(peer, message, body):
+            print(f"Node B got {message} with a {len(body)} byte body from {peer}")
+            received.set()
+
+        node_b.register_handler('new_block', on_new_block)
+        await node_a.add_peer((node_b.host, node_b.port))
+        await node_a.broadcast({"type": "new_block", "height": 1}, body=b"serialized block bytes")
+        await received.wait()
+
+        await node_a.close()
+        await node_b.close()
+
+    asyncio.run(main())
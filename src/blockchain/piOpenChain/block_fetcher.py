@@ -0,0 +1,171 @@
+# src/blockchain/piOpenChain/block_fetcher.py
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from config import Config
+from web3_provider import get_session
+
+
+class BlockFetcher:
+    """Fetches ranges of blocks (or other per-item calls) with batched, concurrent JSON-RPC requests.
+
+    Items are sent as JSON-RPC batches, with up to `max_in_flight` batches outstanding
+    over the endpoint's shared keep-alive session from web3_provider. After each full
+    batch the batch size is scaled toward `target_latency`, so it grows on a fast link
+    and shrinks when the node slows down. A batch whose request fails is split in half and sent again; items the node
+    answers with an error are retried one by one, each up to `retries` times. Results
+    are yielded in item order from a bounded reorder buffer, as the node's JSON
+    (hex-encoded numbers, not web3 AttributeDicts).
+    """
+
+    def __init__(self, provider_url, max_in_flight=None, batch_size=None, max_batch_size=None,
+                 target_latency=None, retries=None, timeout=None, session=None):
+        self.provider_url = provider_url
+        self.max_in_flight = max_in_flight or Config.RPC_MAX_IN_FLIGHT
+        self.batch_size = batch_size or Config.RPC_BATCH_SIZE
+        self.max_batch_size = max_batch_size or Config.RPC_MAX_BATCH_SIZE
+        self.target_latency = target_latency or Config.RPC_TARGET_LATENCY
+        self.retries = Config.RPC_RETRIES if retries is None else retries
+        self.timeout = timeout or Config.RPC_TIMEOUT
+        self.session = session or get_session(provider_url)
+
+    def call_batch(self, calls, delay=0, null_ok=False):
+        """POST one JSON-RPC batch of (method, params) calls.
+
+        A null result counts as an error (e.g. a block the node does not have yet)
+        unless `null_ok` is set.
+
+        Returns (one (result, error) pair per call in order, request latency in seconds).
+        """
+        if delay:
+            time.sleep(delay)
+        payload = [{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params}
+                   for i, (method, params) in enumerate(calls)]
+        start = time.perf_counter()
+        response = self.session.post(self.provider_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        replies = response.json()
+        latency = time.perf_counter() - start
+        if isinstance(replies, dict):
+            replies = [replies]  # Some nodes answer a rejected batch with a single error object
+        by_id = {reply.get('id'): reply for reply in replies}
+        results = []
+        for i in range(len(calls)):
+            reply = by_id.get(i)
+            if reply is None:
+                results.append((None, "No reply in batch."))
+            elif reply.get('error') is not None:
+                results.append((None, reply['error']))
+            elif reply.get('result') is None and not null_ok:
+                results.append((None, "Empty result."))
+            else:
+                results.append((reply['result'], None))
+        return results, latency
+
+    def adapt(self, size, latency):
+        """Scale the batch size toward the target latency, at most doubling or halving it."""
+        if size < self.batch_size:
+            return  # Short (tail or retry) batches say little about the link
+        factor = min(2.0, max(0.5, self.target_latency / max(latency, 1e-6)))
+        self.batch_size = int(min(self.max_batch_size, max(1, self.batch_size * factor)))
+
+    def fetch(self, count, make_call):
+        """Yield the results of calls make_call(0) ... make_call(count - 1), in order.
+
+        `make_call(i)` returns the (method, params) of item i. Raises RuntimeError if
+        an item still fails after its retries.
+        """
+        for item, (result, error) in enumerate(self.fetch_results(count, make_call)):
+            if error is not None:
+                raise RuntimeError(f"Could not fetch item {item}: {error}")
+            yield result
+
+    def fetch_results(self, count, make_call, null_ok=False):
+        """Like `fetch`, but yield a (result, error) pair per item instead of raising.
+
+        An item's error is the last one it got once its retries are used up. With
+        `null_ok`, null results (e.g. receipts of unmined transactions) are yielded as
+        None rather than retried.
+        """
+        next_item = 0  # First item not yet scheduled
+        next_yield = 0
+        lookahead = self.max_in_flight * self.max_batch_size * 2  # Bounds the reorder buffer
+        retry = deque()  # Lists of items to send again, each as its own batch
+        attempts = {}
+        buffer = {}
+        in_flight = {}  # future -> items in its batch
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        try:
+            while next_yield < count:
+                while len(in_flight) < self.max_in_flight:
+                    delay = 0
+                    if retry:
+                        items = retry.popleft()
+                        delay = Config.RPC_RETRY_DELAY * max(attempts[item] for item in items)
+                    elif next_item < min(count, next_yield + lookahead):
+                        items = list(range(next_item, min(next_item + self.batch_size, count)))
+                        next_item = items[-1] + 1
+                    else:
+                        break
+                    future = executor.submit(self.call_batch, [make_call(item) for item in items], delay, null_ok)
+                    in_flight[future] = items
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    items = in_flight.pop(future)
+                    try:
+                        results, latency = future.result()
+                    except (requests.RequestException, ValueError) as e:
+                        # The whole request failed (timeout, HTTP error, bad JSON): retry it as two halves.
+                        self.batch_size = max(1, self.batch_size // 2)
+                        failed = [(item, e) for item in items]
+                        groups = [items[:len(items) // 2], items[len(items) // 2:]]
+                    else:
+                        self.adapt(len(items), latency)
+                        failed = []
+                        for item, (result, error) in zip(items, results):
+                            if error is None:
+                                buffer[item] = (result, None)
+                            else:
+                                failed.append((item, error))
+                        groups = [[item] for item, _ in failed]
+                    for item, error in failed:
+                        attempts[item] = attempts.get(item, 0) + 1
+                        if attempts[item] > self.retries:
+                            buffer[item] = (None, error)
+                    groups = [[item for item in group if item not in buffer] for group in groups]
+                    retry.extend(group for group in groups if group)
+
+                while next_yield in buffer:
+                    yield buffer.pop(next_yield)
+                    next_yield += 1
+        finally:
+            # Same as shutdown(cancel_futures=True), which needs Python 3.9
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def fetch_blocks(self, start, end, full_transactions=True):
+        """Yield blocks start..end (inclusive) in height order."""
+        return self.fetch(end - start + 1,
+                          lambda i: ('eth_getBlockByNumber', [hex(start + i), full_transactions]))
+
+    def fetch_transactions(self, transaction_hashes):
+        """Yield transactions for a list of hashes, in the same order."""
+        return self.fetch(len(transaction_hashes),
+                          lambda i: ('eth_getTransactionByHash', [transaction_hashes[i]]))
+
+
+# Example usage
+if __name__ == "__main__":
+    provider_url = "https://mainnet.infura.io/v3/your_infura_project_id"
+    fetcher = BlockFetcher(provider_url)
+
+    start = time.perf_counter()
+    for block in fetcher.fetch_blocks(12345000, 12345999):
+        pass
+    print(f"Fetched 1000 blocks in {time.perf_counter() - start:.2f} s, final batch size {fetcher.batch_size}")
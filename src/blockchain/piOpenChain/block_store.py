@@ -0,0 +1,340 @@
+import mmap
+import os
+import struct
+
+from blockchain import Block
+from config import Config
+from utils import pack_hash
+
+# Segment record: u32 payload length followed by the payload.
+RECORD_LENGTH = struct.Struct('<I')
+# Index record for each height: segment number, offset in segment, block hash.
+INDEX_RECORD = struct.Struct('<IQ32s')
+# Hash table header: number of slots, number of heights indexed.
+HASH_HEADER = struct.Struct('<QQ')
+# Hash table slot: height + 1, with 0 marking an empty slot.
+HASH_SLOT = struct.Struct('<Q')
+HASH_INDEX_MIN_SLOTS = 1024  # Initial number of slots in the hash table
+
+
+class MappedFile:
+    """Append-only file whose contents are read through a lazily refreshed memory map."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a+b')
+        self.file.seek(0, os.SEEK_END)
+        self.size = self.file.tell()
+        self.map = None
+
+    def append(self, payload):
+        """Append bytes to the file and return the offset they were written at."""
+        offset = self.size
+        self.file.write(payload)
+        self.size += len(payload)
+        return offset
+
+    def read(self, offset, length):
+        """Return a zero-copy view of `length` bytes starting at `offset`."""
+        end = offset + length
+        if end > self.size:
+            raise IndexError(f"Read past end of {self.path}.")
+        if self.map is None or len(self.map) < end:
+            self.remap()
+        return memoryview(self.map)[offset:end]
+
+    def remap(self):
+        """Map the file again so that recently appended bytes become readable."""
+        self.file.flush()
+        self.release()
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def truncate(self, size):
+        """Drop everything after `size` bytes (used to discard torn writes)."""
+        self.release()
+        self.file.truncate(size)
+        self.size = size
+
+    def flush(self, sync=False):
+        """Flush buffered writes, optionally forcing them to disk."""
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+
+    def release(self):
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                # A caller still holds a view into the old map; let GC reclaim it.
+                pass
+            self.map = None
+
+    def close(self):
+        self.release()
+        self.file.close()
+
+
+class HashIndex:
+    """Persistent open-addressing hash table from block hash to height.
+
+    Slots are probed linearly from the first 8 bytes of the hash and only hold
+    heights; a hit is confirmed against the hash in the height index, which is the
+    source of truth. The table is memory-mapped, so opening it is O(1). Heights
+    appended after the header's count was last written (e.g. before a crash) are
+    indexed on open. The table doubles at half load, rebuilding from the height index
+    in O(n), which is amortized O(1) per append. A missing or damaged file is rebuilt
+    the same way.
+    """
+
+    def __init__(self, path, hash_at, heights):
+        self.path = path
+        self.hash_at = hash_at  # height -> raw hash, read from the height index
+        self.file = None
+        self.map = None
+        if not self.open():
+            self.rebuild(heights)
+        # The header may trail the height index (not flushed) or lead it (torn blocks dropped)
+        self.count = min(self.count, heights)
+        for height in range(self.count, heights):
+            self.add(height, hash_at(height))
+
+    def open(self):
+        """Map the table file; return False if it is missing or damaged."""
+        if not os.path.exists(self.path):
+            return False
+        self.file = open(self.path, 'r+b')
+        size = os.fstat(self.file.fileno()).st_size
+        if size >= HASH_HEADER.size:
+            self.map = mmap.mmap(self.file.fileno(), 0)
+            self.slots, self.count = HASH_HEADER.unpack_from(self.map, 0)
+            if (self.slots and self.slots & (self.slots - 1) == 0
+                    and size == HASH_HEADER.size + self.slots * HASH_SLOT.size):
+                return True
+        self.close()
+        return False
+
+    def rebuild(self, heights, slots=None):
+        """Write a new table holding heights 0..heights-1 and map it in place of the old one."""
+        slots = slots or HASH_INDEX_MIN_SLOTS
+        while heights * 2 > slots:
+            slots *= 2
+        self.close()
+        staging_path = self.path + '.tmp'
+        with open(staging_path, 'wb') as f:
+            f.truncate(HASH_HEADER.size + slots * HASH_SLOT.size)
+        self.file = open(staging_path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.slots, self.count = slots, 0
+        HASH_HEADER.pack_into(self.map, 0, self.slots, self.count)
+        for height in range(heights):
+            self.add(height, self.hash_at(height))
+        self.close()
+        os.replace(staging_path, self.path)
+        self.open()
+
+    def probe(self, raw_hash):
+        """Yield the slot positions to try for a hash, in probing order."""
+        mask = self.slots - 1
+        slot = int.from_bytes(raw_hash[:8], 'little') & mask
+        while True:
+            yield HASH_HEADER.size + slot * HASH_SLOT.size
+            slot = (slot + 1) & mask
+
+    def add(self, height, raw_hash):
+        """Index the block at `height`; heights are added in order."""
+        if (height + 1) * 2 > self.slots:
+            self.rebuild(height, self.slots * 2)
+        for position in self.probe(raw_hash):
+            if not HASH_SLOT.unpack_from(self.map, position)[0]:
+                HASH_SLOT.pack_into(self.map, position, height + 1)
+                break
+        self.count = height + 1
+        HASH_HEADER.pack_into(self.map, 0, self.slots, self.count)
+
+    def get(self, raw_hash, heights):
+        """Return the height of a raw hash among heights 0..heights-1, or None."""
+        for position in self.probe(raw_hash):
+            (value,) = HASH_SLOT.unpack_from(self.map, position)
+            if not value:
+                return None
+            height = value - 1
+            if height < heights and self.hash_at(height) == raw_hash:
+                return height
+
+    def flush(self, sync=False):
+        if sync:
+            self.map.flush()
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class BlockStore:
+    """Persistent, append-only block storage with O(1) lookup by height and by hash.
+
+    Blocks are written to numbered segment files (blk00000.dat, blk00001.dat, ...).
+    A fixed-width index file maps each height (zero-based position in the chain, so
+    the genesis block is height 0) to its segment, offset and hash. Segments and the
+    index are read through memory maps, so opening a store only reads the file sizes.
+    Lookups by hash go through a persistent HashIndex (hashes.dat), so they are O(1)
+    from the first one after opening as well.
+    """
+
+    INDEX_FILE = 'index.dat'
+    HASH_INDEX_FILE = 'hashes.dat'
+
+    def __init__(self, path, segment_size=None):
+        self.path = path
+        self.segment_size = segment_size or Config.BLOCK_STORE_SEGMENT_SIZE
+        os.makedirs(path, exist_ok=True)
+        self.index = MappedFile(os.path.join(path, self.INDEX_FILE))
+        self.segments = {}
+        self.last_block = None
+        self.recover()
+        self.hash_index = HashIndex(os.path.join(path, self.HASH_INDEX_FILE), self.raw_hash_at, len(self))
+
+    def segment_path(self, number):
+        return os.path.join(self.path, f"blk{number:05d}.dat")
+
+    def get_segment(self, number):
+        """Return the segment file with the given number, opening it on first use."""
+        segment = self.segments.get(number)
+        if segment is None:
+            segment = MappedFile(self.segment_path(number))
+            self.segments[number] = segment
+        return segment
+
+    def recover(self):
+        """Discard partially written index entries and block records left by a crash."""
+        torn_index = self.index.size % INDEX_RECORD.size
+        if torn_index:
+            self.index.truncate(self.index.size - torn_index)
+
+        if len(self) == 0:
+            self.current_segment = 0
+            self.get_segment(0).truncate(0)
+            return
+
+        number, offset, _ = self.read_index(len(self) - 1)
+        segment = self.get_segment(number)
+        (length,) = RECORD_LENGTH.unpack(segment.read(offset, RECORD_LENGTH.size))
+        segment.truncate(offset + RECORD_LENGTH.size + length)
+        self.current_segment = number
+
+        # Segments created after the last indexed block only hold torn writes.
+        stale = number + 1
+        while os.path.exists(self.segment_path(stale)):
+            os.remove(self.segment_path(stale))
+            stale += 1
+
+    def read_index(self, height):
+        """Return (segment, offset, raw hash) for the block at `height`."""
+        return INDEX_RECORD.unpack(self.index.read(height * INDEX_RECORD.size, INDEX_RECORD.size))
+
+    def raw_hash_at(self, height):
+        return self.read_index(height)[2]
+
+    def append(self, block):
+        """Append a block to the store and return its height."""
+        payload = block.to_bytes()
+        record = RECORD_LENGTH.pack(len(payload)) + payload
+
+        segment = self.get_segment(self.current_segment)
+        if segment.size and segment.size + len(record) > self.segment_size:
+            segment.flush()
+            self.current_segment += 1
+            segment = self.get_segment(self.current_segment)
+
+        offset = segment.append(record)
+        # The block record must reach the file before the index entry that points at it.
+        segment.flush()
+        raw_hash = pack_hash(block.hash)
+        self.index.append(INDEX_RECORD.pack(self.current_segment, offset, raw_hash))
+        self.index.flush()
+
+        height = len(self) - 1
+        self.hash_index.add(height, raw_hash)
+        self.last_block = block
+        return height
+
+    def get_block(self, height):
+        """Return the block at `height`, decoding it from its segment on demand."""
+        if height < 0:
+            height += len(self)
+        if not 0 <= height < len(self):
+            raise IndexError(f"Block height {height} out of range.")
+        if height == len(self) - 1 and self.last_block is not None:
+            return self.last_block
+
+        number, offset, _ = self.read_index(height)
+        segment = self.get_segment(number)
+        (length,) = RECORD_LENGTH.unpack(segment.read(offset, RECORD_LENGTH.size))
+        return Block.from_bytes(segment.read(offset + RECORD_LENGTH.size, length))
+
+    def get_height(self, block_hash):
+        """Return the height of the block with the given hex hash, or None."""
+        return self.hash_index.get(pack_hash(block_hash), len(self))
+
+    def get_block_by_hash(self, block_hash):
+        """Return the block with the given hex hash, or None if it is not stored."""
+        height = self.get_height(block_hash)
+        return self.get_block(height) if height is not None else None
+
+    def get_last_block(self):
+        """Return the block at the tip of the store, or None if it is empty."""
+        if len(self) == 0:
+            return None
+        if self.last_block is None:
+            self.last_block = self.get_block(len(self) - 1)
+        return self.last_block
+
+    def flush(self, sync=True):
+        """Flush the active segment and the index to disk."""
+        self.get_segment(self.current_segment).flush(sync)
+        self.index.flush(sync)
+        self.hash_index.flush(sync)
+
+    def close(self):
+        self.hash_index.close()
+        for segment in self.segments.values():
+            segment.close()
+        self.segments = {}
+        self.index.close()
+
+    def __len__(self):
+        return self.index.size // INDEX_RECORD.size
+
+    def __getitem__(self, height):
+        return self.get_block(height)
+
+    def __iter__(self):
+        for height in range(len(self)):
+            yield self.get_block(height)
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    from blockchain import Blockchain
+
+    store_path = tempfile.mkdtemp(prefix="piopenchain-")
+    blockchain = Blockchain(store=BlockStore(store_path))
+    for i in range(1000):
+        blockchain.create_block(data=f"Block {i} data", previous_hash=blockchain.get_last_block().hash)
+    blockchain.chain.close()
+
+    # Reopening only reads file sizes; blocks are decoded on demand.
+    start = time.perf_counter()
+    store = BlockStore(store_path)
+    print(f"Reopened store with {len(store)} blocks in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print("Last block:", store.get_last_block())
+    print("Block at height 500:", store.get_block(500))
+    print("Lookup by hash:", store.get_block_by_hash(store.get_block(42).hash).index)
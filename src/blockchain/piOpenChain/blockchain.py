@@ -1,36 +1,158 @@
-import hashlib
+import struct
 import time
 import json
 
+from chain_validator import ChainValidator
+from config import Config
+from merkle import MerkleTree, merkle_root
+from transaction import Transaction
+from utils import NULL_HASH, calculate_block_hash, encode_data, pack_hash, unpack_hash
+
+# Binary block record: index, timestamp, nonce, flags, previous hash, hash, Merkle root and
+# transaction count. Each transaction follows as a u32 length and its bytes, then the block data as JSON.
+BLOCK_HEADER = struct.Struct('<QqQB32s32s32sI')
+TRANSACTION_LENGTH = struct.Struct('<I')
+FLAG_HAS_NONCE = 0x01
+FLAG_HAS_MERKLE_ROOT = 0x02
+
 class Block:
-    def __init__(self, index, previous_hash, timestamp, data, hash):
+    __slots__ = ('index', 'previous_hash', 'timestamp', 'data', 'hash', 'nonce', 'transactions', 'merkle_root')
+
+    def __init__(self, index, previous_hash, timestamp, data, hash, nonce=None, transactions=None, merkle_root=None):
         self.index = index
         self.previous_hash = previous_hash
         self.timestamp = timestamp
         self.data = data
         self.hash = hash
+        self.nonce = nonce
+        self.transactions = transactions or []
+        self.merkle_root = merkle_root  # Hex root over `transactions`, covered by the block hash
+
+    def to_dict(self):
+        """Convert the block to a dictionary; nonce and transactions only appear when set."""
+        block = {
+            'index': self.index,
+            'previous_hash': self.previous_hash,
+            'timestamp': self.timestamp,
+            'data': self.data,
+            'hash': self.hash
+        }
+        if self.nonce is not None:
+            block['nonce'] = self.nonce
+        if self.merkle_root is not None:
+            block['merkle_root'] = self.merkle_root
+            block['transactions'] = [tx.to_dict() for tx in self.transactions]
+        return block
+
+    def to_bytes(self):
+        """Encode the block as a fixed-layout header, its transactions, then its data."""
+        flags = (FLAG_HAS_NONCE if self.nonce is not None else 0) | \
+            (FLAG_HAS_MERKLE_ROOT if self.merkle_root is not None else 0)
+        header = BLOCK_HEADER.pack(
+            self.index,
+            self.timestamp,
+            self.nonce or 0,
+            flags,
+            pack_hash(self.previous_hash),
+            pack_hash(self.hash),
+            bytes.fromhex(self.merkle_root) if self.merkle_root is not None else NULL_HASH,
+            len(self.transactions)
+        )
+        parts = [header]
+        for tx in self.transactions:
+            tx_bytes = tx.to_bytes()
+            parts.append(TRANSACTION_LENGTH.pack(len(tx_bytes)))
+            parts.append(tx_bytes)
+        parts.append(encode_data(self.data))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """Decode a block from bytes or a memoryview; the header is unpacked in place."""
+        buffer = memoryview(buffer)
+        index, timestamp, nonce, flags, previous_hash, block_hash, root, tx_count = BLOCK_HEADER.unpack_from(buffer)
+        offset = BLOCK_HEADER.size
+        transactions = []
+        for _ in range(tx_count):
+            (length,) = TRANSACTION_LENGTH.unpack_from(buffer, offset)
+            offset += TRANSACTION_LENGTH.size
+            transactions.append(Transaction.from_bytes(buffer[offset:offset + length]))
+            offset += length
+        data = json.loads(bytes(buffer[offset:]))
+        return cls(index, unpack_hash(previous_hash), timestamp, data, unpack_hash(block_hash),
+                   nonce if flags & FLAG_HAS_NONCE else None,
+                   transactions,
+                   root.hex() if flags & FLAG_HAS_MERKLE_ROOT else None)
+
+    def get_transaction_proof(self, transaction_id):
+        """Return the Merkle inclusion proof for one of this block's transactions, or None."""
+        for position, tx in enumerate(self.transactions):
+            if tx.transaction_id == transaction_id:
+                return MerkleTree(self.transactions).get_proof(position)
+        return None
 
     def __repr__(self):
-        return json.dumps(self.__dict__, indent=4)
+        return json.dumps(self.to_dict(), indent=4)
+
+class MemoryBlockStore(list):
+    """In-memory block store: a list of blocks plus a hash -> height index."""
 
-class Blockchain:
     def __init__(self):
-        self.chain = []
-        self.create_block(previous_hash='0')  # Create the genesis block
+        super().__init__()
+        self.heights_by_hash = {}
+
+    def append(self, block):
+        """Append a block and return its height."""
+        super().append(block)
+        height = len(self) - 1
+        self.heights_by_hash[block.hash] = height
+        return height
 
-    def create_block(self, data, previous_hash):
+    def get_block(self, height):
+        return self[height]
+
+    def get_block_by_hash(self, block_hash):
+        height = self.heights_by_hash.get(block_hash)
+        return self[height] if height is not None else None
+
+    def get_last_block(self):
+        return self[-1] if self else None
+
+class Blockchain:
+    def __init__(self, store=None, state=None):
+        # Any object with the MemoryBlockStore interface works here, e.g. block_store.BlockStore
+        self.chain = store if store is not None else MemoryBlockStore()
+        self.state = state  # Optional state.AccountState kept in step with the chain
+        self.validator = ChainValidator(self.chain)
+        if len(self.chain) == 0:
+            self.create_genesis_block()
+        elif self.state is not None:
+            self.state.sync(self.chain)
+
+    def create_genesis_block(self):
+        """Create the genesis block; it is the same on every node so peers can sync from it."""
+        hash = self.calculate_hash(1, '0', Config.GENESIS_TIMESTAMP, Config.GENESIS_BLOCK_DATA)
+        return self.add_block(Block(1, '0', Config.GENESIS_TIMESTAMP, Config.GENESIS_BLOCK_DATA, hash))
+
+    def create_block(self, data, previous_hash, transactions=None):
         """Create a new block and add it to the chain."""
         index = len(self.chain) + 1
         timestamp = self.get_current_timestamp()
-        hash = self.calculate_hash(index, previous_hash, timestamp, data)
-        block = Block(index, previous_hash, timestamp, data, hash)
+        root = merkle_root(transactions) if transactions else None
+        hash = self.calculate_hash(index, previous_hash, timestamp, data, merkle_root=root)
+        block = Block(index, previous_hash, timestamp, data, hash, transactions=transactions, merkle_root=root)
+        return self.add_block(block)
+
+    def add_block(self, block):
+        """Append an already built block (e.g. a mined one) to the chain."""
+        if self.state is not None:
+            self.state.apply_block(block)  # Raises ValueError, keeping the block out, if a transaction is invalid
         self.chain.append(block)
         return block
 
-    def calculate_hash(self, index, previous_hash, timestamp, data):
+    def calculate_hash(self, index, previous_hash, timestamp, data, nonce=None, merkle_root=None):
         """Calculate the hash of a block."""
-        block_string = f"{index}{previous_hash}{timestamp}{data}".encode()
-        return hashlib.sha256(block_string).hexdigest()
+        return calculate_block_hash(index, previous_hash, timestamp, data, nonce, merkle_root)
 
     def get_current_timestamp(self):
         """Return the current timestamp."""
@@ -38,23 +160,33 @@ class Blockchain:
 
     def get_last_block(self):
         """Return the last block in the chain."""
-        return self.chain[-1] if self.chain else None
+        return self.chain.get_last_block()
+
+    def get_block(self, height):
+        """Return the block at the given zero-based height."""
+        return self.chain.get_block(height)
 
-    def is_chain_valid(self):
-        """Check if the blockchain is valid."""
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+    def get_block_by_hash(self, block_hash):
+        """Return the block with the given hash, or None."""
+        return self.chain.get_block_by_hash(block_hash)
 
-            # Check if the hash of the current block is correct
-            if current_block.previous_hash != previous_block.hash:
-                return False
+    def get_transaction_proof(self, height, transaction_id):
+        """Return (proof, merkle root) showing a transaction is in the block at `height`."""
+        block = self.get_block(height)
+        proof = block.get_transaction_proof(transaction_id)
+        return (proof, block.merkle_root) if proof is not None else None
 
-            # Check if the hash is valid
-            if current_block.hash != self.calculate_hash(current_block.index, current_block.previous_hash, current_block.timestamp, current_block.data):
-                return False
+    def is_chain_valid(self, full=False):
+        """Check if the blockchain is valid.
 
-        return True
+        Only blocks added since the last successful check are re-hashed unless
+        `full` is set, in which case the whole chain is re-validated in parallel.
+        """
+        return self.validator.validate(full=full) is None
+
+    def find_first_invalid_block(self, full=False):
+        """Return the height of the first invalid block, or None if the chain is valid."""
+        return self.validator.validate(full=full)
 
 # Example usage
 if __name__ == "__main__":
@@ -64,6 +196,13 @@ if __name__ == "__main__":
     blockchain.create_block(data="First block data", previous_hash=blockchain.get_last_block().hash)
     blockchain.create_block(data="Second block data", previous_hash=blockchain.get_last_block().hash)
 
+    # A block carrying transactions commits to them through its Merkle root
+    transactions = [Transaction(sender="Alice", recipient="Bob", amount=5000000000),
+                    Transaction(sender="Charlie", recipient="Dave", amount=10000000000)]
+    block = blockchain.create_block(data="Transfers", previous_hash=blockchain.get_last_block().hash,
+                                    transactions=transactions)
+    print("Inclusion proof:", blockchain.get_transaction_proof(len(blockchain.chain) - 1, transactions[1].transaction_id))
+
     # Print the blockchain
     for block in blockchain.chain:
         print(block)
@@ -1,27 +1,40 @@
 # src/blockchain/piOpenChain/blockchain_explorer.py
 
-from web3 import Web3
+from block_fetcher import BlockFetcher
+from transaction_indexer import TransactionIndexer
+from web3_provider import get_web3
 
 class BlockchainExplorer:
-    def __init__(self, provider_url):
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+    def __init__(self, provider_url, index_path=None):
+        self.web3 = get_web3(provider_url)
+        self.fetcher = BlockFetcher(provider_url)
+        self.indexer = TransactionIndexer(self.web3, index_path, fetcher=self.fetcher)
 
     def get_transaction_history(self, address, start_block=0, end_block='latest'):
-        """Retrieve transaction history for a given address."""
-        transactions = []
-        end_block = self.web3.eth.blockNumber if end_block == 'latest' else end_block
-
-        for block_number in range(start_block, end_block + 1):
-            block = self.web3.eth.getBlock(block_number, full_transactions=True)
-            for txn in block.transactions:
-                if txn['from'] == address or txn['to'] == address:
-                    transactions.append(txn)
+        """Retrieve transaction history for a given address.
+
+        Confirmed blocks are answered from the local index (brought up to date first);
+        only the few unconfirmed blocks after it are scanned over RPC. Transactions are
+        returned as dicts in the node's JSON encoding.
+        """
+        end_block = self.web3.eth.block_number if end_block == 'latest' else end_block
+        self.indexer.sync()
+        indexed_end = min(end_block, self.indexer.last_indexed_block)
+        transactions = self.indexer.get_transaction_history(address, start_block, indexed_end)
+
+        address = address.lower()
+        scan_start = max(start_block, indexed_end + 1)
+        if scan_start <= end_block:
+            for block in self.fetcher.fetch_blocks(scan_start, end_block):
+                for txn in block['transactions']:
+                    if txn['from'].lower() == address or (txn.get('to') or '').lower() == address:
+                        transactions.append(txn)
 
         return transactions
 
     def get_block_details(self, block_number):
         """Get detailed information about a specific block."""
-        return self.web3.eth.getBlock(block_number, full_transactions=True)
+        return self.web3.eth.get_block(block_number, full_transactions=True)
 
 # Example usage
 if __name__ == "__main__":
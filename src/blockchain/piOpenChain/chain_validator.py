@@ -0,0 +1,139 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+from merkle import merkle_root
+from utils import calculate_block_hash
+
+
+def block_record(height, block):
+    """Flatten a block into a picklable tuple for validation workers."""
+    return (height, block.index, block.previous_hash, block.timestamp, block.data, block.hash, block.nonce,
+            block.merkle_root, [tx.to_bytes() for tx in block.transactions])
+
+
+def validate_range(records):
+    """Validate hashes and internal previous_hash links of a contiguous run of blocks.
+
+    Returns the height of the first invalid block in the run, or None. The link from
+    the first record to the block before it is checked by the caller. Blocks carrying
+    transactions must also have a Merkle root matching them.
+    """
+    previous_hash = None
+    for height, index, block_previous_hash, timestamp, data, block_hash, nonce, root, transactions in records:
+        if previous_hash is not None and block_previous_hash != previous_hash:
+            return height
+        if (root is not None or transactions) and root != merkle_root(transactions):
+            return height
+        if block_hash != calculate_block_hash(index, block_previous_hash, timestamp, data, nonce, root):
+            return height
+        previous_hash = block_hash
+    return None
+
+
+class ChainValidator:
+    """Validates a chain incrementally from a checkpoint, or fully across a process pool.
+
+    The checkpoint remembers the height and hash of the last block known to be valid,
+    so repeated calls only hash blocks appended since. If the block at the checkpoint
+    has been replaced (e.g. by a reorg), validation starts again from genesis.
+    """
+
+    def __init__(self, chain, workers=None, chunk_size=None):
+        self.chain = chain
+        self.workers = workers or Config.VALIDATION_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size or Config.VALIDATION_CHUNK_SIZE
+        self.reset()
+
+    def reset(self):
+        """Forget the checkpoint so the next validation starts from genesis."""
+        self.validated_height = -1
+        self.validated_hash = None
+
+    def checkpoint_is_current(self):
+        """Check that the checkpointed block is still part of the chain."""
+        if self.validated_height < 0:
+            return True
+        if self.validated_height >= len(self.chain):
+            return False
+        return self.chain[self.validated_height].hash == self.validated_hash
+
+    def validate(self, full=False):
+        """Validate the chain and return the first invalid height, or None if it is valid.
+
+        By default only blocks after the checkpoint are checked. With `full=True` the
+        whole chain is re-validated, split into ranges hashed by a process pool.
+        """
+        if full or not self.checkpoint_is_current():
+            self.reset()
+
+        start = self.validated_height + 1
+        length = len(self.chain)
+        if start >= length:
+            return None
+
+        if full and self.workers > 1 and length - start > self.chunk_size:
+            invalid_height = self.validate_parallel(start, length)
+        else:
+            invalid_height = self.validate_serial(start, length)
+
+        last_valid = (invalid_height if invalid_height is not None else length) - 1
+        if last_valid >= 0:
+            self.validated_height = last_valid
+            self.validated_hash = self.chain[last_valid].hash
+        return invalid_height
+
+    def link_is_valid(self, height):
+        """Check that the block at `height` points at the checkpoint or the block before it."""
+        if height == 0:
+            return True
+        if height - 1 == self.validated_height:
+            previous_hash = self.validated_hash
+        else:
+            previous_hash = self.chain[height - 1].hash
+        return self.chain[height].previous_hash == previous_hash
+
+    def validate_serial(self, start, stop):
+        """Validate blocks in [start, stop) in this process."""
+        if not self.link_is_valid(start):
+            return start
+        return validate_range(block_record(height, self.chain[height]) for height in range(start, stop))
+
+    def validate_parallel(self, start, stop):
+        """Validate blocks in [start, stop) across a process pool, then stitch range boundaries."""
+        ranges = [(lo, min(lo + self.chunk_size, stop)) for lo in range(start, stop, self.chunk_size)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(validate_range, [block_record(h, self.chain[h]) for h in range(lo, hi)])
+                for lo, hi in ranges
+            ]
+            try:
+                for (lo, _), future in zip(ranges, futures):
+                    # Ranges are visited in height order, so the first failure is the lowest one.
+                    if not self.link_is_valid(lo):
+                        return lo
+                    invalid_height = future.result()
+                    if invalid_height is not None:
+                        return invalid_height
+            finally:
+                for future in futures:
+                    future.cancel()
+        return None
+
+
+# Example usage
+if __name__ == "__main__":
+    from blockchain import Blockchain
+
+    blockchain = Blockchain()
+    for i in range(50000):
+        blockchain.create_block(data=f"Block {i} data", previous_hash=blockchain.get_last_block().hash)
+
+    validator = ChainValidator(blockchain.chain)
+    print("First invalid height (full):", validator.validate(full=True))
+
+    blockchain.create_block(data="One more block", previous_hash=blockchain.get_last_block().hash)
+    print("First invalid height (incremental):", validator.validate())
+
+    blockchain.chain[1234].data = "Tampered data"
+    print("First invalid height after tampering:", validator.validate(full=True))
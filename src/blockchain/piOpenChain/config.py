@@ -5,17 +5,72 @@ class Config:
     HOST = '127.0.0.1'  # Default host for the blockchain node
     PORT = 5000          # Default port for the blockchain node
     MAX_CONNECTIONS = 5  # Maximum number of simultaneous connections
+    MAX_FRAME_SIZE = 32 * 1024 * 1024  # Largest accepted peer message frame in bytes
+    PEER_QUEUE_SIZE = 1024   # Outbound frames queued per peer before senders wait
+    PEER_SEND_TIMEOUT = 10   # Seconds a sender waits on a full peer queue before dropping the peer
+    GOSSIP_FANOUT = 8        # Random peers each new block/transaction hash is announced to
+    GOSSIP_SEEN_CACHE_SIZE = 100000  # Recently seen item hashes remembered to suppress duplicates
+    GOSSIP_REQUEST_TIMEOUT = 5       # Seconds before a 'getdata' is retried with another announcing peer
+    SYNC_HEADERS_PER_REQUEST = 2000  # Block headers requested (and served) per 'getheaders' message
+    SYNC_WINDOW_SIZE = 250           # Block bodies requested (and served) per 'getbodies' message
+    SYNC_REQUESTS_PER_PEER = 2       # Body windows in flight to each peer during sync
+    SYNC_MAX_BUFFERED_WINDOWS = 64   # Windows that may be downloaded ahead of the next one to append
+    SYNC_REQUEST_TIMEOUT = 10        # Seconds before a sync request is retried with another peer
 
     # Blockchain settings
-    DIFFICULTY = 4       # Difficulty level for mining (number of leading zeros)
+    DIFFICULTY = 4       # Initial difficulty level for mining (number of leading zeros)
+    TARGET_BLOCK_TIME = 10   # Block interval the difficulty is retargeted toward, in seconds
+    RETARGET_WINDOW = 20     # Number of recent blocks used to measure the block interval
+    MAX_RETARGET_FACTOR = 4  # Maximum factor the target may change by in one retarget
     MINING_REWARD = 50   # Reward for mining a new block
+    MINING_WORKERS = None  # Processes searching the nonce space (None = one per CPU core)
     GENESIS_BLOCK_DATA = "Genesis Block"  # Data for the genesis block
+    GENESIS_TIMESTAMP = 1704067200  # Fixed genesis timestamp, so every node derives the same genesis block
+    GENESIS_ALLOCATIONS = {}  # Starting balances (address -> coins) before the genesis block
+    COINBASE_ADDRESS = "coinbase"  # Sender of the block reward transaction
+    HASH_ALGORITHM = 'sha256'  # Digest for block, transaction, contract and Merkle hashes ('sha256' or 'blake2b')
+
+    # Storage settings
+    BLOCK_STORE_PATH = 'data/blocks'  # Directory holding block segment files and the height index
+    BLOCK_STORE_SEGMENT_SIZE = 128 * 1024 * 1024  # Maximum size of one block segment file in bytes
+
+    # Validation settings
+    VALIDATION_WORKERS = None      # Processes used for full chain validation (None = one per CPU core)
+    VALIDATION_CHUNK_SIZE = 10000  # Blocks per range handed to a validation worker
+
+    # State settings
+    STATE_PATH = 'data/state'          # Directory holding account state snapshots
+    STATE_SNAPSHOT_INTERVAL = 1000     # Blocks between account state snapshots
+    STATE_SNAPSHOTS_KEPT = 3           # Number of snapshots retained on disk
+    STATE_UNDO_DEPTH = 100             # Blocks that can be rolled back without a snapshot
 
     # Transaction settings
-    TRANSACTION_FEE = 0.01  # Transaction fee for processing transactions
+    COIN_DECIMALS = 8       # Amounts and fees are integers in units of 10**-COIN_DECIMALS coins
+    TRANSACTION_FEE = 0.01  # Transaction fee for processing transactions (in coins)
+    MEMPOOL_MAX_TRANSACTIONS = 1000000       # Pending transactions kept before the cheapest are evicted
+    MEMPOOL_MAX_BYTES = 300 * 1024 * 1024    # Encoded pending transaction bytes kept before eviction
+
+    # Indexer settings
+    INDEXER_DB_PATH = 'data/transaction_index.sqlite3'  # SQLite file holding the explorer's transaction index
+    INDEXER_CONFIRMATIONS = 12  # Most recent blocks left unindexed (and scanned live) in case of reorgs
+    INDEXER_BATCH_SIZE = 500    # Blocks written to the index per database transaction
+
+    # RPC settings
+    RPC_MAX_IN_FLIGHT = 8       # JSON-RPC batch requests outstanding at once
+    RPC_BATCH_SIZE = 50         # Calls in the first batch; adapted to latency afterwards
+    RPC_MAX_BATCH_SIZE = 1000   # Upper bound on calls per batch request
+    RPC_TARGET_LATENCY = 0.5    # Seconds per batch request the batch size is tuned toward
+    RPC_RETRIES = 3             # Times a failed call is retried before giving up
+    RPC_RETRY_DELAY = 0.5       # Seconds to wait before a retry, multiplied by the attempt number
+    RPC_TIMEOUT = 30            # Seconds before an RPC request is abandoned
 
     # Smart contract settings
     MAX_CONTRACT_SIZE = 1024  # Maximum size of smart contract code in bytes
+    CONTRACT_MAX_STEPS = 100000  # Loop iterations and function calls one contract call may make
+    CONTRACT_TIME_LIMIT = 1.0    # Seconds one contract call may run
+    CONTRACT_STATE_PATH = 'data/contracts'  # Directory holding persisted contract state
+    CONTRACT_WORKERS = None  # Processes running a batch's calls to different contracts (None = one per CPU core)
+    CONTRACT_PARALLEL_MIN_CALLS = 256  # Smaller batches run serially, as a pool round trip costs more than it saves
 
     # Logging settings
     LOGGING_LEVEL = 'INFO'  # Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -1,51 +1,71 @@
-import hashlib
 import time
 
+from blockchain import Block
+from config import Config
+from difficulty import DifficultyAdjuster
+from merkle import merkle_root
+from miner import Miner, difficulty_to_target
+from transaction import Transaction
+from utils import calculate_block_hash, to_units
+
 class Consensus:
-    def __init__(self, blockchain):
+    def __init__(self, blockchain, miner=None, difficulty_adjuster=None):
         self.blockchain = blockchain
+        self.miner = miner or Miner()
+        self.difficulty_adjuster = difficulty_adjuster or DifficultyAdjuster()
+        self.difficulty_adjuster.load_chain(self.blockchain.chain)
 
-    def mine_block(self, miner_address, data):
+    def mine_block(self, miner_address, data, transactions=None):
         """Mine a new block and add it to the blockchain."""
         last_block = self.blockchain.get_last_block()
         previous_hash = last_block.hash if last_block else '0'
         index = len(self.blockchain.chain) + 1
         timestamp = self.get_current_timestamp()
 
-        # Start mining process
-        nonce = 0
-        difficulty = self.get_difficulty()  # Define the difficulty level
-        new_block_hash = self.calculate_hash(index, previous_hash, timestamp, data, nonce)
+        # Pay the block reward and fees to the miner when the chain tracks account state
+        if self.blockchain.state is not None:
+            reward = to_units(Config.MINING_REWARD) + sum(tx.fee for tx in transactions or [])
+            coinbase = Transaction(Config.COINBASE_ADDRESS, miner_address, reward, fee=0, timestamp=timestamp, nonce=index)
+            transactions = [coinbase] + list(transactions or [])
+            # Fail before the proof of work rather than when add_block applies the block
+            self.blockchain.state.check_transactions(transactions)
 
-        while not self.is_valid_proof(new_block_hash, difficulty):
-            nonce += 1
-            new_block_hash = self.calculate_hash(index, previous_hash, timestamp, data, nonce)
+        # Start mining process
+        target = self.get_target()  # Hash target set by difficulty retargeting
+        root = merkle_root(transactions) if transactions else None
+        nonce, new_block_hash = self.miner.mine(index, previous_hash, timestamp, data, target, root)
 
-        # Create the new block
-        new_block = self.blockchain.create_block(data, previous_hash)
-        new_block.nonce = nonce  # Store the nonce in the block
-        new_block.hash = new_block_hash  # Update the block's hash
+        # Create the new block; it is only appended once its hash is final, since stores persist on append
+        new_block = Block(index, previous_hash, timestamp, data, new_block_hash, nonce, transactions, root)
+        self.blockchain.add_block(new_block)
+        self.difficulty_adjuster.record_block(timestamp)
 
         print(f"Block mined: {new_block}")
         return new_block
 
-    def calculate_hash(self, index, previous_hash, timestamp, data, nonce):
+    def calculate_hash(self, index, previous_hash, timestamp, data, nonce, merkle_root=None):
         """Calculate the hash of a block."""
-        block_string = f"{index}{previous_hash}{timestamp}{data}{nonce}".encode()
-        return hashlib.sha256(block_string).hexdigest()
+        return calculate_block_hash(index, previous_hash, timestamp, data, nonce, merkle_root)
 
     def is_valid_proof(self, hash, difficulty):
         """Check if the hash meets the difficulty criteria."""
-        return hash[:difficulty] == '0' * difficulty
+        return int(hash, 16) <= difficulty_to_target(difficulty)
 
     def get_current_timestamp(self):
         """Return the current timestamp."""
         return int(time.time())
 
+    def get_target(self):
+        """Return the numeric hash target the next block must meet."""
+        return self.difficulty_adjuster.get_target()
+
     def get_difficulty(self):
-        """Define the difficulty level for mining."""
-        # For simplicity, we can set a static difficulty level
-        return 4  # Number of leading zeros required in the hash
+        """Return the current difficulty as a (fractional) number of leading zero hex digits."""
+        return self.difficulty_adjuster.get_difficulty()
+
+    def get_block_interval_stats(self):
+        """Return recent block interval statistics (mean, p50, p95, ...) in seconds."""
+        return self.difficulty_adjuster.get_block_interval_stats()
 
 # Example usage
 if __name__ == "__main__":
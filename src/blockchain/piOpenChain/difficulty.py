@@ -0,0 +1,107 @@
+import math
+from collections import deque
+
+from config import Config
+from miner import difficulty_to_target
+
+MAX_TARGET = (1 << 256) - 1
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class DifficultyAdjuster:
+    """Retargets proof-of-work toward a fixed block interval over a rolling window.
+
+    Difficulty is held as a numeric hash target (a valid block hash must be at or
+    below it), so it can move in small steps rather than whole leading hex zeros.
+    After every block the next target is the mean target of the blocks in the window
+    scaled by the ratio of the observed mean block interval to the configured one,
+    with that ratio bounded by `max_adjustment`.
+    """
+
+    def __init__(self, target_block_time=None, window=None, max_adjustment=None, initial_difficulty=None):
+        self.target_block_time = target_block_time or Config.TARGET_BLOCK_TIME
+        self.max_adjustment = max_adjustment or Config.MAX_RETARGET_FACTOR
+        window = window or Config.RETARGET_WINDOW
+        self.timestamps = deque(maxlen=window + 1)
+        self.targets = deque(maxlen=window)  # Target each block in the window was mined at
+        self.target = difficulty_to_target(initial_difficulty if initial_difficulty is not None else Config.DIFFICULTY)
+
+    def load_chain(self, chain):
+        """Seed the timestamp window from the most recent blocks of an existing chain."""
+        # The genesis timestamp is fixed rather than mined, so it says nothing about the block interval.
+        start = max(1, len(chain) - self.timestamps.maxlen)
+        for height in range(start, len(chain)):
+            self.timestamps.append(chain[height].timestamp)
+            self.targets.append(self.target)
+
+    def record_block(self, timestamp):
+        """Add a new block's timestamp to the window and retarget."""
+        self.timestamps.append(timestamp)
+        self.targets.append(self.target)
+        self.retarget()
+        return self.target
+
+    def retarget(self):
+        """Set the target from the window's mean target and observed / expected block interval."""
+        if len(self.timestamps) < 2:
+            return
+        # Integer milliseconds keep the 256-bit target arithmetic exact.
+        observed = int((self.timestamps[-1] - self.timestamps[0]) * 1000 / (len(self.timestamps) - 1))
+        expected = int(self.target_block_time * 1000)
+        observed = min(max(observed, expected // self.max_adjustment), expected * self.max_adjustment)
+        mean_target = sum(self.targets) // len(self.targets)
+        self.target = min(max(mean_target * observed // expected, 1), MAX_TARGET)
+
+    def get_target(self):
+        """Return the current numeric hash target."""
+        return self.target
+
+    def get_difficulty(self):
+        """Return the difficulty as a (fractional) number of leading zero hex digits."""
+        return (256 - math.log2(self.target + 1)) / 4
+
+    def get_block_intervals(self):
+        """Return the intervals between consecutive blocks in the window, in seconds."""
+        timestamps = list(self.timestamps)
+        return [later - earlier for earlier, later in zip(timestamps, timestamps[1:])]
+
+    def get_block_interval_stats(self):
+        """Summarise block intervals in the window (p50/p95 approximate confirmation latency)."""
+        intervals = sorted(self.get_block_intervals())
+        if not intervals:
+            return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'min': None, 'max': None}
+        return {
+            'count': len(intervals),
+            'mean': sum(intervals) / len(intervals),
+            'p50': percentile(intervals, 0.50),
+            'p95': percentile(intervals, 0.95),
+            'min': intervals[0],
+            'max': intervals[-1]
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    adjuster = DifficultyAdjuster(target_block_time=10, window=10)
+    print(f"Initial difficulty: {adjuster.get_difficulty():.3f}")
+
+    # Blocks arriving every 2 seconds push difficulty up...
+    timestamp = 1700000000
+    for _ in range(10):
+        timestamp += 2
+        adjuster.record_block(timestamp)
+    print(f"After fast blocks: {adjuster.get_difficulty():.3f}")
+
+    # ...and blocks every 30 seconds bring it back down.
+    for _ in range(10):
+        timestamp += 30
+        adjuster.record_block(timestamp)
+    print(f"After slow blocks: {adjuster.get_difficulty():.3f}")
+    print("Block interval stats:", adjuster.get_block_interval_stats())
@@ -0,0 +1,183 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+
+from config import Config
+from hashing import hexdigest
+
+
+class SeenCache:
+    """Bounded LRU set of item hashes this node has already seen."""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size or Config.GOSSIP_SEEN_CACHE_SIZE
+        self.entries = OrderedDict()
+
+    def add(self, item_hash):
+        """Mark a hash as seen; return False if it was already known."""
+        if item_hash in self.entries:
+            self.entries.move_to_end(item_hash)
+            return False
+        self.entries[item_hash] = None
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return True
+
+    def __contains__(self, item_hash):
+        return item_hash in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class Gossip:
+    """Inventory-based gossip on top of async_network.AsyncNetwork.
+
+    New blocks and transactions are announced by hash ('inv') to a random subset of
+    `fanout` peers. A peer that has not seen a hash asks for it ('getdata') and gets the
+    body back ('item'), then announces it onward. Items are addressed by the hash of
+    their body (see hashing), so a receiver can check what it fetched. The seen cache
+    suppresses duplicates, which stops items circulating forever.
+
+    An item is only marked seen once it arrives. Until then it is requested from one
+    announcer at a time; if that peer drops or does not answer within
+    `request_timeout`, it is requested again from another peer that announced it.
+    """
+
+    def __init__(self, network, on_item=None, fanout=None, seen_cache_size=None, request_timeout=None):
+        self.network = network
+        self.on_item = on_item  # Coroutine called as on_item(kind, body, peer) for every new item
+        self.fanout = fanout or Config.GOSSIP_FANOUT
+        self.request_timeout = request_timeout or Config.GOSSIP_REQUEST_TIMEOUT
+        self.seen = SeenCache(seen_cache_size)
+        self.items = OrderedDict()  # hash -> (kind, body), bounded like the seen cache, served on getdata
+        self.requests = {}  # hash -> (peer asked, deadline) of items requested but not yet received
+        self.announcers = {}  # hash -> peers that announced a requested item, in announcement order
+        self.retry_task = None
+        network.register_handler('inv', self.handle_inv)
+        network.register_handler('getdata', self.handle_getdata)
+        network.register_handler('item', self.handle_item)
+
+    @staticmethod
+    def item_hash(body):
+        return hexdigest(body)
+
+    def store(self, item_hash, kind, body):
+        self.items[item_hash] = (kind, body)
+        if len(self.items) > self.seen.max_size:
+            self.items.popitem(last=False)
+
+    def select_peers(self, exclude=None):
+        """Pick up to `fanout` random peers, leaving out the one an item came from."""
+        peers = [peer for peer in self.network.peers.values() if peer is not exclude and not peer.closed]
+        return random.sample(peers, min(self.fanout, len(peers)))
+
+    async def publish(self, kind, body):
+        """Announce a new local block or transaction (its encoded bytes); return its hash."""
+        item_hash = self.item_hash(body)
+        if self.seen.add(item_hash):
+            self.store(item_hash, kind, body)
+            await self.announce(kind, item_hash)
+        return item_hash
+
+    async def announce(self, kind, item_hash, exclude=None):
+        await self.network.broadcast({'type': 'inv', 'items': [[kind, item_hash]]}, peers=self.select_peers(exclude))
+
+    def request_failed(self, item_hash, now):
+        request = self.requests.get(item_hash)
+        return request is not None and (request[0].closed or request[1] <= now)
+
+    async def handle_inv(self, peer, message, body):
+        """Request the announced items this node has not seen yet."""
+        now = time.monotonic()
+        wanted = []
+        for _, item_hash in message['items']:
+            if item_hash in self.seen:
+                continue
+            announcers = self.announcers.setdefault(item_hash, [])
+            if peer not in announcers and len(announcers) < self.fanout:
+                announcers.append(peer)
+            # One request in flight per item stops it being fetched from every announcer
+            if item_hash not in self.requests or self.request_failed(item_hash, now):
+                self.requests[item_hash] = (peer, now + self.request_timeout)
+                wanted.append(item_hash)
+        if wanted:
+            self.start_retries()
+            await peer.send({'type': 'getdata', 'hashes': wanted})
+
+    def start_retries(self):
+        if self.retry_task is None or self.retry_task.done():
+            self.retry_task = asyncio.get_running_loop().create_task(self.retry_requests())
+
+    async def retry_requests(self):
+        """Until no request is in flight, re-request timed-out items from another announcer."""
+        while self.requests:
+            await asyncio.sleep(min(deadline for _, deadline in self.requests.values()) - time.monotonic())
+            now = time.monotonic()
+            retries = {}
+            for item_hash in [item_hash for item_hash in self.requests if self.request_failed(item_hash, now)]:
+                failed_peer = self.requests.pop(item_hash)[0]
+                announcers = [peer for peer in self.announcers.get(item_hash, ())
+                              if peer is not failed_peer and not peer.closed]
+                if not announcers:
+                    # Nobody else has it; the next announcement requests it again
+                    self.announcers.pop(item_hash, None)
+                    continue
+                self.announcers[item_hash] = announcers[1:] + [announcers[0]]
+                self.requests[item_hash] = (announcers[0], now + self.request_timeout)
+                retries.setdefault(announcers[0], []).append(item_hash)
+            for peer, hashes in retries.items():
+                await peer.send({'type': 'getdata', 'hashes': hashes})
+
+    async def handle_getdata(self, peer, message, body):
+        """Send back the requested items this node still holds."""
+        for item_hash in message['hashes']:
+            item = self.items.get(item_hash)
+            if item is not None:
+                kind, item_body = item
+                await peer.send({'type': 'item', 'kind': kind, 'hash': item_hash}, item_body)
+
+    async def handle_item(self, peer, message, body):
+        """Accept a fetched item, hand it to the application and pass the announcement on."""
+        item_hash = message['hash']
+        if self.item_hash(body) != item_hash or not self.seen.add(item_hash):
+            return
+        self.requests.pop(item_hash, None)
+        self.announcers.pop(item_hash, None)
+        kind = message['kind']
+        self.store(item_hash, kind, body)
+        if self.on_item is not None:
+            await self.on_item(kind, body, peer)
+        await self.announce(kind, item_hash, exclude=peer)
+
+
+# Example usage
+if __name__ == "__main__":
+    import asyncio
+
+    from async_network import AsyncNetwork
+    from transaction import Transaction
+
+    async def main():
+        nodes = [AsyncNetwork(port=0) for _ in range(5)]
+        gossips = []
+        for node in nodes:
+            await node.start_server()
+
+            async def on_item(kind, body, peer, port=node.port):
+                print(f"Node {port} received {kind}: {Transaction.from_bytes(body).transaction_id[:16]}...")
+
+            gossips.append(Gossip(node, on_item=on_item, fanout=2))
+
+        # Connect the nodes in a ring; gossip carries items around it.
+        for i, node in enumerate(nodes):
+            await node.add_peer((nodes[(i + 1) % len(nodes)].host, nodes[(i + 1) % len(nodes)].port))
+
+        tx = Transaction(sender="Alice", recipient="Bob", amount=100)
+        await gossips[0].publish('tx', tx.to_bytes())
+        await asyncio.sleep(0.5)
+        for node in nodes:
+            await node.close()
+
+    asyncio.run(main())
@@ -1,25 +1,29 @@
 # src/blockchain/piOpenChain/identity_management.py
 
-from web3 import Web3
 import json
 
+from transaction_sender import get_sender
+from web3_provider import get_web3
+
 class IdentityManagement:
     def __init__(self, provider_url, contract_address, abi):
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+        self.web3 = get_web3(provider_url)
         self.contract = self.web3.eth.contract(address=contract_address, abi=abi)
+        self.sender = get_sender(self.web3)
 
-    def create_identity(self, account, private_key, identity_data):
-        """Create a new identity on the blockchain."""
-        nonce = self.web3.eth.getTransactionCount(account)
-        transaction = self.contract.functions.createIdentity(identity_data).buildTransaction({
+    def submit_identity(self, account, private_key, identity_data):
+        """Send a createIdentity transaction without waiting; return a Future for its receipt."""
+        transaction = self.contract.functions.createIdentity(identity_data).build_transaction({
             'from': account,
             'gas': 2000000,
-            'gasPrice': self.web3.toWei('50', 'gwei'),
-            'nonce': nonce
+            'gasPrice': self.web3.to_wei('50', 'gwei'),
+            'chainId': self.sender.chain_id
         })
-        signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-        txn_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-        return self.web3.eth.waitForTransactionReceipt(txn_hash)
+        return self.sender.submit(account, private_key, transaction)
+
+    def create_identity(self, account, private_key, identity_data):
+        """Create a new identity on the blockchain."""
+        return self.submit_identity(account, private_key, identity_data).result()
 
     def get_identity(self, identity_id):
         """Retrieve identity information from the blockchain."""
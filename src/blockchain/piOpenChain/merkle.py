@@ -0,0 +1,94 @@
+from hashing import digest, hash_many
+
+# Domain separation between leaves and inner nodes, so a transaction can never be
+# passed off as an inner node (and vice versa).
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+EMPTY_ROOT = bytes(32)
+
+
+def hash_leaves(transactions):
+    """Hash a batch of transactions (Transaction objects or encoded bytes) into leaf hashes."""
+    return hash_many([tx if isinstance(tx, (bytes, bytearray)) else tx.to_bytes() for tx in transactions],
+                     prefix=LEAF_PREFIX)
+
+
+def hash_level(level):
+    """Hash one tree level into the next; an odd last node is promoted unchanged."""
+    parents = hash_many([level[i] + level[i + 1] for i in range(0, len(level) - 1, 2)], prefix=NODE_PREFIX)
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(transactions):
+    """Return the hex Merkle root of a list of transactions, level by level in batches."""
+    level = hash_leaves(transactions)
+    if not level:
+        return EMPTY_ROOT.hex()
+    while len(level) > 1:
+        level = hash_level(level)
+    return level[0].hex()
+
+
+class MerkleTree:
+    """Merkle tree over a block's transactions, kept whole so proofs can be produced."""
+
+    def __init__(self, transactions):
+        self.levels = [hash_leaves(transactions)]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(hash_level(self.levels[-1]))
+
+    @property
+    def root(self):
+        """Hex Merkle root of the tree."""
+        return self.levels[-1][0].hex() if self.levels[0] else EMPTY_ROOT.hex()
+
+    def get_proof(self, index):
+        """Return the inclusion proof for the leaf at `index`.
+
+        The proof is a list of (side, sibling hex hash) pairs from the leaf up, where
+        side says whether the sibling sits to the 'left' or 'right'. Levels where the
+        node was promoted without a sibling contribute nothing, so the proof has at
+        most ceil(log2(n)) steps.
+        """
+        if not 0 <= index < len(self.levels[0]):
+            raise IndexError(f"Leaf index {index} out of range.")
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append(('left' if sibling < index else 'right', level[sibling].hex()))
+            index //= 2
+        return proof
+
+
+def verify_proof(transaction, proof, root):
+    """Check that a transaction (object or encoded bytes) is included under a hex Merkle root."""
+    node = hash_leaves([transaction])[0]
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        if side == 'left':
+            node = digest(NODE_PREFIX + sibling + node)
+        else:
+            node = digest(NODE_PREFIX + node + sibling)
+    return node.hex() == root
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    from transaction import Transaction
+
+    transactions = [Transaction(sender=f"sender{i}", recipient="Bob", amount=i + 1) for i in range(100000)]
+
+    start = time.perf_counter()
+    root = merkle_root(transactions)
+    print(f"Merkle root of {len(transactions)} transactions: {root} ({time.perf_counter() - start:.3f} s)")
+
+    tree = MerkleTree(transactions)
+    proof = tree.get_proof(4242)
+    print(f"Proof for transaction 4242 has {len(proof)} steps")
+    print("Proof valid?", verify_proof(transactions[4242], proof, tree.root))
+    print("Proof valid for another transaction?", verify_proof(transactions[4243], proof, tree.root))
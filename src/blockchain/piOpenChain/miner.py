@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import queue
+
+import hashing
+from config import Config
+from utils import NONCE, block_hash_prefix
+
+# Number of nonces a worker tries between checks of the shared stop flag.
+CANCEL_CHECK_INTERVAL = 4096
+
+
+def difficulty_to_target(difficulty):
+    """Convert a difficulty (number of leading zero hex digits) to a numeric hash target."""
+    return (1 << (256 - 4 * difficulty)) - 1
+
+
+def target_to_bytes(target):
+    """Encode a numeric target as 32 big-endian bytes, comparable directly with raw digests."""
+    return min(target, (1 << 256) - 1).to_bytes(32, 'big')
+
+
+def search_nonces(prefix, target_bytes, start, step, stop_event=None, limit=None):
+    """Search nonces start, start + step, ... for a digest at or below the target.
+
+    The prefix is hashed once; each candidate copies that hash state and only feeds
+    in the fixed-width nonce. Returns (nonce, hex hash), or None if stopped or `limit`
+    nonces were tried without success.
+    """
+    midstate = hashing.new(prefix)
+    pack_nonce = NONCE.pack
+    nonce = start
+    tried = 0
+    while limit is None or tried < limit:
+        for _ in range(CANCEL_CHECK_INTERVAL):
+            candidate = midstate.copy()
+            candidate.update(pack_nonce(nonce))
+            digest = candidate.digest()
+            if digest <= target_bytes:
+                return nonce, digest.hex()
+            nonce += step
+        tried += CANCEL_CHECK_INTERVAL
+        if stop_event is not None and stop_event.is_set():
+            return None
+    return None
+
+
+def mining_worker(prefix, target_bytes, start, step, stop_event, results):
+    """Process entry point: search an interleaved slice of the nonce space."""
+    solution = search_nonces(prefix, target_bytes, start, step, stop_event)
+    if solution is not None:
+        results.put(solution)
+        stop_event.set()
+
+
+class Miner:
+    """Proof-of-work search that splits the nonce space across worker processes.
+
+    Worker k tries nonces k, k + W, k + 2W, ... for W workers, so together they scan
+    the nonce space in order. The first worker to find a solution sets a shared stop
+    flag that the others check every CANCEL_CHECK_INTERVAL nonces.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or Config.MINING_WORKERS or os.cpu_count() or 1
+        self.context = multiprocessing.get_context()
+
+    def mine(self, index, previous_hash, timestamp, data, target, merkle_root=None):
+        """Find a nonce whose block hash is at or below `target`; return (nonce, hex hash)."""
+        prefix = block_hash_prefix(index, previous_hash, timestamp, data, merkle_root)
+        target_bytes = target_to_bytes(target)
+        if self.workers == 1:
+            return search_nonces(prefix, target_bytes, 0, 1)
+
+        stop_event = self.context.Event()
+        results = self.context.Queue()
+        processes = [
+            self.context.Process(
+                target=mining_worker,
+                args=(prefix, target_bytes, start, self.workers, stop_event, results),
+                daemon=True
+            )
+            for start in range(self.workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            while True:
+                try:
+                    return results.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("Mining workers exited without finding a solution.")
+        finally:
+            stop_event.set()
+            for process in processes:
+                process.join()
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    miner = Miner()
+    start = time.perf_counter()
+    nonce, block_hash = miner.mine(2, '0' * 64, int(time.time()), "Transaction data", difficulty_to_target(5))
+    print(f"Found nonce {nonce} with hash {block_hash} in {time.perf_counter() - start:.2f} s "
+          f"using {miner.workers} worker(s)")
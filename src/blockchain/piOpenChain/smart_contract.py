@@ -1,26 +1,293 @@
+import ast
+import builtins
+import copy
 import json
-import hashlib
+import os
+import time
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+
+from config import Config
+from hashing import hexdigest
+
+# Builtins contract code may use; anything else (open, __import__, eval, ...) is unavailable.
+SAFE_BUILTINS = {
+    name: getattr(builtins, name) for name in (
+        'abs', 'all', 'any', 'bool', 'dict', 'divmod', 'enumerate', 'filter', 'float', 'int', 'isinstance',
+        'len', 'list', 'map', 'max', 'min', 'pow', 'range', 'reversed', 'round', 'set', 'sorted', 'str',
+        'sum', 'tuple', 'zip', 'True', 'False', 'None',
+        'Exception', 'ArithmeticError', 'KeyError', 'IndexError', 'NameError', 'TypeError', 'ValueError',
+        'ZeroDivisionError'
+    )
+}
+
+# Compiled contract code objects, keyed by contract ID (the hash of the source).
+CODE_CACHE = {}
+
+# Name of the step counter injected into compiled contracts; contract code cannot spell it.
+STEP_FUNCTION = '__step__'
+
+
+class ContractLimitExceeded(BaseException):
+    """Raised inside a contract that runs past its step or time limit.
+
+    Derives from BaseException so `except Exception` in contract code cannot swallow it;
+    handlers that could (bare `except:`, `except BaseException`) are rejected at deploy
+    time, and a call whose limiter ran out fails even if the exception was swallowed.
+    """
+
+# Exception names contract code may not catch, as they would catch ContractLimitExceeded.
+UNCATCHABLE = {'BaseException', 'ContractLimitExceeded'}
+
+# Attributes contract code may use on `state`: the mapping methods, which all go through the snapshot.
+STATE_METHODS = {'get', 'keys', 'values', 'items', 'pop', 'popitem', 'setdefault', 'update', 'clear'}
+
+
+def check_contract_code(tree):
+    """Reject imports, dunder names, private attributes, `state` attributes other than its
+    mapping methods, and handlers that catch the limit exception."""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            raise ValueError("Contracts cannot import modules.")
+        if isinstance(node, ast.ExceptHandler):
+            if node.type is None:
+                raise ValueError("Contracts cannot use a bare except.")
+            caught = node.type.elts if isinstance(node.type, ast.Tuple) else [node.type]
+            for name in caught:
+                if isinstance(name, ast.Name) and name.id in UNCATCHABLE:
+                    raise ValueError(f"Contracts cannot catch {name.id}.")
+        if isinstance(node, ast.Attribute):
+            if node.attr.startswith('_'):
+                raise ValueError(f"Contracts cannot use the attribute {node.attr}.")
+            if isinstance(node.value, ast.Name) and node.value.id == 'state' and node.attr not in STATE_METHODS:
+                raise ValueError(f"Contracts cannot use state.{node.attr}.")
+        elif isinstance(node, ast.Name) and node.id.startswith('__'):
+            raise ValueError(f"Contracts cannot use the name {node.id}.")
+
+
+class StepInjector(ast.NodeTransformer):
+    """Count a step at the top of every loop iteration, function call and comprehension item."""
+
+    def step_call(self):
+        return ast.Call(func=ast.Name(id=STEP_FUNCTION, ctx=ast.Load()), args=[], keywords=[])
+
+    def count_in_body(self, node):
+        self.generic_visit(node)
+        node.body.insert(0, ast.Expr(self.step_call()))
+        return node
+
+    visit_For = visit_While = visit_FunctionDef = count_in_body
+
+    def visit_comprehension(self, node):
+        self.generic_visit(node)
+        node.ifs.insert(0, self.step_call())  # The step counter returns True, so the filter passes
+        return node
+
+
+def compile_contract(code, contract_id):
+    """Return the code object for a contract, compiling and checking it only the first time."""
+    compiled = CODE_CACHE.get(contract_id)
+    if compiled is None:
+        if len(code.encode()) > Config.MAX_CONTRACT_SIZE:
+            raise ValueError(f"Contract code exceeds {Config.MAX_CONTRACT_SIZE} bytes.")
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            raise ValueError(f"Invalid contract code: {e}") from e
+        check_contract_code(tree)
+        tree = ast.fix_missing_locations(StepInjector().visit(tree))
+        compiled = compile(tree, f"<contract {contract_id}>", 'exec')
+        CODE_CACHE[contract_id] = compiled
+    return compiled
+
+
+class StepLimiter:
+    """Per-call step and time budget, called by the step counter injected into contract code."""
+
+    def __init__(self, max_steps, time_limit):
+        self.steps_left = max_steps
+        self.deadline = time.perf_counter() + time_limit
+        self.error = None  # Set once a limit is hit; the call fails even if the contract swallows it
+
+    def __call__(self):
+        self.steps_left -= 1
+        if self.steps_left < 0:
+            self.error = self.error or "Contract exceeded its step limit."
+            raise ContractLimitExceeded(self.error)
+        if self.steps_left % 1000 == 0 and time.perf_counter() > self.deadline:
+            self.steps_left = 0  # Every further step raises too, even if the contract catches this
+            self.error = "Contract exceeded its time limit."
+            raise ContractLimitExceeded(self.error)
+        return True
+
+
+class ContractStateStore:
+    """Contract state kept apart from contract code, one JSON file per contract.
+
+    States are loaded on first use and written back by `flush`, so repeated calls to
+    a hot contract work on the in-memory dict. Without a path the store is memory-only.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.states = {}
+        self.dirty = set()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def state_path(self, contract_id):
+        return os.path.join(self.path, f"{contract_id}.json")
+
+    def get(self, contract_id):
+        """Return the (mutable) state dict of a contract, loading it from disk if needed."""
+        state = self.states.get(contract_id)
+        if state is None:
+            state = {}
+            if self.path and os.path.exists(self.state_path(contract_id)):
+                with open(self.state_path(contract_id)) as state_file:
+                    state = json.load(state_file)
+            self.states[contract_id] = state
+        return state
+
+    def mark_dirty(self, contract_id):
+        self.dirty.add(contract_id)
+
+    def flush(self):
+        """Write every changed contract state to disk atomically."""
+        if self.path:
+            for contract_id in self.dirty:
+                temporary_path = self.state_path(contract_id) + '.tmp'
+                with open(temporary_path, 'w') as state_file:
+                    json.dump(self.states[contract_id], state_file)
+                os.replace(temporary_path, self.state_path(contract_id))
+        self.dirty.clear()
+
+
+class StateSnapshot(MutableMapping):
+    """Copy-on-write view of a contract's state for one call.
+
+    Writes and deletes go to an overlay; reads fall through to the committed state.
+    Mutable values (dicts, lists, sets) are deep-copied into the overlay the first
+    time they are read, so in-place changes never reach the committed state either.
+    `_commit` applies the overlay; dropping the snapshot rolls the call back. Contract
+    code gets the snapshot as `state`, so everything but the mapping interface is
+    underscore-private, which check_contract_code keeps contracts from reaching.
+    """
+
+    _DELETED = object()
+
+    def __init__(self, base):
+        self._base = base
+        self._changes = {}  # key -> new value, or _DELETED
+
+    def __getitem__(self, key):
+        if key in self._changes:
+            value = self._changes[key]
+            if value is self._DELETED:
+                raise KeyError(key)
+            return value
+        value = self._base[key]
+        if isinstance(value, (dict, list, set)):
+            value = self._changes[key] = copy.deepcopy(value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._changes[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._changes[key] = self._DELETED
+
+    def __contains__(self, key):
+        if key in self._changes:
+            return self._changes[key] is not self._DELETED
+        return key in self._base
+
+    def __iter__(self):
+        for key in self._base:
+            if key not in self._changes:
+                yield key
+        for key, value in self._changes.items():
+            if value is not self._DELETED:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def _commit(self):
+        """Apply the overlay to the committed state; return the keys it touched."""
+        for key, value in self._changes.items():
+            if value is self._DELETED:
+                self._base.pop(key, None)
+            else:
+                self._base[key] = value
+        touched = self._changes.keys()
+        self._changes = {}
+        return touched
+
 
 class SmartContract:
-    def __init__(self, code):
+    """A contract compiled once at deploy time and run in a fresh namespace per call.
+
+    Each call sees only `state` (its dict in the state store), `args` and a restricted
+    set of builtins. It is stopped after `max_steps` steps (loop iterations, function
+    calls and comprehension items) or `time_limit` seconds; a single builtin call still
+    runs to completion. The restrictions keep contracts from reaching the host by
+    accident; they are not a hardened security sandbox.
+    """
+
+    def __init__(self, code, state_store=None, max_steps=None, time_limit=None):
         self.code = code  # The code of the smart contract
-        self.state = {}  # State variables for the contract
         self.contract_id = self.calculate_contract_id()
+        self.compiled = compile_contract(code, self.contract_id)
+        self.state_store = state_store if state_store is not None else ContractStateStore()
+        self.max_steps = max_steps or Config.CONTRACT_MAX_STEPS
+        self.time_limit = time_limit or Config.CONTRACT_TIME_LIMIT
 
     def calculate_contract_id(self):
         """Calculate a unique contract ID based on the contract code."""
-        return hashlib.sha256(self.code.encode()).hexdigest()
+        return hexdigest(self.code.encode())
+
+    @property
+    def state(self):
+        """State variables for the contract."""
+        return self.state_store.get(self.contract_id)
+
+    def call(self, args, touched=None):
+        """Run one call against a snapshot of the state, committing it only if the call succeeds.
+
+        Returns None on success or the error message; a failed call leaves the state
+        exactly as it was. Keys the call changed are added to `touched` if given.
+        """
+        snapshot = StateSnapshot(self.state)
+        limiter = StepLimiter(self.max_steps, self.time_limit)
+        namespace = {
+            '__builtins__': SAFE_BUILTINS,
+            STEP_FUNCTION: limiter,
+            'state': snapshot,
+            'args': args
+        }
+        try:
+            exec(self.compiled, namespace)
+        except (Exception, ContractLimitExceeded) as e:
+            return limiter.error or str(e) or type(e).__name__
+        if limiter.error is not None:
+            # e.g. a `return` in a `finally` block dropped the limit exception
+            return limiter.error
+        changed = snapshot._commit()
+        if touched is not None:
+            touched.update(changed)
+        self.state_store.mark_dirty(self.contract_id)
+        return None
 
     def execute(self, *args):
         """Execute the smart contract code with the provided arguments."""
-        # For simplicity, we will use eval to execute the code.
-        # In a real-world scenario, you would use a more secure method.
-        try:
-            exec(self.code, self.state, {'args': args})
-            return self.state
-        except Exception as e:
-            print(f"Error executing contract: {e}")
+        error = self.call(args)
+        if error is not None:
+            print(f"Error executing contract: {error}")
             return None
+        return self.state
 
     def get_state(self):
         """Return the current state of the smart contract."""
@@ -33,13 +300,42 @@ class SmartContract:
             'state': self.state
         }, indent=4)
 
+def run_contract_calls(code, state, calls, max_steps, time_limit):
+    """Process entry point: apply one contract's calls in order to a copy of its state.
+
+    Returns ({key: value} for changed keys, deleted keys, one error or None per call).
+    """
+    contract = SmartContract(code, max_steps=max_steps, time_limit=time_limit)
+    contract.state_store.states[contract.contract_id] = state
+    touched = set()
+    errors = [contract.call(args, touched) for args in calls]
+    changes = {key: state[key] for key in touched if key in state}
+    return changes, [key for key in touched if key not in state], errors
+
+
 class SmartContractManager:
-    def __init__(self):
+    def __init__(self, state_store=None, workers=None, parallel_min_calls=None):
         self.contracts = {}
+        self.state_store = state_store if state_store is not None else ContractStateStore()
+        self.workers = workers or Config.CONTRACT_WORKERS or os.cpu_count() or 1
+        self.parallel_min_calls = parallel_min_calls or Config.CONTRACT_PARALLEL_MIN_CALLS
+        self.executor = None  # Process pool, started by the first batch that runs in parallel
+
+    def get_executor(self):
+        """Return the process pool, starting it on first use; it is reused by later batches."""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self.executor
+
+    def close(self):
+        """Shut down the process pool, if one was started."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
 
     def deploy_contract(self, code):
         """Deploy a new smart contract and store it."""
-        contract = SmartContract(code)
+        contract = SmartContract(code, self.state_store)
         self.contracts[contract.contract_id] = contract
         return contract.contract_id
 
@@ -52,6 +348,52 @@ class SmartContractManager:
             print("Contract not found.")
             return None
 
+    def execute_batch(self, calls):
+        """Run many (contract_id, args) calls, e.g. a block's contract calls, in one pass.
+
+        Every call is committed or rolled back on its own. Calls to the same contract
+        run in the order given; contracts cannot touch each other's state, so the
+        calls of different contracts run concurrently across a process pool, which is
+        started once and kept for later batches. Batches smaller than
+        `parallel_min_calls` run serially. Returns one entry per call, in order: None if
+        it committed, otherwise the error.
+        """
+        groups = {}  # contract_id -> positions of its calls
+        errors = [None] * len(calls)
+        for position, (contract_id, args) in enumerate(calls):
+            if contract_id in self.contracts:
+                groups.setdefault(contract_id, []).append(position)
+            else:
+                errors[position] = "Contract not found."
+
+        if self.workers == 1 or len(groups) < 2 or len(calls) < self.parallel_min_calls:
+            for contract_id, positions in groups.items():
+                contract = self.contracts[contract_id]
+                for position in positions:
+                    errors[position] = contract.call(tuple(calls[position][1]))
+            return errors
+
+        executor = self.get_executor()
+        futures = {
+            contract_id: executor.submit(
+                run_contract_calls, self.contracts[contract_id].code, self.state_store.get(contract_id),
+                [tuple(calls[position][1]) for position in positions],
+                self.contracts[contract_id].max_steps, self.contracts[contract_id].time_limit
+            )
+            for contract_id, positions in groups.items()
+        }
+        for contract_id, future in futures.items():
+            changes, deleted, group_errors = future.result()
+            state = self.state_store.get(contract_id)
+            state.update(changes)
+            for key in deleted:
+                state.pop(key, None)
+            if changes or deleted:
+                self.state_store.mark_dirty(contract_id)
+            for position, error in zip(groups[contract_id], group_errors):
+                errors[position] = error
+        return errors
+
     def get_contract_state(self, contract_id):
         """Get the state of a deployed smart contract."""
         contract = self.contracts.get(contract_id)
@@ -74,7 +416,8 @@ def get_value():
     return state.get('value', None)
 
 # Example usage
-set_value(args[0])
+if args:
+    set_value(args[0])
 """
 
     # Deploy the smart contract
@@ -91,3 +434,23 @@ set_value(args[0])
     # Execute the contract to get the value
     value = manager.execute_contract(contract_id)
     print("Value from contract:", value)
+
+    # A runaway contract is stopped by its step limit
+    loop_id = manager.deploy_contract("while True:\n    state['spins'] = state.get('spins', 0) + 1\n")
+    print("Runaway contract result:", manager.execute_contract(loop_id))
+
+    # A batch commits each call on its own: the failing transfer leaves no trace
+    token_id = manager.deploy_contract(
+        "if args[0] == 'mint':\n    state[args[1]] = state.get(args[1], 0) + args[2]\n"
+        "else:\n    state[args[1]] -= args[3]\n    if state[args[1]] < 0:\n        raise ValueError('insufficient')\n"
+        "    state[args[2]] = state.get(args[2], 0) + args[3]\n"
+    )
+    results = manager.execute_batch([
+        (token_id, ('mint', 'alice', 10)),
+        (token_id, ('transfer', 'alice', 'bob', 4)),
+        (token_id, ('transfer', 'alice', 'bob', 40)),
+        (contract_id, (7,)),
+    ])
+    print("Batch results:", results)
+    print("Token state:", manager.get_contract_state(token_id))
+    manager.close()
@@ -0,0 +1,192 @@
+import json
+import os
+from collections import deque
+
+from config import Config
+from utils import to_units
+
+
+class AccountState:
+    """Account balances and nonces, built by applying the chain block by block.
+
+    Each account maps to a balance in minimal units and the nonce its next transaction
+    must carry, so checking a transaction is two dict lookups. Every applied block
+    leaves an undo record (the prior values of the accounts it touched) so recent
+    blocks can be rolled back for a reorg. Deeper rollbacks restore the nearest
+    on-disk snapshot and replay blocks from the chain.
+
+    A block's first transaction may be a coinbase transaction from
+    Config.COINBASE_ADDRESS paying at most the mining reward plus the block's fees.
+    """
+
+    def __init__(self, path=None, snapshot_interval=None, undo_depth=None):
+        self.path = path
+        self.snapshot_interval = snapshot_interval or Config.STATE_SNAPSHOT_INTERVAL
+        self.undo_log = deque(maxlen=undo_depth or Config.STATE_UNDO_DEPTH)  # (height, {address: (balance, nonce)})
+        self.reset()
+        if path:
+            os.makedirs(path, exist_ok=True)
+            heights = self.snapshot_heights()
+            if heights:
+                self.load_snapshot(heights[-1])
+
+    def reset(self):
+        """Return to the state before the genesis block."""
+        self.balances = {address: to_units(amount) for address, amount in Config.GENESIS_ALLOCATIONS.items()}
+        self.nonces = {}
+        self.height = -1
+        self.undo_log.clear()
+
+    def get_balance(self, address):
+        return self.balances.get(address, 0)
+
+    def get_nonce(self, address):
+        """Return the nonce the next transaction from `address` must carry."""
+        return self.nonces.get(address, 0)
+
+    def validate_transaction(self, transaction, pending_spend=0, pending_nonces=()):
+        """O(1) check that the sender can pay for a transaction on top of its pending ones."""
+        if transaction.sender == Config.COINBASE_ADDRESS:
+            print("Coinbase transactions cannot be submitted.")
+            return False
+        if transaction.nonce < self.get_nonce(transaction.sender) or transaction.nonce in pending_nonces:
+            print("Transaction nonce already used.")
+            return False
+        if self.get_balance(transaction.sender) < pending_spend + transaction.amount + transaction.fee:
+            print("Insufficient balance.")
+            return False
+        return True
+
+    def check_transactions(self, transactions):
+        """Return the (balances, nonces) a block's transactions would write; raise ValueError if any is invalid."""
+        balances = {}
+        nonces = {}
+
+        def balance(address):
+            return balances[address] if address in balances else self.get_balance(address)
+
+        fees = sum(tx.fee for tx in transactions if tx.sender != Config.COINBASE_ADDRESS)
+        for position, tx in enumerate(transactions):
+            if tx.sender == Config.COINBASE_ADDRESS:
+                if position != 0 or tx.amount > to_units(Config.MINING_REWARD) + fees:
+                    raise ValueError(f"Invalid coinbase transaction {tx.transaction_id}.")
+            else:
+                expected_nonce = nonces.get(tx.sender, self.get_nonce(tx.sender))
+                if tx.nonce != expected_nonce:
+                    raise ValueError(f"Transaction {tx.transaction_id} has nonce {tx.nonce}, expected {expected_nonce}.")
+                if balance(tx.sender) < tx.amount + tx.fee:
+                    raise ValueError(f"Insufficient balance for transaction {tx.transaction_id}.")
+                balances[tx.sender] = balance(tx.sender) - tx.amount - tx.fee
+                nonces[tx.sender] = expected_nonce + 1
+            balances[tx.recipient] = balance(tx.recipient) + tx.amount
+        return balances, nonces
+
+    def apply_block(self, block):
+        """Apply a block's transactions; raise ValueError and leave the state untouched if any is invalid."""
+        height = block.index - 1
+        if height != self.height + 1:
+            raise ValueError(f"Expected block at height {self.height + 1}, got {height}.")
+
+        balances, nonces = self.check_transactions(block.transactions)
+        touched = set(balances) | set(nonces)
+        self.undo_log.append((height, {
+            address: (self.balances.get(address), self.nonces.get(address)) for address in touched
+        }))
+        self.balances.update(balances)
+        self.nonces.update(nonces)
+        self.height = height
+
+        if self.path and (height + 1) % self.snapshot_interval == 0:
+            self.save_snapshot()
+
+    def sync(self, chain):
+        """Apply every block of `chain` above the current height."""
+        for height in range(self.height + 1, len(chain)):
+            self.apply_block(chain[height])
+
+    def rollback(self, height, chain=None):
+        """Roll the state back so that `height` is the last applied block.
+
+        Uses undo records when they reach back far enough; otherwise restores the
+        newest snapshot at or below `height` and replays blocks from `chain`.
+        Snapshots above `height` belong to the abandoned blocks and are deleted.
+        """
+        if height > self.height:
+            raise ValueError(f"Cannot roll back to height {height} above current height {self.height}.")
+        for snapshot_height in self.snapshot_heights():
+            if snapshot_height > height:
+                os.remove(self.snapshot_path(snapshot_height))
+        if self.undo_log and self.undo_log[0][0] <= height + 1:
+            while self.height > height:
+                undo_height, previous = self.undo_log.pop()
+                for address, (balance, nonce) in previous.items():
+                    self.restore(self.balances, address, balance)
+                    self.restore(self.nonces, address, nonce)
+                self.height = undo_height - 1
+            return
+
+        if chain is None:
+            raise ValueError("Rollback beyond the undo log needs the chain to replay from a snapshot.")
+        snapshots = [h for h in self.snapshot_heights() if h <= height]
+        if snapshots:
+            self.load_snapshot(snapshots[-1])
+        else:
+            self.reset()
+        for replay_height in range(self.height + 1, height + 1):
+            self.apply_block(chain[replay_height])
+
+    @staticmethod
+    def restore(values, address, value):
+        if value is None:
+            values.pop(address, None)
+        else:
+            values[address] = value
+
+    def snapshot_path(self, height):
+        return os.path.join(self.path, f"state-{height:010d}.json")
+
+    def snapshot_heights(self):
+        """Return the heights of the snapshots on disk, oldest first."""
+        if not self.path:
+            return []
+        return sorted(int(name[6:16]) for name in os.listdir(self.path)
+                      if name.startswith('state-') and name.endswith('.json'))
+
+    def save_snapshot(self):
+        """Write the current state to disk atomically and prune old snapshots."""
+        temporary_path = self.snapshot_path(self.height) + '.tmp'
+        with open(temporary_path, 'w') as snapshot_file:
+            json.dump({'height': self.height, 'balances': self.balances, 'nonces': self.nonces}, snapshot_file)
+        os.replace(temporary_path, self.snapshot_path(self.height))
+        for old_height in self.snapshot_heights()[:-Config.STATE_SNAPSHOTS_KEPT]:
+            os.remove(self.snapshot_path(old_height))
+
+    def load_snapshot(self, height):
+        """Replace the in-memory state with the snapshot taken at `height`."""
+        with open(self.snapshot_path(height)) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+        self.balances = snapshot['balances']
+        self.nonces = snapshot['nonces']
+        self.height = snapshot['height']
+        self.undo_log.clear()
+
+
+# Example usage
+if __name__ == "__main__":
+    from blockchain import Blockchain
+    from transaction import Transaction
+
+    state = AccountState()
+    blockchain = Blockchain(state=state)
+
+    coinbase = Transaction(Config.COINBASE_ADDRESS, "Alice", to_units(Config.MINING_REWARD), fee=0)
+    blockchain.create_block("Reward", blockchain.get_last_block().hash, [coinbase])
+    print("Alice's balance:", state.get_balance("Alice"))
+
+    payment = Transaction("Alice", "Bob", to_units(10), nonce=state.get_nonce("Alice"))
+    print("Payment valid?", state.validate_transaction(payment))
+    blockchain.create_block("Payment", blockchain.get_last_block().hash, [payment])
+    print("Balances after payment:", state.balances)
+
+    state.rollback(1)
+    print("Balances after rolling back the payment:", state.balances)
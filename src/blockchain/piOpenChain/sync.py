@@ -0,0 +1,330 @@
+import asyncio
+import itertools
+import struct
+from collections import deque
+
+from blockchain import Block
+from config import Config
+from merkle import merkle_root
+from transaction import Transaction
+from utils import calculate_block_hash
+
+# Items in 'headers' and 'bodies' responses are each a u32 length followed by the encoded item.
+ITEM_LENGTH = struct.Struct('<I')
+
+
+def encode_items(items):
+    """Concatenate byte strings, each prefixed with its length."""
+    return b''.join(ITEM_LENGTH.pack(len(item)) + item for item in items)
+
+
+def decode_items(buffer):
+    """Split length-prefixed items back out of a buffer, as zero-copy views."""
+    buffer = memoryview(buffer)
+    items = []
+    offset = 0
+    while offset < len(buffer):
+        (length,) = ITEM_LENGTH.unpack_from(buffer, offset)
+        offset += ITEM_LENGTH.size
+        items.append(buffer[offset:offset + length])
+        offset += length
+    return items
+
+
+def block_header(block):
+    """Return a copy of a block without its transactions; the Merkle root still commits to them."""
+    return Block(block.index, block.previous_hash, block.timestamp, block.data, block.hash,
+                 block.nonce, None, block.merkle_root)
+
+
+def encode_body(block):
+    """Encode a block's transactions, the part of a block a header leaves out."""
+    return encode_items(tx.to_bytes() for tx in block.transactions)
+
+
+def header_is_valid(header, previous):
+    """Check a header's position, its link to the previous header and its hash."""
+    return (header.index == previous.index + 1 and header.previous_hash == previous.hash and
+            header.hash == calculate_block_hash(header.index, header.previous_hash, header.timestamp,
+                                                header.data, header.nonce, header.merkle_root))
+
+
+def attach_body(header, body):
+    """Rebuild a block from a validated header and its downloaded body; return None if they do not match."""
+    transactions = [Transaction.from_bytes(item) for item in decode_items(body)]
+    if (header.merkle_root is not None or transactions) and header.merkle_root != merkle_root(transactions):
+        return None
+    return Block(header.index, header.previous_hash, header.timestamp, header.data, header.hash,
+                 header.nonce, transactions, header.merkle_root)
+
+
+class BodyDownload:
+    """State of one parallel body download: queued windows, failures and the reorder buffer."""
+
+    def __init__(self, headers, start_height, window_size, max_buffered):
+        self.headers = headers  # headers[i] is the header at start_height + i
+        self.stop_height = start_height + len(headers)
+        self.queue = deque((lo, min(lo + window_size, self.stop_height))
+                           for lo in range(start_height, self.stop_height, window_size))
+        self.lookahead = window_size * max_buffered
+        self.failed = {}  # window -> peers that timed out on it or sent a bad body
+        self.attempts = {}  # window -> failed fetches, across all peers
+        self.buffer = {}  # window start height -> blocks that arrived before the windows below them
+        self.next_height = start_height  # Next height to append to the chain
+        self.peer_heights = {}  # peer -> chain height it reported
+        self.in_flight = 0
+        self.aborted = False
+        self.changed = asyncio.Condition()
+
+    def finished(self):
+        return self.aborted or self.next_height >= self.stop_height
+
+    def take(self, peer, peer_height):
+        """Pop the lowest queued window this peer can serve and has not failed, or return None."""
+        if self.aborted:
+            return None
+        live_peers = {p for p in self.peer_heights if not p.closed}
+        for window in self.queue:
+            start, stop = window
+            if start - self.next_height >= self.lookahead:
+                break
+            if stop - 1 > peer_height:
+                continue
+            failed = self.failed.get(window, set())
+            # Once every live peer has failed a window, let them all try it again.
+            if peer in failed and not live_peers <= failed:
+                continue
+            self.queue.remove(window)
+            self.in_flight += 1
+            return window
+        return None
+
+    def servable(self):
+        """Check whether some live peer is tall enough to serve a queued window."""
+        heights = [height for peer, height in self.peer_heights.items() if not peer.closed]
+        return any(stop - 1 <= height for _, stop in self.queue for height in heights)
+
+    def fail(self, window, peer):
+        """Put a window back at the front of the queue for another peer to fetch."""
+        failed = self.failed.setdefault(window, set())
+        failed.add(peer)
+        self.attempts[window] = self.attempts.get(window, 0) + 1
+        if self.attempts[window] > 2 * len(self.peer_heights):
+            print(f"Sync stopped: no peer delivered blocks {window[0]}-{window[1] - 1}.")
+            self.aborted = True
+            return
+        self.queue.appendleft(window)
+
+
+class BlockSync:
+    """Headers-first block download over async_network.AsyncNetwork.
+
+    Every node serves 'getstatus', 'getheaders' and 'getbodies' from its chain. To
+    catch up, a node asks its peers for their height, downloads the headers above its
+    tip and checks each one links to the last and hashes correctly. It then fetches the
+    bodies (transactions) in height windows from all peers at once, several windows
+    per peer. Windows that time out or fail their Merkle root go back on the queue
+    for another peer; windows that arrive early wait in a reorder buffer, so blocks are
+    still appended in height order.
+    """
+
+    def __init__(self, network, blockchain, window_size=None, requests_per_peer=None, timeout=None):
+        self.network = network
+        self.blockchain = blockchain
+        self.window_size = window_size or Config.SYNC_WINDOW_SIZE
+        self.requests_per_peer = requests_per_peer or Config.SYNC_REQUESTS_PER_PEER
+        self.timeout = timeout or Config.SYNC_REQUEST_TIMEOUT
+        self.request_ids = itertools.count()
+        self.pending = {}  # request id -> (peer, future resolved with (message, body))
+        network.register_handler('getstatus', self.handle_getstatus)
+        network.register_handler('getheaders', self.handle_getheaders)
+        network.register_handler('getbodies', self.handle_getbodies)
+        for message_type in ('status', 'headers', 'bodies'):
+            network.register_handler(message_type, self.handle_response)
+
+    async def handle_getstatus(self, peer, message, body):
+        await peer.send({'type': 'status', 'id': message['id'], 'height': len(self.blockchain.chain) - 1})
+
+    async def handle_getheaders(self, peer, message, body):
+        chain = self.blockchain.chain
+        start = message['start']
+        stop = min(start + min(message['count'], Config.SYNC_HEADERS_PER_REQUEST), len(chain))
+        headers = [block_header(chain[height]).to_bytes() for height in range(start, stop)]
+        await peer.send({'type': 'headers', 'id': message['id']}, encode_items(headers))
+
+    async def handle_getbodies(self, peer, message, body):
+        chain = self.blockchain.chain
+        start = message['start']
+        stop = min(start + min(message['count'], Config.SYNC_WINDOW_SIZE), len(chain))
+        bodies = [encode_body(chain[height]) for height in range(start, stop)]
+        await peer.send({'type': 'bodies', 'id': message['id']}, encode_items(bodies))
+
+    async def handle_response(self, peer, message, body):
+        """Hand a response to the request waiting for it."""
+        waiting = self.pending.get(message.get('id'))
+        if waiting is not None and waiting[0] is peer and not waiting[1].done():
+            waiting[1].set_result((message, body))
+
+    async def request(self, peer, message):
+        """Send a request and wait for the matching response; raise on timeout or a lost peer."""
+        request_id = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = (peer, future)
+        message['id'] = request_id
+        try:
+            if not await peer.send(message):
+                raise ConnectionError(f"Peer {peer} is gone.")
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            del self.pending[request_id]
+
+    async def get_peer_heights(self):
+        """Ask every peer for its chain height; return {peer: height} for those that answer."""
+        peers = [peer for peer in self.network.peers.values() if not peer.closed]
+        replies = await asyncio.gather(*(self.request(peer, {'type': 'getstatus'}) for peer in peers),
+                                       return_exceptions=True)
+        return {peer: reply[0]['height'] for peer, reply in zip(peers, replies) if not isinstance(reply, Exception)}
+
+    async def sync(self):
+        """Download every block the best peer has above the local tip; return the number of blocks added."""
+        peer_heights = await self.get_peer_heights()
+        start_height = len(self.blockchain.chain)
+        target_height = max(peer_heights.values(), default=-1)
+        if target_height < start_height:
+            return 0
+        headers = await self.download_headers(peer_heights, start_height, target_height)
+        if not headers:
+            return 0
+        await self.download_bodies(headers, peer_heights, start_height)
+        return len(self.blockchain.chain) - start_height
+
+    async def download_headers(self, peer_heights, start_height, target_height):
+        """Download and check the header chain above the local tip, moving to another peer on failure."""
+        headers = []
+        previous = self.blockchain.get_last_block()
+        candidates = sorted(peer_heights, key=peer_heights.get, reverse=True)
+        height = start_height
+        while height <= target_height and candidates:
+            peer = candidates[0]
+            if peer_heights[peer] < height:
+                break
+            try:
+                message, body = await self.request(peer, {'type': 'getheaders', 'start': height,
+                                                          'count': Config.SYNC_HEADERS_PER_REQUEST})
+            except (asyncio.TimeoutError, ConnectionError):
+                candidates.pop(0)
+                continue
+            batch = [Block.from_bytes(item) for item in decode_items(body)]
+            for header in batch:
+                if not header_is_valid(header, previous):
+                    print(f"Invalid header at height {height} from {peer}.")
+                    batch = None
+                    break
+                headers.append(header)
+                previous = header
+                height += 1
+            if not batch:
+                candidates.pop(0)
+        return headers
+
+    async def download_bodies(self, headers, peer_heights, start_height):
+        """Fetch block bodies from all peers in parallel and append the blocks in height order."""
+        download = BodyDownload(headers, start_height, self.window_size, Config.SYNC_MAX_BUFFERED_WINDOWS)
+        download.peer_heights = peer_heights
+        workers = [
+            self.fetch_windows(download, peer, height)
+            for peer, height in peer_heights.items()
+            for _ in range(self.requests_per_peer)
+        ]
+        await asyncio.gather(*workers)
+
+    async def fetch_windows(self, download, peer, peer_height):
+        """Worker: repeatedly take a window, fetch it from `peer` and buffer or re-queue it."""
+        while True:
+            async with download.changed:
+                window = download.take(peer, peer_height)
+                while window is None and not download.finished() and not peer.closed:
+                    if download.in_flight == 0 and not download.servable():
+                        print(f"Sync stopped at height {download.next_height}: no peer can serve the rest.")
+                        download.aborted = True
+                        download.changed.notify_all()
+                        break
+                    await download.changed.wait()
+                    window = download.take(peer, peer_height)
+                if window is None:
+                    return
+            blocks = await self.fetch_window(download, peer, window)
+            async with download.changed:
+                download.in_flight -= 1
+                if blocks is None:
+                    download.fail(window, peer)
+                else:
+                    download.buffer[window[0]] = blocks
+                    self.append_ready(download)
+                download.changed.notify_all()
+
+    async def fetch_window(self, download, peer, window):
+        """Fetch and check the bodies for one window; return its blocks, or None on failure."""
+        start, stop = window
+        try:
+            message, body = await self.request(peer, {'type': 'getbodies', 'start': start, 'count': stop - start})
+        except (asyncio.TimeoutError, ConnectionError):
+            return None
+        bodies = decode_items(body)
+        if len(bodies) != stop - start:
+            return None
+        offset = start - (download.stop_height - len(download.headers))
+        blocks = []
+        for header, block_body in zip(download.headers[offset:offset + len(bodies)], bodies):
+            block = attach_body(header, block_body)
+            if block is None:
+                print(f"Body of block {header.index} from {peer} does not match its header.")
+                return None
+            blocks.append(block)
+        return blocks
+
+    def append_ready(self, download):
+        """Append buffered windows to the chain for as long as the next one has arrived."""
+        while download.next_height in download.buffer:
+            blocks = download.buffer.pop(download.next_height)
+            try:
+                for block in blocks:
+                    self.blockchain.add_block(block)
+            except ValueError as e:
+                print(f"Sync stopped at block {block.index}: {e}")
+                download.aborted = True
+                return
+            download.next_height += len(blocks)
+
+
+# Example usage
+if __name__ == "__main__":
+    from async_network import AsyncNetwork
+    from blockchain import Blockchain
+
+    async def main():
+        source = Blockchain()
+        for i in range(2000):
+            transactions = [Transaction(sender=f"sender{i}", recipient="Bob", amount=i + 1)]
+            source.create_block(f"Block {i}", source.get_last_block().hash, transactions)
+
+        serving_nodes = [AsyncNetwork(port=0) for _ in range(3)]
+        for node in serving_nodes:
+            BlockSync(node, source)
+            await node.start_server()
+
+        new_node = AsyncNetwork(port=0)
+        new_chain = Blockchain()
+        block_sync = BlockSync(new_node, new_chain)
+        for node in serving_nodes:
+            await new_node.add_peer((node.host, node.port))
+
+        added = await block_sync.sync()
+        print(f"Synced {added} blocks; tip matches source? {new_chain.get_last_block().hash == source.get_last_block().hash}")
+        print("Is synced chain valid?", new_chain.is_chain_valid())
+
+        await new_node.close()
+        for node in serving_nodes:
+            await node.close()
+
+    asyncio.run(main())
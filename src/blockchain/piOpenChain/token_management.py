@@ -1,43 +1,99 @@
 # src/blockchain/piOpenChain/token_management.py
 
-from web3 import Web3
 import json
 
+from block_fetcher import BlockFetcher
+from transaction_sender import get_sender
+from web3_provider import get_web3
+
 class TokenManagement:
     def __init__(self, provider_url, contract_address, abi):
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+        self.web3 = get_web3(provider_url)
         self.contract = self.web3.eth.contract(address=contract_address, abi=abi)
+        self.fetcher = BlockFetcher(provider_url)
+        self.sender = get_sender(self.web3, self.fetcher)
 
-    def mint_token(self, account, private_key, to_address, amount):
-        """Mint new tokens to a specified address."""
-        nonce = self.web3.eth.getTransactionCount(account)
-        transaction = self.contract.functions.mint(to_address, amount).buildTransaction({
+    def build_transaction(self, function, account):
+        """Build an unsigned contract transaction; the sender fills in the nonce."""
+        return function.build_transaction({
             'from': account,
             'gas': 2000000,
-            'gasPrice': self.web3.toWei('50', 'gwei'),
-            'nonce': nonce
+            'gasPrice': self.web3.to_wei('50', 'gwei'),
+            'chainId': self.sender.chain_id
         })
-        signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-        txn_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-        return self.web3.eth.waitForTransactionReceipt(txn_hash)
+
+    def submit_mint(self, account, private_key, to_address, amount):
+        """Send a mint without waiting for it; return a Future for its receipt."""
+        transaction = self.build_transaction(self.contract.functions.mint(to_address, amount), account)
+        return self.sender.submit(account, private_key, transaction)
+
+    def submit_transfer(self, account, private_key, to_address, amount):
+        """Send a transfer without waiting for it; return a Future for its receipt."""
+        transaction = self.build_transaction(self.contract.functions.transfer(to_address, amount), account)
+        return self.sender.submit(account, private_key, transaction)
+
+    def mint_token(self, account, private_key, to_address, amount):
+        """Mint new tokens to a specified address."""
+        return self.submit_mint(account, private_key, to_address, amount).result()
 
     def transfer_token(self, account, private_key, to_address, amount):
         """Transfer tokens from the caller's address to another address."""
-        nonce = self.web3.eth.getTransactionCount(account)
-        transaction = self.contract.functions.transfer(to_address, amount).buildTransaction({
-            'from': account,
-            'gas': 2000000,
-            'gasPrice': self.web3.toWei('50', 'gwei'),
-            'nonce': nonce
-        })
-        signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-        txn_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-        return self.web3.eth.waitForTransactionReceipt(txn_hash)
+        return self.submit_transfer(account, private_key, to_address, amount).result()
 
     def get_balance(self, address):
         """Get the token balance of a specified address."""
         return self.contract.functions.balanceOf(address).call()
 
+    def get_balances(self, addresses):
+        """Get the token balances of many addresses in batched eth_call requests.
+
+        Returns a (balance, error) pair per address, in order.
+        """
+        calls = [('eth_call', [{'to': self.contract.address,
+                                'data': self.contract.encodeABI(fn_name='balanceOf', args=[address])}, 'latest'])
+                 for address in addresses]
+        balances = []
+        for result, error in self.fetcher.fetch_results(len(calls), calls.__getitem__):
+            if error is None:
+                try:
+                    result = self.web3.codec.decode(['uint256'], bytes.fromhex(result[2:]))[0]
+                except Exception as e:  # e.g. '0x' from an address without the contract
+                    result, error = None, f"Could not decode balance {result!r}: {e}"
+            balances.append((result, error))
+        return balances
+
+    def submit_many(self, account, private_key, function_name, calls):
+        """Sign and send one contract transaction per argument list in `calls`, pipelined in batches.
+
+        Returns a Future per transaction, in order; transactions that could not be sent
+        come back as already failed Futures.
+        """
+        base = {'from': account, 'to': self.contract.address, 'value': 0, 'gas': 2000000,
+                'gasPrice': self.web3.to_wei('50', 'gwei'), 'chainId': self.sender.chain_id}
+        transactions = [dict(base, data=self.contract.encodeABI(fn_name=function_name, args=list(args)))
+                        for args in calls]
+        return self.sender.submit_many(account, private_key, transactions, self.fetcher)
+
+    def wait_all(self, futures):
+        """Wait for receipt futures; return a (receipt, error) pair per transaction, in order."""
+        results = []
+        for future in futures:
+            try:
+                receipt = future.result()
+            except Exception as e:
+                results.append((None, e))
+            else:
+                results.append((receipt, None if receipt['status'] == 1 else "Transaction reverted."))
+        return results
+
+    def transfer_many(self, account, private_key, transfers):
+        """Transfer tokens to many (to_address, amount) pairs; return (receipt, error) per transfer."""
+        return self.wait_all(self.submit_many(account, private_key, 'transfer', transfers))
+
+    def mint_many(self, account, private_key, mints):
+        """Mint tokens to many (to_address, amount) pairs; return (receipt, error) per mint."""
+        return self.wait_all(self.submit_many(account, private_key, 'mint', mints))
+
 # Example usage
 if __name__ == "__main__":
     provider_url = "https://mainnet.infura.io/v3/your_infura_project_id"
@@ -59,6 +115,11 @@ if __name__ == "__main__":
     transfer_receipt = token_manager.transfer_token(account, private_key, to_address, transfer_amount)
     print(f"Tokens transferred: {transfer_receipt}")
 
+    # Pay out many transfers in pipelined batches
+    payouts = token_manager.transfer_many(account, private_key, [(to_address, 1)] * 1000)
+    print(f"Payouts mined: {sum(error is None for _, error in payouts)}, failed: {[e for _, e in payouts if e]}")
+    print(f"Balances: {token_manager.get_balances([account, to_address])}")
+
     # Get balance
     balance = token_manager.get_balance(to_address)
     print(f"Token balance of {to_address}: {balance}")
@@ -1,13 +1,28 @@
-import hashlib
+import heapq
+import itertools
+import struct
 import time
 import json
 
+from config import Config
+from hashing import hexdigest
+from utils import to_units, validate_amount
+
+# Fixed-layout transaction record: amount and fee (minimal units), timestamp, sender nonce, sender and
+# recipient lengths. The UTF-8 sender and recipient addresses follow the header.
+TRANSACTION_HEADER = struct.Struct('<QQqQHH')
+DEFAULT_FEE = to_units(Config.TRANSACTION_FEE)
+
 class Transaction:
-    def __init__(self, sender, recipient, amount):
+    __slots__ = ('sender', 'recipient', 'amount', 'fee', 'timestamp', 'nonce', 'transaction_id')
+
+    def __init__(self, sender, recipient, amount, fee=None, timestamp=None, nonce=0):
         self.sender = sender
         self.recipient = recipient
-        self.amount = amount
-        self.timestamp = self.get_current_timestamp()
+        self.amount = amount  # Integer minimal units, see utils.to_units
+        self.fee = DEFAULT_FEE if fee is None else fee
+        self.timestamp = self.get_current_timestamp() if timestamp is None else timestamp
+        self.nonce = nonce  # Per-sender sequence number, see state.AccountState
         self.transaction_id = self.calculate_transaction_id()
 
     def get_current_timestamp(self):
@@ -15,9 +30,29 @@ class Transaction:
         return int(time.time())
 
     def calculate_transaction_id(self):
-        """Calculate a unique transaction ID based on the transaction details."""
-        transaction_string = f"{self.sender}{self.recipient}{self.amount}{self.timestamp}".encode()
-        return hashlib.sha256(transaction_string).hexdigest()
+        """Calculate a unique transaction ID from the canonical byte encoding."""
+        return hexdigest(self.to_bytes())
+
+    def to_bytes(self):
+        """Encode the transaction as a fixed-layout header followed by the two addresses."""
+        sender = self.sender.encode()
+        recipient = self.recipient.encode()
+        header = TRANSACTION_HEADER.pack(self.amount, self.fee, self.timestamp, self.nonce, len(sender), len(recipient))
+        return header + sender + recipient
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """Decode a transaction from bytes or a memoryview without copying the header."""
+        amount, fee, timestamp, nonce, sender_length, recipient_length = TRANSACTION_HEADER.unpack_from(buffer)
+        start = TRANSACTION_HEADER.size
+        sender = str(buffer[start:start + sender_length], 'utf-8')
+        start += sender_length
+        recipient = str(buffer[start:start + recipient_length], 'utf-8')
+        return cls(sender, recipient, amount, fee, timestamp, nonce)
+
+    def size(self):
+        """Return the size of the encoded transaction in bytes."""
+        return TRANSACTION_HEADER.size + len(self.sender.encode()) + len(self.recipient.encode())
 
     def to_dict(self):
         """Convert the transaction to a dictionary for easy serialization."""
@@ -25,7 +60,9 @@ class Transaction:
             'sender': self.sender,
             'recipient': self.recipient,
             'amount': self.amount,
+            'fee': self.fee,
             'timestamp': self.timestamp,
+            'nonce': self.nonce,
             'transaction_id': self.transaction_id
         }
 
@@ -33,35 +70,213 @@ class Transaction:
         return json.dumps(self.to_dict(), indent=4)
 
 class TransactionPool:
-    def __init__(self):
-        self.transactions = []
+    """Mempool of pending transactions.
+
+    Transactions are stored in a dict keyed by transaction_id (O(1) dedup and removal)
+    with a per-sender index. Two heaps order them for block building (highest fee, or
+    oldest first) and for eviction (lowest fee first). Heap entries are deleted lazily:
+    an entry is live only while its sequence number matches the pooled transaction's.
+    """
+
+    def __init__(self, order='fee', max_count=None, max_bytes=None, state=None):
+        if order not in ('fee', 'timestamp'):
+            raise ValueError("order must be 'fee' or 'timestamp'")
+        self.order = order
+        self.max_count = max_count or Config.MEMPOOL_MAX_TRANSACTIONS
+        self.max_bytes = max_bytes or Config.MEMPOOL_MAX_BYTES
+        self.state = state  # Optional state.AccountState used for balance and nonce checks
+        self.sequence = itertools.count()
+        self.clear_transactions()
+
+    def clear_transactions(self):
+        """Clear the transaction pool."""
+        self.transactions = {}  # transaction_id -> Transaction
+        self.by_sender = {}  # sender -> {transaction_id: Transaction}
+        self.pending_spend = {}  # sender -> total amount plus fees of its pending transactions
+        self.pending_nonces = {}  # sender -> set of nonces used by its pending transactions
+        self.entry_seq = {}  # transaction_id -> sequence number of its live heap entries
+        self.sizes = {}  # transaction_id -> encoded size in bytes
+        self.total_bytes = 0
+        self.selection_heap = []
+        self.eviction_heap = []
 
     def add_transaction(self, transaction):
         """Add a transaction to the pool."""
-        if self.validate_transaction(transaction):
-            self.transactions.append(transaction)
-            return True
-        return False
+        if transaction.transaction_id in self.transactions:
+            print("Duplicate transaction.")
+            return False
+        if not self.validate_transaction(transaction):
+            return False
+
+        size = transaction.size()
+        if not self.make_room(transaction, size):
+            print("Transaction fee too low for a full pool.")
+            return False
+
+        tx_id = transaction.transaction_id
+        seq = next(self.sequence)
+        self.transactions[tx_id] = transaction
+        self.by_sender.setdefault(transaction.sender, {})[tx_id] = transaction
+        self.pending_spend[transaction.sender] = self.pending_spend.get(transaction.sender, 0) + \
+            transaction.amount + transaction.fee
+        self.pending_nonces.setdefault(transaction.sender, set()).add(transaction.nonce)
+        self.entry_seq[tx_id] = seq
+        self.sizes[tx_id] = size
+        self.total_bytes += size
+        heapq.heappush(self.selection_heap, (self.selection_key(transaction), seq, tx_id))
+        heapq.heappush(self.eviction_heap, (transaction.fee, -transaction.timestamp, seq, tx_id))
+        return True
 
     def validate_transaction(self, transaction):
         """Validate a transaction before adding it to the pool."""
         # Basic validation checks
-        if transaction.amount <= 0:
-            print("Transaction amount must be positive.")
+        if not validate_amount(transaction.amount):
+            print("Transaction amount must be a positive integer number of units.")
             return False
         if not transaction.sender or not transaction.recipient:
             print("Sender and recipient addresses must be valid.")
             return False
-        # Additional checks can be added here (e.g., checking balances)
+        if self.state is not None:
+            sender = transaction.sender
+            return self.state.validate_transaction(transaction, self.pending_spend.get(sender, 0),
+                                                   self.pending_nonces.get(sender, ()))
         return True
 
-    def clear_transactions(self):
-        """Clear the transaction pool."""
-        self.transactions = []
+    def selection_key(self, transaction):
+        """Heap key for block building: highest fee first, or oldest first."""
+        if self.order == 'fee':
+            return (-transaction.fee, transaction.timestamp)
+        return (transaction.timestamp, -transaction.fee)
+
+    def is_live(self, seq, tx_id):
+        return self.entry_seq.get(tx_id) == seq
+
+    def make_room(self, transaction, size):
+        """Evict the cheapest transactions so the new one fits; False, evicting nothing, if it cannot.
+
+        Victims are collected from the eviction heap first, and only removed once
+        transactions paying less than the new one free enough count and bytes.
+        """
+        if size > self.max_bytes:
+            return False
+        count, total_bytes = len(self.transactions) + 1, self.total_bytes + size
+        victims = []
+        while count > self.max_count or total_bytes > self.max_bytes:
+            if not self.eviction_heap:
+                break
+            entry = self.eviction_heap[0]
+            fee, _, seq, tx_id = entry
+            if not self.is_live(seq, tx_id):
+                heapq.heappop(self.eviction_heap)
+                continue
+            if fee >= transaction.fee:
+                break
+            victims.append(heapq.heappop(self.eviction_heap))
+            count -= 1
+            total_bytes -= self.sizes[tx_id]
+        if count > self.max_count or total_bytes > self.max_bytes:
+            for entry in victims:
+                heapq.heappush(self.eviction_heap, entry)
+            return False
+        for _, _, _, tx_id in victims:
+            self.remove_transaction(tx_id)
+        return True
+
+    def remove_transaction(self, tx_id):
+        """Remove one transaction by ID; its heap entries become stale."""
+        transaction = self.transactions.pop(tx_id, None)
+        if transaction is None:
+            return None
+        sender = transaction.sender
+        sender_transactions = self.by_sender[sender]
+        del sender_transactions[tx_id]
+        self.pending_spend[sender] -= transaction.amount + transaction.fee
+        self.pending_nonces[sender].discard(transaction.nonce)
+        if not sender_transactions:
+            del self.by_sender[sender]
+            del self.pending_spend[sender]
+            del self.pending_nonces[sender]
+        del self.entry_seq[tx_id]
+        self.total_bytes -= self.sizes.pop(tx_id)
+        self.compact_heaps()
+        return transaction
+
+    def remove_transactions(self, transactions):
+        """Remove the transactions included in a mined block (objects or IDs)."""
+        removed = 0
+        for transaction in transactions:
+            tx_id = getattr(transaction, 'transaction_id', transaction)
+            if self.remove_transaction(tx_id) is not None:
+                removed += 1
+        return removed
+
+    def compact_heaps(self):
+        """Rebuild the heaps once stale entries outnumber live ones."""
+        live = len(self.transactions)
+        if len(self.selection_heap) > 2 * live + 1024:
+            self.selection_heap = [entry for entry in self.selection_heap if self.is_live(entry[1], entry[2])]
+            heapq.heapify(self.selection_heap)
+        if len(self.eviction_heap) > 2 * live + 1024:
+            self.eviction_heap = [entry for entry in self.eviction_heap if self.is_live(entry[2], entry[3])]
+            heapq.heapify(self.eviction_heap)
+
+    def select_transactions(self, count):
+        """Return up to `count` transactions in priority order without removing them.
+
+        With account state, each sender's transactions are returned in consecutive
+        nonce order starting at its state nonce, so the selection can be mined as one
+        block. A transaction popped before its
+        predecessor waits aside and goes back on the heap once the predecessor is
+        selected; transactions behind a nonce gap are not selected. Popped entries are
+        pushed back at the end, so the cost is O(count log n) rather than a sort of the
+        whole pool, plus the entries that had to wait.
+        """
+        selected = []
+        entries = []
+        next_nonces = {}  # sender -> nonce its next selected transaction must carry
+        waiting = {}  # (sender, nonce) -> heap entry popped before its predecessor
+        while self.selection_heap and len(selected) < count:
+            entry = heapq.heappop(self.selection_heap)
+            if not self.is_live(entry[1], entry[2]):
+                continue
+            transaction = self.transactions[entry[2]]
+            entries.append(entry)
+            if self.state is None:
+                selected.append(transaction)
+                continue
+            sender = transaction.sender
+            if sender not in next_nonces:
+                next_nonces[sender] = self.state.get_nonce(sender)
+            if transaction.nonce != next_nonces[sender]:
+                entries.pop()
+                waiting[(sender, transaction.nonce)] = entry
+                continue
+            selected.append(transaction)
+            next_nonces[sender] += 1
+            successor = waiting.pop((sender, next_nonces[sender]), None)
+            if successor is not None:
+                heapq.heappush(self.selection_heap, successor)
+        for entry in entries + list(waiting.values()):
+            heapq.heappush(self.selection_heap, entry)
+        return selected
+
+    def get_transaction(self, tx_id):
+        """Return a pending transaction by ID, or None."""
+        return self.transactions.get(tx_id)
+
+    def get_transactions_by_sender(self, sender):
+        """Return the pending transactions sent by an address."""
+        return list(self.by_sender.get(sender, {}).values())
 
     def get_transactions(self):
         """Return the list of pending transactions."""
-        return self.transactions
+        return list(self.transactions.values())
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def __contains__(self, tx_id):
+        return tx_id in self.transactions
 
 # Example usage
 if __name__ == "__main__":
@@ -69,8 +284,8 @@ if __name__ == "__main__":
     transaction_pool = TransactionPool()
 
     # Create some transactions
-    tx1 = Transaction(sender="Alice", recipient="Bob", amount=50)
-    tx2 = Transaction(sender="Charlie", recipient="Dave", amount=100)
+    tx1 = Transaction(sender="Alice", recipient="Bob", amount=to_units(50), fee=to_units(0.02))
+    tx2 = Transaction(sender="Charlie", recipient="Dave", amount=to_units(100), fee=to_units(0.05))
 
     # Add transactions to the pool
     transaction_pool.add_transaction(tx1)
@@ -81,6 +296,13 @@ if __name__ == "__main__":
     for tx in transaction_pool.get_transactions():
         print(tx)
 
+    # Select the highest-fee transactions for the next block
+    print("Best transaction:", transaction_pool.select_transactions(1))
+
+    # Remove the transactions included in a mined block
+    transaction_pool.remove_transactions([tx2])
+    print(f"Transactions left after block: {len(transaction_pool)}")
+
     # Clear the transaction pool
     transaction_pool.clear_transactions()
     print("Transaction pool cleared.")
@@ -0,0 +1,132 @@
+# src/blockchain/piOpenChain/transaction_indexer.py
+
+import json
+import sqlite3
+from collections.abc import Mapping
+
+from config import Config
+from web3_provider import get_web3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    block_number INTEGER NOT NULL,
+    transaction_index INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    from_address TEXT NOT NULL,
+    to_address TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (block_number, transaction_index)
+);
+CREATE INDEX IF NOT EXISTS transactions_from ON transactions (from_address, block_number);
+CREATE INDEX IF NOT EXISTS transactions_to ON transactions (to_address, block_number);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+"""
+
+
+def encode_value(value):
+    """json.dumps fallback for web3 results: bytes as 0x-hex, AttributeDicts as plain dicts."""
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as JSON.")
+
+
+def encode_transaction(txn):
+    """Serialize a transaction for storage (a lighter stand-in for Web3.to_json)."""
+    return json.dumps(dict(txn), separators=(',', ':'), default=encode_value)
+
+
+def to_int(value):
+    """Accept web3's decoded integers as well as the node's hex quantities."""
+    return int(value, 16) if isinstance(value, str) else value
+
+
+class TransactionIndexer:
+    """Local SQLite index of an RPC node's transactions by sender, recipient and block number.
+
+    Blocks are fetched once and stored with the index position they reached, so
+    `sync` carries on from the last indexed block. Blocks newer than `confirmations`
+    are left out of the index, since they may still be reorganised away. Addresses are
+    stored lowercase, so lookups do not depend on checksum casing. With a
+    block_fetcher.BlockFetcher, blocks are downloaded in concurrent batches rather
+    than one web3 call per block.
+    """
+
+    def __init__(self, web3, path=None, confirmations=None, batch_size=None, fetcher=None):
+        self.web3 = web3
+        self.fetcher = fetcher
+        self.confirmations = Config.INDEXER_CONFIRMATIONS if confirmations is None else confirmations
+        self.batch_size = batch_size or Config.INDEXER_BATCH_SIZE
+        self.connection = sqlite3.connect(path or Config.INDEXER_DB_PATH)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def last_indexed_block(self):
+        """Return the highest indexed block number, or -1 if nothing is indexed yet."""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'last_indexed_block'").fetchone()
+        return row[0] if row else -1
+
+    def sync(self):
+        """Index every confirmed block after the last indexed one; return how many were added."""
+        first = self.last_indexed_block + 1
+        last = self.web3.eth.block_number - self.confirmations
+        if last < first:
+            return 0
+        if self.fetcher is not None:
+            blocks = self.fetcher.fetch_blocks(first, last)
+        else:
+            blocks = (self.web3.eth.get_block(number, full_transactions=True) for number in range(first, last + 1))
+        batch = []
+        for block in blocks:
+            batch.append(block)
+            if len(batch) == self.batch_size:
+                self.index_blocks(batch)
+                batch = []
+        if batch:
+            self.index_blocks(batch)
+        return last - first + 1
+
+    def index_blocks(self, blocks):
+        """Store a run of consecutive blocks and advance the last indexed block, in one transaction."""
+        rows = [
+            (to_int(block['number']), position,
+             txn['hash'] if isinstance(txn['hash'], str) else encode_value(txn['hash']),
+             txn['from'].lower(), txn['to'].lower() if txn.get('to') else None, encode_transaction(txn))
+            for block in blocks
+            for position, txn in enumerate(block['transactions'])
+        ]
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('last_indexed_block', ?)",
+                                    (to_int(blocks[-1]['number']),))
+
+    def get_transaction_history(self, address, start_block=0, end_block=None):
+        """Return indexed transactions sent or received by `address`, in chain order, as dicts."""
+        address = address.lower()
+        end_block = self.last_indexed_block if end_block is None else end_block
+        rows = self.connection.execute(
+            "SELECT block_number, transaction_index, data FROM transactions "
+            "WHERE from_address = ? AND block_number BETWEEN ? AND ? "
+            "UNION ALL "
+            "SELECT block_number, transaction_index, data FROM transactions "
+            "WHERE to_address = ? AND from_address != ? AND block_number BETWEEN ? AND ? "
+            "ORDER BY block_number, transaction_index",
+            (address, start_block, end_block, address, address, start_block, end_block)
+        )
+        return [json.loads(data) for _, _, data in rows]
+
+    def close(self):
+        self.connection.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    provider_url = "https://mainnet.infura.io/v3/your_infura_project_id"
+    indexer = TransactionIndexer(get_web3(provider_url))
+
+    print(f"Indexed {indexer.sync()} new blocks, up to block {indexer.last_indexed_block}")
+    address = "0xYourEthereumAddress"
+    print(f"Transaction History for {address}: {indexer.get_transaction_history(address)}")
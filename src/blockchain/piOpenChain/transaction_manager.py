@@ -1,10 +1,12 @@
 # src/blockchain/piOpenChain/transaction_manager.py
 
-from web3 import Web3
+from block_fetcher import BlockFetcher
+from web3_provider import get_web3
 
 class TransactionManager:
     def __init__(self, provider_url):
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+        self.web3 = get_web3(provider_url)
+        self.fetcher = BlockFetcher(provider_url)
 
     def get_transaction(self, txn_hash):
         """Get transaction details by hash."""
@@ -28,6 +30,14 @@ class TransactionManager:
             print(f"Error retrieving block: {e}")
             return None
 
+    def get_blocks(self, start_block, end_block, full_transactions=False):
+        """Yield blocks start_block..end_block in order, fetched in concurrent JSON-RPC batches."""
+        return self.fetcher.fetch_blocks(start_block, end_block, full_transactions)
+
+    def get_transactions(self, txn_hashes):
+        """Yield transactions for many hashes in order, fetched in concurrent JSON-RPC batches."""
+        return self.fetcher.fetch_transactions(txn_hashes)
+
     def get_latest_block(self):
         """Get the latest block."""
         try:
@@ -0,0 +1,377 @@
+# src/blockchain/piOpenChain/transaction_sender.py
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+
+from eth_account import Account
+from web3 import Web3
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+# Shared by piOpenChain and main/services (like web3_provider), so settings are module constants.
+SENDER_WORKERS = 8            # Transactions signed and sent concurrently per sender
+RECEIPT_WORKERS = 8           # Receipts fetched concurrently by the receipt tracker
+NONCE_RETRIES = 3             # Times a transaction rejected for its nonce is resent with a fresh one
+SIGNING_WORKERS = None        # Processes signing bulk transactions (None: one per CPU)
+SIGNING_CHUNK = 250           # Transactions signed per signing task
+RECEIPT_POLL_INTERVAL = 1.0   # Seconds between receipt tracker polls for new blocks
+RECEIPT_TIMEOUT = 600         # Seconds a tracked transaction may stay unmined before its future fails
+
+logger = logging.getLogger(__name__)
+
+
+def is_nonce_error(error):
+    """Return whether a node's send error means the nonce was already used or is unusable."""
+    message = str(error).lower()
+    return 'nonce' in message or 'replacement transaction underpriced' in message
+
+
+def sign_transactions(private_key, transactions):
+    """Sign transaction dicts; return a (raw transaction, hash) pair for each. Runs in signing workers."""
+    signed = [Account.sign_transaction(transaction, private_key) for transaction in transactions]
+    return [(bytes(txn.rawTransaction), bytes(txn.hash)) for txn in signed]
+
+
+class NonceManager:
+    """Hands out consecutive nonces per account without asking the node each time.
+
+    The first nonce for an account comes from its pending transaction count; after that
+    nonces are counted locally under a per-account lock, so concurrent senders never
+    get the same one. `resync` drops the local count when a send fails, and the next
+    nonce is read from the node again.
+    """
+
+    def __init__(self, web3):
+        self.web3 = web3
+        self.lock = threading.Lock()
+        self.account_locks = {}
+        self.next_nonces = {}
+
+    def account_lock(self, account):
+        with self.lock:
+            return self.account_locks.setdefault(account, threading.Lock())
+
+    def reserve(self, account, count=1):
+        """Reserve `count` consecutive unused nonces for an account; return the first."""
+        with self.account_lock(account):
+            nonce = self.next_nonces.get(account)
+            if nonce is None:
+                nonce = self.web3.eth.get_transaction_count(account, 'pending')
+            self.next_nonces[account] = nonce + count
+            return nonce
+
+    def resync(self, account):
+        """Forget the local count, so the next nonce is read from the node."""
+        with self.account_lock(account):
+            self.next_nonces.pop(account, None)
+
+
+class ReceiptTracker:
+    """Background thread that resolves one future per tracked transaction with its receipt.
+
+    The thread follows new blocks and fetches receipts only for tracked transactions
+    that appear in them, so the cost per poll does not grow with the number of
+    outstanding transactions; a newly tracked hash not found that way is looked up
+    once directly, in case it was mined before the tracker saw it. Given a
+    block_fetcher.BlockFetcher, receipts are fetched in JSON-RPC batches. Futures
+    of transactions not mined within `timeout` seconds fail with TimeExhausted. The
+    thread stops while nothing is tracked.
+    """
+
+    def __init__(self, web3, poll_interval=None, timeout=None, fetcher=None):
+        self.web3 = web3
+        self.fetcher = fetcher
+        self.poll_interval = poll_interval or RECEIPT_POLL_INTERVAL
+        self.timeout = timeout or RECEIPT_TIMEOUT
+        self.lock = threading.Lock()
+        self.pending = {}  # hex hash -> (future, deadline)
+        self.fresh = []  # Hashes not yet looked up directly
+        self.last_block = None
+        self.thread = None
+        self.executor = ThreadPoolExecutor(max_workers=RECEIPT_WORKERS)
+
+    def track(self, txn_hash, callback=None):
+        """Return a Future that resolves to the transaction's receipt.
+
+        `callback`, if given, is called with the Future once it is done (from the
+        tracker's thread, or at once if it already is).
+        """
+        txn_hash = Web3.to_hex(txn_hash).lower() if not isinstance(txn_hash, str) else txn_hash.lower()
+        with self.lock:
+            if txn_hash in self.pending:
+                future = self.pending[txn_hash][0]
+            else:
+                future = Future()
+                self.pending[txn_hash] = (future, time.monotonic() + self.timeout)
+                self.fresh.append(txn_hash)
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, daemon=True)
+                    self.thread.start()
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    async def wait(self, txn_hash):
+        """Await a transaction's receipt from asyncio code."""
+        return await asyncio.wrap_future(self.track(txn_hash))
+
+    def run(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    self.last_block = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:  # Keep tracking through node hiccups
+                logger.warning(f"Receipt tracker poll failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def get_receipt(self, txn_hash):
+        """Return (receipt, error); the receipt is None for a transaction not mined yet."""
+        try:
+            return self.web3.eth.get_transaction_receipt(txn_hash), None
+        except TransactionNotFound:
+            return None, None
+        except Exception as e:
+            return None, e
+
+    def resolve(self, hashes, retry_missing=False):
+        """Fetch receipts for tracked hashes and resolve the futures of the mined ones.
+
+        Returns the hashes to look up again next poll: those whose lookup failed and,
+        with `retry_missing`, those the node had no receipt for yet.
+        """
+        if self.fetcher is None:
+            replies = self.executor.map(self.get_receipt, hashes)
+        else:
+            replies = [(AttributeDict.recursive(receipt_formatter(result)) if result else None, error)
+                       for result, error in self.fetcher.fetch_results(
+                           len(hashes), lambda i: ('eth_getTransactionReceipt', [hashes[i]]), null_ok=True)]
+        retry = []
+        for txn_hash, (receipt, error) in zip(hashes, replies):
+            if receipt is None:
+                if error is not None or retry_missing:
+                    retry.append(txn_hash)
+                continue
+            with self.lock:
+                entry = self.pending.pop(txn_hash, None)
+            if entry is not None:
+                entry[0].set_result(receipt)
+        return retry
+
+    def poll(self):
+        """Resolve receipts for newly tracked hashes and for tracked hashes in new blocks.
+
+        Hashes are only dropped from `fresh` once looked up; whatever could not be
+        resolved (the poll failed, or a lookup errored) goes back for the next poll.
+        A hash seen in a block is looked up again until the node returns its receipt.
+        """
+        with self.lock:
+            fresh, self.fresh = self.fresh, []
+        unresolved = fresh
+        try:
+            latest = self.web3.eth.block_number
+            first = latest + 1 if self.last_block is None else self.last_block + 1
+            mined = []
+            for number in range(first, latest + 1):
+                for txn_hash in self.web3.eth.get_block(number)['transactions']:
+                    txn_hash = Web3.to_hex(txn_hash).lower()
+                    if txn_hash in self.pending:
+                        mined.append(txn_hash)
+            self.last_block = latest
+            # Their blocks are scanned now, so mined hashes can only be found by hash from here on
+            unresolved = fresh + mined
+            retry = self.resolve(mined, retry_missing=True)
+            unresolved = fresh + retry
+            # A fresh hash without a receipt is not mined yet; later block scans will find it
+            retry += self.resolve([txn_hash for txn_hash in fresh if txn_hash in self.pending])
+            unresolved = retry
+        finally:
+            with self.lock:
+                self.fresh.extend(txn_hash for txn_hash in dict.fromkeys(unresolved) if txn_hash in self.pending)
+
+        now = time.monotonic()
+        with self.lock:
+            expired = [txn_hash for txn_hash, (_, deadline) in self.pending.items() if deadline < now]
+            for txn_hash in expired:
+                future, _ = self.pending.pop(txn_hash)
+                future.set_exception(TimeExhausted(f"Transaction {txn_hash} was not mined in {self.timeout} seconds."))
+
+
+class TransactionSender:
+    """Signs and sends transactions without waiting for them to be mined.
+
+    Nonces come from a NonceManager, so many transactions from one account can be in
+    flight at once; a transaction the node rejects for its nonce is resent with a
+    fresh one after a resync. `submit` hands the work to a small thread pool and
+    returns at once with a future for the receipt, which a ReceiptTracker resolves.
+    """
+
+    def __init__(self, web3, workers=None, poll_interval=None, receipt_timeout=None, fetcher=None):
+        self.web3 = web3
+        self.nonces = NonceManager(web3)
+        self.receipts = ReceiptTracker(web3, poll_interval, receipt_timeout, fetcher)
+        self.executor = ThreadPoolExecutor(max_workers=workers or SENDER_WORKERS)
+        self._chain_id = None
+
+    @property
+    def chain_id(self):
+        """The node's chain id, asked once (build_transaction asks for it on every call otherwise)."""
+        if self._chain_id is None:
+            self._chain_id = self.web3.eth.chain_id
+        return self._chain_id
+
+    def send(self, account, private_key, transaction):
+        """Assign a nonce, sign and send a transaction dict; return its hash."""
+        for attempt in range(NONCE_RETRIES + 1):
+            nonce = self.nonces.reserve(account)
+            signed_txn = self.web3.eth.account.sign_transaction(dict(transaction, nonce=nonce), private_key)
+            try:
+                return self.web3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            except Exception as e:
+                self.nonces.resync(account)  # The reserved nonce may now be a gap
+                if not (isinstance(e, ValueError) and is_nonce_error(e)) or attempt == NONCE_RETRIES:
+                    raise
+
+    def submit(self, account, private_key, transaction):
+        """Send a transaction in the background; return a Future that resolves to its receipt."""
+        receipt = Future()
+
+        def forward(tracked):
+            if tracked.exception() is not None:
+                receipt.set_exception(tracked.exception())
+            else:
+                receipt.set_result(tracked.result())
+
+        def send():
+            try:
+                txn_hash = self.send(account, private_key, transaction)
+            except Exception as e:
+                receipt.set_exception(e)
+            else:
+                self.receipts.track(txn_hash).add_done_callback(forward)
+
+        self.executor.submit(send)
+        return receipt
+
+    def sign_many(self, private_key, transactions):
+        """Sign many transactions, in a process pool when there is more than one chunk and CPU."""
+        chunks = [transactions[i:i + SIGNING_CHUNK] for i in range(0, len(transactions), SIGNING_CHUNK)]
+        workers = min(SIGNING_WORKERS or os.cpu_count() or 1, len(chunks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                signed = list(pool.map(sign_transactions, repeat(private_key), chunks))
+        else:
+            signed = [sign_transactions(private_key, chunk) for chunk in chunks]
+        return [pair for chunk in signed for pair in chunk]
+
+    def send_many(self, account, private_key, transactions, fetcher):
+        """Sign and send transactions with consecutive nonces in JSON-RPC batches.
+
+        `fetcher` is a block_fetcher.BlockFetcher for the same node. Returns a
+        (hash, error) pair per transaction, in order. A rejected transaction leaves a
+        nonce gap that would hold back every later one, so gaps before the last sent
+        transaction are filled with zero-value transfers to the account itself.
+        """
+        first = self.nonces.reserve(account, len(transactions))
+        signed = self.sign_many(private_key, [dict(transaction, nonce=first + i)
+                                              for i, transaction in enumerate(transactions)])
+        replies = fetcher.fetch_results(
+            len(signed), lambda i: ('eth_sendRawTransaction', [Web3.to_hex(signed[i][0])]))
+        results = []
+        for (_, txn_hash), (_, error) in zip(signed, replies):
+            if error is not None and 'already known' not in str(error).lower():  # Known: an earlier retry arrived
+                results.append((None, ValueError(error)))
+            else:
+                results.append((Web3.to_hex(txn_hash), None))
+
+        failed = [i for i, (_, error) in enumerate(results) if error is not None]
+        if failed:
+            last_sent = max((i for i, (txn_hash, _) in enumerate(results) if txn_hash), default=-1)
+            for i in failed:
+                if i < last_sent:
+                    self.fill_gap(account, private_key, transactions[i], first + i)
+            self.nonces.resync(account)
+        return results
+
+    def fill_gap(self, account, private_key, transaction, nonce):
+        """Use up a nonce with a zero-value transfer to the account itself."""
+        filler = {'to': account, 'value': 0, 'gas': 21000, 'nonce': nonce, 'chainId': transaction['chainId'],
+                  'gasPrice': transaction.get('gasPrice') or self.web3.eth.gas_price}
+        try:
+            self.web3.eth.send_raw_transaction(Account.sign_transaction(filler, private_key).rawTransaction)
+        except Exception as e:
+            logger.warning(f"Could not fill nonce gap {nonce} for {account}: {e}")
+
+    def submit_many(self, account, private_key, transactions, fetcher):
+        """Like `send_many`, but return a Future per transaction that resolves to its receipt."""
+        futures = []
+        for txn_hash, error in self.send_many(account, private_key, transactions, fetcher):
+            if error is not None:
+                future = Future()
+                future.set_exception(error)
+            else:
+                future = self.receipts.track(txn_hash)
+            futures.append(future)
+        return futures
+
+    def shutdown(self):
+        """Wait for queued sends to finish and stop the worker threads."""
+        self.executor.shutdown(wait=True)
+
+
+senders = {}  # id(web3) -> (web3, TransactionSender)
+senders_lock = threading.Lock()
+
+
+def get_sender(web3, fetcher=None):
+    """Return the process-wide TransactionSender for a Web3 instance.
+
+    Objects sharing an endpoint (see web3_provider) then share one nonce count per
+    account, instead of handing out the same nonces to each other. A BlockFetcher,
+    if given, lets the sender's receipt tracker batch its receipt requests.
+    """
+    with senders_lock:
+        entry = senders.get(id(web3))
+        if entry is None or entry[0] is not web3:
+            entry = senders[id(web3)] = (web3, TransactionSender(web3))
+        if fetcher is not None and entry[1].receipts.fetcher is None:
+            entry[1].receipts.fetcher = fetcher
+        return entry[1]
+
+
+def get_receipt_tracker(web3):
+    """Return the process-wide ReceiptTracker for a Web3 instance.
+
+    All callers waiting on the same endpoint share its single polling thread, rather
+    than each running a wait_for_transaction_receipt loop.
+    """
+    return get_sender(web3).receipts
+
+
+# Example usage
+if __name__ == "__main__":
+    from web3_provider import get_web3
+
+    provider_url = "https://mainnet.infura.io/v3/your_infura_project_id"
+    sender = get_sender(get_web3(provider_url))
+    account = "0xYourEthereumAddress"
+    private_key = "your_private_key"
+    transactions = [
+        {'to': "0xRecipientAddress", 'value': 10 ** 15, 'gas': 21000,
+         'gasPrice': Web3.to_wei('50', 'gwei'), 'chainId': sender.chain_id}
+        for _ in range(100)
+    ]
+    futures = [sender.submit(account, private_key, transaction) for transaction in transactions]
+    print(f"Submitted {len(futures)} transactions")
+    for future in futures:
+        print(f"Mined in block {future.result()['blockNumber']}")
+    sender.shutdown()
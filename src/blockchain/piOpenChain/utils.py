@@ -1,10 +1,63 @@
-import hashlib
+import struct
 import time
 import json
 
+from config import Config
+from hashing import digest, hexdigest
+
+# Canonical block hash input: index, timestamp, previous hash, Merkle root of the block's
+# transactions (zero bytes if it has none), data length, then the data bytes.
+BLOCK_HASH_PREFIX = struct.Struct('<Qq32s32sI')
+# Mined blocks append their nonce as a fixed-width integer.
+NONCE = struct.Struct('<Q')
+NULL_HASH = bytes(32)
+
 def hash_string(input_string):
-    """Generate a SHA-256 hash of the input string."""
-    return hashlib.sha256(input_string.encode()).hexdigest()
+    """Generate the hex hash (Config.HASH_ALGORITHM) of the input string."""
+    return hexdigest(input_string.encode())
+
+def pack_hash(hex_hash):
+    """Convert a hex hash to its 32 raw bytes ('0' is the genesis placeholder)."""
+    if hex_hash == '0':
+        return NULL_HASH
+    raw = bytes.fromhex(hex_hash)
+    if len(raw) != 32:
+        raise ValueError(f"Hash must be 32 bytes, got {len(raw)}.")
+    return raw
+
+def unpack_hash(raw_hash):
+    """Convert 32 raw hash bytes back to hex ('0' for the genesis placeholder)."""
+    raw_hash = bytes(raw_hash)
+    return '0' if raw_hash == NULL_HASH else raw_hash.hex()
+
+def encode_data(data):
+    """Stable byte encoding of block data: compact JSON with sorted keys."""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str).encode()
+
+def block_hash_prefix(index, previous_hash, timestamp, data, merkle_root=None):
+    """Return the canonical hash input of a block, without the nonce."""
+    data_bytes = encode_data(data)
+    root = bytes.fromhex(merkle_root) if merkle_root else NULL_HASH
+    return BLOCK_HASH_PREFIX.pack(index, timestamp, pack_hash(previous_hash), root, len(data_bytes)) + data_bytes
+
+def calculate_block_digest(index, previous_hash, timestamp, data, nonce=None, merkle_root=None):
+    """Calculate the raw hash of a block; mined blocks also commit to their nonce."""
+    block_bytes = block_hash_prefix(index, previous_hash, timestamp, data, merkle_root)
+    if nonce is not None:
+        block_bytes += NONCE.pack(nonce)
+    return digest(block_bytes)
+
+def calculate_block_hash(index, previous_hash, timestamp, data, nonce=None, merkle_root=None):
+    """Calculate the hex hash of a block; mined blocks also commit to their nonce."""
+    return calculate_block_digest(index, previous_hash, timestamp, data, nonce, merkle_root).hex()
+
+def to_units(value):
+    """Convert a coin amount (e.g. 1.5) to integer minimal units."""
+    return int(round(value * 10 ** Config.COIN_DECIMALS))
+
+def from_units(units):
+    """Convert integer minimal units back to a coin amount."""
+    return units / 10 ** Config.COIN_DECIMALS
 
 def get_current_timestamp():
     """Return the current timestamp as an integer."""
@@ -24,8 +77,8 @@ def validate_address(address):
     return isinstance(address, str) and len(address) > 0
 
 def validate_amount(amount):
-    """Validate that the amount is a positive number."""
-    return isinstance(amount, (int, float)) and amount > 0
+    """Validate that the amount is a positive number of minimal units."""
+    return isinstance(amount, int) and not isinstance(amount, bool) and amount > 0
 
 # Example usage
 if __name__ == "__main__":
@@ -47,5 +100,6 @@ if __name__ == "__main__":
     address = "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa"
     print(f"Is valid address? {validate_address(address)}")
 
-    amount = 100
+    amount = to_units(1.5)
+    print(f"1.5 PI in minimal units: {amount}")
     print(f"Is valid amount? {validate_amount(amount)}")
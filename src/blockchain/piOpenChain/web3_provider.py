@@ -0,0 +1,128 @@
+# src/blockchain/piOpenChain/web3_provider.py
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+# This module is shared by every blockchain package (imported by its flat name, like the
+# rest of piOpenChain), so its settings live here rather than in one package's Config.
+POOL_SIZE = 32              # Keep-alive connections kept open per endpoint
+REQUEST_TIMEOUT = 30        # Seconds before a JSON-RPC request is abandoned
+HEALTH_CHECK_INTERVAL = 30  # Seconds an endpoint's health check result is reused
+HEALTH_CHECK_TIMEOUT = 5    # Seconds a health check waits for the node to answer
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that sends every request through one given requests.Session.
+
+    web3's own HTTPProvider keeps a session per thread, so threads sharing a provider
+    still open their own connections; this one shares a single pool between them.
+    """
+
+    def __init__(self, endpoint_uri, session, request_kwargs=None):
+        super().__init__(endpoint_uri, request_kwargs)
+        self.session = session
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=request_data, **self.get_request_kwargs())
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
+class ProviderRegistry:
+    """Process-wide Web3 instances, one per endpoint URL, over pooled keep-alive sessions.
+
+    Every caller asking for the same endpoint gets the same Web3 object and HTTP
+    session, so objects built per request or per user share one connection pool
+    instead of each opening its own. Endpoints are health-checked lazily: the first
+    `is_connected` call asks the node, and the answer is reused for
+    `health_check_interval` seconds.
+    """
+
+    def __init__(self, pool_size=None, request_timeout=None, health_check_interval=None):
+        self.pool_size = pool_size or POOL_SIZE
+        self.request_timeout = request_timeout or REQUEST_TIMEOUT
+        self.health_check_interval = HEALTH_CHECK_INTERVAL if health_check_interval is None else health_check_interval
+        self.lock = threading.Lock()
+        self.sessions = {}  # endpoint -> requests.Session
+        self.instances = {}  # endpoint -> Web3
+        self.health = {}  # endpoint -> (checked at, healthy)
+
+    def get_session(self, endpoint):
+        """Return the shared keep-alive session for an endpoint, creating it on first use."""
+        with self.lock:
+            session = self.sessions.get(endpoint)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self.sessions[endpoint] = session
+            return session
+
+    def get_web3(self, endpoint):
+        """Return the shared Web3 instance for an endpoint. No request is made."""
+        web3 = self.instances.get(endpoint)
+        if web3 is None:
+            session = self.get_session(endpoint)
+            with self.lock:
+                web3 = self.instances.get(endpoint)
+                if web3 is None:
+                    provider = PooledHTTPProvider(endpoint, session, {'timeout': self.request_timeout})
+                    web3 = self.instances[endpoint] = Web3(provider)
+        return web3
+
+    def is_connected(self, endpoint):
+        """Return whether the endpoint answers JSON-RPC, asking it at most once per interval."""
+        checked = self.health.get(endpoint)
+        now = time.monotonic()
+        if checked is not None and now - checked[0] < self.health_check_interval:
+            return checked[1]
+        payload = {'jsonrpc': '2.0', 'id': 0, 'method': 'web3_clientVersion', 'params': []}
+        try:
+            response = self.get_session(endpoint).post(endpoint, json=payload, timeout=HEALTH_CHECK_TIMEOUT)
+            response.raise_for_status()
+            healthy = 'result' in response.json()
+        except (requests.RequestException, ValueError):
+            healthy = False
+        self.health[endpoint] = (now, healthy)
+        return healthy
+
+    def close(self):
+        """Close every pooled session and forget all endpoints."""
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+            self.instances.clear()
+            self.health.clear()
+
+
+registry = ProviderRegistry()
+
+
+def get_web3(endpoint):
+    """Return the process-wide Web3 instance for an endpoint."""
+    return registry.get_web3(endpoint)
+
+
+def get_session(endpoint):
+    """Return the process-wide keep-alive requests.Session for an endpoint."""
+    return registry.get_session(endpoint)
+
+
+def is_connected(endpoint):
+    """Return the endpoint's cached health check result, refreshing it when stale."""
+    return registry.is_connected(endpoint)
+
+
+# Example usage
+if __name__ == "__main__":
+    provider_url = "https://mainnet.infura.io/v3/your_infura_project_id"
+    web3 = get_web3(provider_url)
+    print(f"Same instance for the same endpoint: {web3 is get_web3(provider_url)}")
+    print(f"Connected: {is_connected(provider_url)}")
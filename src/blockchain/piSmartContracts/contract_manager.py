@@ -1,15 +1,17 @@
 # piSmartContracts/contract_manager.py
 
 import json
-from web3 import Web3
 from solcx import compile_source
 from .config import Config
+from .. import piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from transaction_sender import get_receipt_tracker
+from web3_provider import get_web3, is_connected
 
 class ContractManager:
     def __init__(self):
         # Initialize Web3 connection
-        self.web3 = Web3(Web3.HTTPProvider(Config.INFURA_URL))
-        if not self.web3.isConnected():
+        self.web3 = get_web3(Config.INFURA_URL)
+        if not is_connected(Config.INFURA_URL):
             raise Exception("Failed to connect to the Ethereum network.")
         
         # Load account from private key
@@ -35,8 +37,8 @@ class ContractManager:
             'gasPrice': self.web3.toWei('50', 'gwei')
         })
         
-        # Wait for transaction receipt
-        tx_receipt = self.web3.eth.waitForTransactionReceipt(tx_hash)
+        # Wait for the receipt on the shared tracker instead of polling for it here
+        tx_receipt = get_receipt_tracker(self.web3).track(tx_hash).result()
         print(f"Contract deployed at address: {tx_receipt.contractAddress}")
         return tx_receipt.contractAddress
 
@@ -1,23 +1,84 @@
 import numpy as np
 from sklearn.linear_model import LinearRegression
 import random
+from collections import deque
+
+WINDOW_SIZE = 1000  # Most recent network conditions the models learn from
+
+class SlidingWindowTrend:
+    """Least-squares linear trend over the last `window` observations, updated in O(1).
+
+    Observations are indexed 0..n-1 within the window, so the fit equals a
+    LinearRegression on (index, value) pairs of the window. Only sum(y) and
+    sum(index * y) are kept; when the window slides, every index drops by one, which
+    lowers sum(index * y) by sum(y). The sums are recomputed from the window once
+    per `window` updates so rounding errors cannot accumulate.
+    """
+
+    def __init__(self, window=None):
+        self.window = window or WINDOW_SIZE
+        self.values = deque(maxlen=self.window)
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def update(self, y):
+        """Add an observation, dropping the oldest one once the window is full."""
+        index = len(self.values)
+        if index == self.window:
+            # The oldest observation leaves and every remaining index drops by one
+            self.sum_y -= self.values[0]
+            self.sum_xy -= self.sum_y
+            index -= 1
+        self.sum_xy += index * y
+        self.sum_y += y
+        self.values.append(y)
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.sum_y = float(sum(self.values))
+            self.sum_xy = float(np.dot(np.arange(len(self.values)), self.values))
+
+    def coefficients(self):
+        """Return (intercept, slope) of the current fit, or None with fewer than two observations."""
+        n = len(self.values)
+        if n < 2:
+            return None
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        slope = (n * self.sum_xy - sum_x * self.sum_y) / (n * sum_xx - sum_x * sum_x)
+        return (self.sum_y - slope * sum_x) / n, slope
+
+    def predict(self, steps_ahead=1):
+        """Predict the observation `steps_ahead` steps after the newest one."""
+        coefficients = self.coefficients()
+        if coefficients is None:
+            return None
+        intercept, slope = coefficients
+        return intercept + slope * (len(self.values) - 1 + steps_ahead)
 
 class AdaptiveConsensus:
-    def __init__(self):
-        self.network_conditions = []  # List to store network conditions
-        self.model = LinearRegression()  # Machine learning model for prediction
+    def __init__(self, window=None, online=True):
+        self.window = window or WINDOW_SIZE
+        self.network_conditions = deque(maxlen=self.window)  # Most recent network conditions
+        self.model = LinearRegression()  # Machine learning model for prediction (batch path)
         self.is_trained = False  # Flag to check if the model is trained
+        self.online = online  # Predict from the incremental trend instead of the batch model
+        self.trend = SlidingWindowTrend(self.window)
 
     def update_network_conditions(self, condition):
-        """Update the list of network conditions with a new condition."""
+        """Record a new network condition; the online trend is updated right away."""
         self.network_conditions.append(condition)
+        self.trend.update(condition)
 
     def train_model(self):
-        """Train the machine learning model based on historical network conditions."""
+        """Train the machine learning model based on the recent network conditions."""
         if len(self.network_conditions) < 2:
             print("Not enough data to train the model.")
             return
-        
+
         # Prepare data for training
         X = np.array(range(len(self.network_conditions))).reshape(-1, 1)  # Time steps
         y = np.array(self.network_conditions)  # Network conditions
@@ -26,22 +87,26 @@ class AdaptiveConsensus:
         print("Model trained successfully.")
 
     def predict_network_condition(self):
-        """Predict the next network condition using the trained model."""
+        """Predict the next network condition, from the online trend or the trained model."""
+        if self.online:
+            predicted_condition = self.trend.predict()
+            if predicted_condition is None:
+                print("Not enough data to predict.")
+            return predicted_condition
+
         if not self.is_trained:
             print("Model is not trained yet.")
             return None
-        
+
         next_time_step = np.array([[len(self.network_conditions)]])  # Next time step
         predicted_condition = self.model.predict(next_time_step)
         return predicted_condition[0]
 
     def decide_consensus(self):
         """Decide whether consensus is reached based on the predicted network condition."""
-        if not self.is_trained:
-            print("Model is not trained yet.")
-            return "No consensus"
-
         predicted_condition = self.predict_network_condition()
+        if predicted_condition is None:
+            return "No consensus"
         print(f"Predicted Network Condition: {predicted_condition}")
 
         # Define a threshold for consensus
@@ -51,16 +116,19 @@ class AdaptiveConsensus:
 # Example usage
 if __name__ == "__main__":
     consensus = AdaptiveConsensus()
-    
+
     # Simulate updating network conditions
     for _ in range(10):
         condition = random.uniform(0, 1)  # Random network condition between 0 and 1
         consensus.update_network_conditions(condition)
         print(f"Updated Network Condition: {condition}")
 
-    # Train the model
-    consensus.train_model()
+    # Decide consensus from the online trend, no training needed
+    result = consensus.decide_consensus()
+    print(result)
 
-    # Decide consensus
+    # The batch model gives the same prediction once trained
+    consensus.train_model()
+    consensus.online = False
     result = consensus.decide_consensus()
     print(result)
@@ -1,51 +1,108 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+import atexit
+import json
+import math
+import os
+
+from flask import Flask, Response, request, jsonify, stream_with_context
+
+from src.blockchain.superBlockchain.ledger_store import LedgerStore
 
 app = Flask(__name__)
 
-# Initialize a DataFrame to store carbon credits
-carbon_credits = pd.DataFrame(columns=['id', 'owner', 'amount', 'type'])
+DATA_DIR = os.getenv('CARBON_DATA_DIR', 'data/carbon')  # Where the credit and emission ledgers live
+DEFAULT_PAGE_SIZE = 1000  # Records per page when the client does not pass `limit`
+MAX_PAGE_SIZE = 10000     # Largest page a client may request
+STREAM_BATCH_SIZE = 500   # Records serialized per chunk of a streamed page
 
-# Initialize a DataFrame to store emission records
-emission_records = pd.DataFrame(columns=['id', 'owner', 'amount', 'type'])
+# Columnar, chunked stores for carbon credits and emission records
+carbon_credits = LedgerStore(os.path.join(DATA_DIR, 'credits'))
+emission_records = LedgerStore(os.path.join(DATA_DIR, 'emissions'))
+atexit.register(carbon_credits.close)
+atexit.register(emission_records.close)
 
-@app.route('/create_credit', methods=['POST'])
-def create_credit():
-    data = request.json
-    credit_id = len(carbon_credits) + 1
+def parse_record(data):
+    """Validate a posted record; return (owner, amount, type) or raise ValueError."""
+    data = data or {}
     owner = data.get('owner')
     amount = data.get('amount')
-    credit_type = data.get('type')
+    record_type = data.get('type')
+    if not isinstance(owner, str) or not owner:
+        raise ValueError("'owner' must be a non-empty string.")
+    if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount):
+        raise ValueError("'amount' must be a finite number.")
+    if record_type is not None and not isinstance(record_type, str):
+        raise ValueError("'type' must be a string.")
+    return owner, amount, record_type
+
+def stream_page(store):
+    """Stream one page of a store as a JSON array; pagination details go in the headers."""
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': "'offset' and 'limit' must be integers."}), 400
+    if offset < 0 or limit < 1:
+        return jsonify({'error': "'offset' must be >= 0 and 'limit' >= 1."}), 400
+
+    total = len(store)
+    records = store.iter_records(offset, limit)
+
+    def generate():
+        yield '['
+        batch = []
+        separator = ''
+        for record in records:
+            batch.append(json.dumps(record))
+            if len(batch) == STREAM_BATCH_SIZE:
+                yield separator + ','.join(batch)
+                separator, batch = ',', []
+        if batch:
+            yield separator + ','.join(batch)
+        yield ']'
+
+    headers = {'X-Total-Count': str(total)}
+    if offset + limit < total:
+        headers['X-Next-Offset'] = str(offset + limit)
+    return Response(stream_with_context(generate()), mimetype='application/json', headers=headers)
+
+@app.route('/create_credit', methods=['POST'])
+def create_credit():
+    try:
+        owner, amount, credit_type = parse_record(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # Create a new carbon credit
-    new_credit = pd.DataFrame({'id': [credit_id], 'owner': [owner], 'amount': [amount], 'type': [credit_type]})
-    global carbon_credits
-    carbon_credits = pd.concat([carbon_credits, new_credit], ignore_index=True)
+    credit_id = carbon_credits.append(owner, amount, credit_type)
 
     return jsonify({'status': 'Credit created', 'credit_id': credit_id})
 
 @app.route('/track_emission', methods=['POST'])
 def track_emission():
-    data = request.json
-    emission_id = len(emission_records) + 1
-    owner = data.get('owner')
-    amount = data.get('amount')
-    emission_type = data.get('type')
+    try:
+        owner, amount, emission_type = parse_record(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # Create a new emission record
-    new_emission = pd.DataFrame({'id': [emission_id], 'owner': [owner], 'amount': [amount], 'type': [emission_type]})
-    global emission_records
-    emission_records = pd.concat([emission_records, new_emission], ignore_index=True)
+    emission_id = emission_records.append(owner, amount, emission_type)
 
     return jsonify({'status': 'Emission tracked', 'emission_id': emission_id})
 
 @app.route('/get_credits', methods=['GET'])
 def get_credits():
-    return jsonify(carbon_credits.to_dict(orient='records'))
+    return stream_page(carbon_credits)
 
 @app.route('/get_emissions', methods=['GET'])
 def get_emissions():
-    return jsonify(emission_records.to_dict(orient='records'))
+    return stream_page(emission_records)
+
+@app.route('/get_totals/<owner>', methods=['GET'])
+def get_totals(owner):
+    """Credit and emission totals of an owner, kept up to date on every insert."""
+    credits = carbon_credits.total(owner)
+    emissions = emission_records.total(owner)
+    return jsonify({'owner': owner, 'credits': credits, 'emissions': emissions, 'net': credits - emissions})
 
 if __name__ == '__main__':
     app.run(debug=True)
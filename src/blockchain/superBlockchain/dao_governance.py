@@ -1,10 +1,22 @@
+import threading
+from collections import OrderedDict
+
 from flask import Flask, request, jsonify
-from web3 import Web3
+
+import src.blockchain.piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from transaction_sender import get_receipt_tracker
+from web3_provider import get_web3
 
 app = Flask(__name__)
 
 # Connect to Ethereum network
-w3 = Web3(Web3.HTTPProvider('https://your.ethereum.node'))
+w3 = get_web3('https://your.ethereum.node')
+
+# Receipts are awaited by the shared tracker, not by request threads
+receipts = get_receipt_tracker(w3)
+MAX_TRACKED_TRANSACTIONS = 10000
+transaction_status = OrderedDict()  # tx hash -> 'pending', 'mined', 'reverted' or 'failed'
+status_lock = threading.Lock()  # Request threads and the tracker's callbacks both write transaction_status
 
 # Smart contract ABI and address
 contract_address = '0xYourContractAddress'
@@ -13,6 +25,27 @@ contract_abi = [...]  # Replace with your contract's ABI
 # Initialize contract
 contract = w3.eth.contract(address=contract_address, abi=contract_abi)
 
+def track_transaction(tx_hash):
+    """Record a sent transaction as pending until the tracker reports its receipt."""
+    tx_hash = tx_hash.hex()
+    with status_lock:
+        transaction_status[tx_hash] = 'pending'
+        while len(transaction_status) > MAX_TRACKED_TRANSACTIONS:
+            transaction_status.popitem(last=False)
+
+    def record(future):
+        if future.exception() is not None:
+            status = 'failed'
+        else:
+            status = 'mined' if future.result()['status'] == 1 else 'reverted'
+        with status_lock:
+            if tx_hash in transaction_status:  # Not evicted yet
+                transaction_status[tx_hash] = status
+
+    receipts.track(tx_hash, record)
+    return tx_hash
+
+
 @app.route('/create_proposal', methods=['POST'])
 def create_proposal():
     data = request.json
@@ -23,9 +56,8 @@ def create_proposal():
 
     # Create a proposal in the smart contract
     tx_hash = contract.functions.createProposal(title, description).transact({'from': sender})
-    w3.eth.waitForTransactionReceipt(tx_hash)
 
-    return jsonify({'status': 'Proposal created', 'tx_hash': tx_hash.hex()})
+    return jsonify({'status': 'Proposal submitted', 'tx_hash': track_transaction(tx_hash)}), 202
 
 
 @app.route('/vote', methods=['POST'])
@@ -37,9 +69,16 @@ def vote():
 
     # Cast a vote in the smart contract
     tx_hash = contract.functions.vote(proposal_id, vote_type).transact({'from': sender})
-    w3.eth.waitForTransactionReceipt(tx_hash)
 
-    return jsonify({'status': 'Vote cast', 'tx_hash': tx_hash.hex()})
+    return jsonify({'status': 'Vote submitted', 'tx_hash': track_transaction(tx_hash)}), 202
+
+
+@app.route('/transaction_status', methods=['GET'])
+def get_transaction_status():
+    tx_hash = request.args.get('tx_hash')
+    with status_lock:
+        status = transaction_status.get(tx_hash, 'unknown')
+    return jsonify({'tx_hash': tx_hash, 'status': status})
 
 
 @app.route('/get_proposals', methods=['GET'])
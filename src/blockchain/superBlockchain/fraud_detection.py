@@ -1,3 +1,11 @@
+import io
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -10,40 +18,151 @@ import logging
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+MODEL_PATH = os.getenv('FRAUD_MODEL_PATH', 'fraud_model.pkl')  # Trained model loaded at startup
+STATS_PATH = os.getenv('FRAUD_STATS_PATH', 'fraud_model_stats.json')  # Normalization statistics saved with it
+TARGET_COLUMN = 'Class'  # Label column of the training data
+MAX_BATCH_ROWS = 4096    # Most rows scored in one predict_proba call
+MAX_BATCH_DELAY = 0.002  # Seconds the scorer waits for more requests to join a batch
+MAX_FEATURE_VALUE = float(np.finfo(np.float32).max)  # Largest normalized value the trees accept (they score in float32)
+
 class FraudDetectionModel:
-    def __init__(self, model_path='fraud_model.pkl'):
-        self.model_path = model_path
+    def __init__(self, model_path=None, stats_path=None):
+        self.model_path = model_path or MODEL_PATH
+        self.stats_path = stats_path or STATS_PATH
         self.model = None
+        self.feature_names = None  # Feature order the model was trained with
+        self.mean = None   # Per-feature training means, in feature order
+        self.scale = None  # Per-feature 1 / training standard deviation
 
     def load_model(self):
-        """Load the trained model from a file."""
+        """Load the trained model and its normalization statistics, then warm them up."""
         self.model = joblib.load(self.model_path)
+        n_features = self.model.n_features_in_
+        names = getattr(self.model, 'feature_names_in_', None)
+        self.mean, self.scale = np.zeros(n_features), np.ones(n_features)
+        if os.path.exists(self.stats_path):
+            with open(self.stats_path) as f:
+                stats = json.load(f)
+            names = stats['columns'] if names is None else names
+            columns = {name: i for i, name in enumerate(stats['columns'])}
+            for i, name in enumerate(names):
+                if name in columns:
+                    self.mean[i] = stats['mean'][columns[name]]
+                    std = stats['std'][columns[name]]
+                    self.scale[i] = 1 / std if std else 1.0
+        else:
+            logging.warning("No normalization statistics at %s; scoring raw features.", self.stats_path)
+        self.feature_names = list(names) if names is not None else None
+        if hasattr(self.model, 'feature_names_in_'):
+            del self.model.feature_names_in_  # Features are passed as arrays already in this order
+        self.predict_proba(np.zeros((1, n_features)))  # First call pays for lazy initialization
         logging.info("Model loaded successfully.")
 
-    def predict(self, features):
-        """Make a prediction based on input features."""
+    def transform(self, features):
+        """Normalize a (rows, features) array with the stored training statistics."""
+        features = np.asarray(features, dtype=np.float64)
+        features = np.where(np.isnan(features), 0, features)  # Missing values become 0, as in training
+        return (features - self.mean) * self.scale
+
+    def invalid_rows(self, features):
+        """Mask of the rows that cannot be scored: infinite features, or ones out of range once normalized."""
+        with np.errstate(over='ignore', invalid='ignore'):
+            return ~(np.abs(self.transform(features)) <= MAX_FEATURE_VALUE).all(axis=1)
+
+    def predict_proba(self, features):
+        """Class probabilities for a (rows, features) array in the model's feature order."""
         if self.model is None:
             raise Exception("Model not loaded. Call load_model() first.")
-        return self.model.predict(features)
+        return self.model.predict_proba(self.transform(features))
 
-def preprocess_data(data):
-    """Preprocess the input data for model training."""
+    def predict(self, features):
+        """Make a prediction based on input features (a DataFrame or a (rows, features) array)."""
+        if isinstance(features, pd.DataFrame) and self.feature_names is not None:
+            features = features.reindex(columns=self.feature_names, fill_value=0).to_numpy()
+        if self.model is None:
+            raise Exception("Model not loaded. Call load_model() first.")
+        return self.model.classes_[self.predict_proba(features).argmax(axis=1)]
+
+class BatchScorer:
+    """Scores concurrent requests together.
+
+    Request threads submit() feature arrays and get a Future; one scoring thread
+    collects what arrives within MAX_BATCH_DELAY (up to MAX_BATCH_ROWS rows), runs a
+    single predict_proba over the stacked rows and hands each request its slice.
+    """
+
+    def __init__(self, model, max_rows=None, max_delay=None):
+        self.model = model
+        self.max_rows = max_rows or MAX_BATCH_ROWS
+        self.max_delay = MAX_BATCH_DELAY if max_delay is None else max_delay
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, features):
+        """Queue a (rows, features) array; the Future resolves to its probability rows."""
+        future = Future()
+        self.requests.put((np.asarray(features, dtype=np.float64), future))
+        return future
+
+    def collect(self):
+        """Block for one request, then gather more until the batch is full or the delay ends."""
+        batch = [self.requests.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_delay
+        while rows < self.max_rows:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            try:
+                probabilities = self.model.predict_proba(np.concatenate([features for features, _ in batch]))
+            except Exception:
+                # Score the requests one by one, so only the ones that cannot be scored fail
+                for features, future in batch:
+                    try:
+                        future.set_result(self.model.predict_proba(features))
+                    except Exception as e:
+                        future.set_exception(e)
+                continue
+            start = 0
+            for features, future in batch:
+                future.set_result(probabilities[start:start + len(features)])
+                start += len(features)
+
+def compute_normalization(data, exclude=(TARGET_COLUMN,)):
+    """Training-set mean and standard deviation of every numerical feature."""
+    columns = [column for column in data.select_dtypes(include=[np.number]).columns if column not in exclude]
+    return {'columns': columns, 'mean': data[columns].mean().tolist(), 'std': data[columns].std().fillna(0).tolist()}
+
+def preprocess_data(data, stats=None):
+    """Preprocess the input data for model training, normalizing with `stats` (default: from `data`)."""
     # Handle missing values
     data.fillna(0, inplace=True)
 
     # Encode categorical variables if necessary
     # Example: data = pd.get_dummies(data, columns=['categorical_column'])
 
-    # Normalize numerical features
-    numerical_cols = data.select_dtypes(include=[np.number]).columns.tolist()
-    data[numerical_cols] = (data[numerical_cols] - data[numerical_cols].mean()) / data[numerical_cols].std()
+    # Normalize numerical features; the same statistics must be used when scoring
+    stats = stats or compute_normalization(data)
+    columns = stats['columns']
+    std = np.array(stats['std'])
+    data[columns] = (data[columns] - np.array(stats['mean'])) / np.where(std == 0, 1, std)
 
     return data
 
-def train_model(data):
-    """Train the fraud detection model."""
-    X = data.drop('Class', axis=1)  # Features
-    y = data['Class']  # Target variable
+def train_model(data, stats, model_path=None, stats_path=None):
+    """Train the fraud detection model and save it with the normalization statistics it was trained on."""
+    X = data.drop(TARGET_COLUMN, axis=1)  # Features
+    y = data[TARGET_COLUMN]  # Target variable
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
@@ -55,30 +174,74 @@ def train_model(data):
     print(classification_report(y_test, y_pred))
     print(confusion_matrix(y_test, y_pred))
 
-    # Save the model
-    joblib.dump(model, 'fraud_model.pkl')
+    # Save the model and its statistics
+    joblib.dump(model, model_path or MODEL_PATH)
+    with open(stats_path or STATS_PATH, 'w') as f:
+        json.dump(stats, f)
     logging.info("Model trained and saved successfully.")
+    return model
+
+def read_features(model):
+    """Decode a /predict body into a (rows, features) array in the model's feature order.
+
+    Accepts a .npy array (Content-Type application/x-npy), or JSON as a dict of
+    feature columns or a list of records. Missing features are 0; raises ValueError if
+    there are no rows, a row has the wrong number of features, or a feature is infinite or
+    out of range once normalized.
+    """
+    if request.mimetype == 'application/x-npy':
+        features = np.load(io.BytesIO(request.get_data()), allow_pickle=False)
+        features = features.reshape(1, -1) if features.ndim == 1 else features
+    else:
+        data = request.get_json(force=True)
+        names = model.feature_names or range(model.model.n_features_in_)
+        if isinstance(data, dict):
+            rows = len(next(iter(data.values()), []))
+            features = np.column_stack([np.asarray(data[name], dtype=np.float64) if name in data else np.zeros(rows)
+                                        for name in names])
+        else:
+            features = np.array([[record.get(name, 0) for name in names] for record in data], dtype=np.float64)
+    if not len(features):
+        raise ValueError("no rows to score")
+    if features.ndim != 2 or features.shape[1] != model.model.n_features_in_:
+        raise ValueError(f"expected {model.model.n_features_in_} features per row")
+    invalid = np.flatnonzero(model.invalid_rows(features))
+    if len(invalid):
+        raise ValueError(f"rows {invalid[:10].tolist()} have infinite or out-of-range features")
+    return features
 
 # Flask application for real-time predictions
 app = Flask(__name__)
 fraud_model = FraudDetectionModel()
+if os.path.exists(fraud_model.model_path):
+    fraud_model.load_model()
+scorer = BatchScorer(fraud_model)
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """API endpoint for making predictions."""
-    data = request.get_json(force=True)
-    features = pd.DataFrame(data)
-    prediction = fraud_model.predict(features)
-    return jsonify({'prediction': prediction.tolist()})
+    if fraud_model.model is None:
+        return jsonify({'error': 'Model not loaded'}), 503
+    try:
+        features = read_features(fraud_model)
+    except Exception as e:
+        return jsonify({'error': f"Invalid features: {e}"}), 400
+
+    try:
+        probabilities = scorer.submit(features).result()
+    except ValueError as e:
+        return jsonify({'error': f"Invalid features: {e}"}), 400
+    classes = fraud_model.model.classes_
+    return jsonify({'prediction': classes[probabilities.argmax(axis=1)].tolist(),
+                    'probability': probabilities[:, -1].tolist()})  # Probability of the last class (fraud)
 
 if __name__ == "__main__":
-    # Load the model
-    fraud_model.load_model()
-
     # Example: Load and preprocess data, then train the model
     # df = pd.read_csv('path_to_your_data.csv')
-    # df = preprocess_data(df)
-    # train_model(df)
+    # stats = compute_normalization(df)
+    # df = preprocess_data(df, stats)
+    # train_model(df, stats)
+    # fraud_model.load_model()
 
     # Start the Flask app
     app.run(host='0.0.0.0', port=5000)
@@ -1,15 +1,148 @@
+import atexit
+import json
+import math
+import os
+import time
+
 from flask import Flask, request, jsonify
 import logging
+import numpy as np
+import pandas as pd
+
+from src.blockchain.superBlockchain.timeseries_store import ROLLUPS, IngestQueue, TimeSeriesStore, in_window
 
 app = Flask(__name__)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# In-memory storage for IoT device data
-device_data = {}
+DATA_DIR = os.getenv('IOT_DATA_DIR', 'data/iot')  # Where device time series are stored
+RESOLUTIONS = {'raw': None, '1m': 60, '1h': 3600}  # Read resolutions accepted by /get_device_data
+MAX_POINTS = 2000  # Most points returned per metric; 'auto' picks the finest resolution within it
+DEFAULT_RANGE = 3600  # Seconds of history returned when the client passes no `start`
+MAX_BULK_ITEMS = 100000     # Most items accepted in one /send_data_bulk request
+MAX_REPORTED_ERRORS = 100   # Rejected items listed individually in a bulk response
+
+# Time-series storage for IoT device data, and the device registry
+device_data = TimeSeriesStore(DATA_DIR)
+device_data.start_maintenance()
+atexit.register(device_data.close)
+# Bulk ingestion is acknowledged once validated and written by a background thread
+ingest_queue = IngestQueue(device_data)
+atexit.register(ingest_queue.close)
 device_registry = {}
 
+def as_number(value):
+    """Return a JSON value as a float, or NaN if it is not a number (bools are not numbers here)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return np.nan
+    try:
+        return float(value)
+    except OverflowError:  # An integer too large for a float
+        return np.nan
+
+def parse_readings(sensor_data):
+    """Map sensor data (a number, or a dict of metric name -> number) to {metric: float value}."""
+    readings = sensor_data if isinstance(sensor_data, dict) else {'value': sensor_data}
+    parsed = {}
+    for metric, value in readings.items():
+        parsed[metric] = as_number(value)
+        if not math.isfinite(parsed[metric]):
+            raise ValueError(f"Reading '{metric}' must be a finite number.")
+    return parsed
+
+def read_bulk_items():
+    """Decode a bulk request body: a JSON array, NDJSON or a msgpack stream of readings."""
+    body = request.get_data()
+    if request.mimetype == 'application/x-ndjson':
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    if request.mimetype in ('application/msgpack', 'application/x-msgpack'):
+        import msgpack  # Only needed by clients that send msgpack
+
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(body)
+        items = list(unpacker)
+        # A stream of packed readings, or a single packed array of them
+        return items[0] if len(items) == 1 and isinstance(items[0], list) else items
+    items = json.loads(body)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of readings.")
+    return items
+
+def numeric_column(column):
+    """Convert a list of JSON values to float64, with NaN for anything that is not a number."""
+    if set(map(type, column)) <= {int, float}:
+        try:
+            return np.array(column, dtype=np.float64)
+        except OverflowError:
+            pass
+    # Lists, objects, strings, bools or huge integers among the values: convert element by element
+    return np.fromiter(map(as_number, column), dtype=np.float64, count=len(column))
+
+def validate_bulk(items, now):
+    """Flatten bulk items into reading columns and validate them as arrays.
+
+    Returns (columns, errors): the device id, metric, timestamp and value columns of the
+    valid readings, and the first error of each rejected item, keyed by item index.
+    """
+    positions, device_ids, metrics, timestamps, values = [], [], [], [], []
+    errors = {}
+    for index, item in enumerate(items):
+        if (not isinstance(item, dict) or not isinstance(item.get('device_id'), (str, int))
+                or item.get('sensor_data') is None):
+            errors[index] = 'Expected an object with device_id and sensor_data.'
+            continue
+        sensor_data = item['sensor_data']
+        readings = sensor_data if isinstance(sensor_data, dict) else {'value': sensor_data}
+        timestamp = item.get('timestamp', now)
+        for metric, value in readings.items():
+            positions.append(index)
+            device_ids.append(item.get('device_id'))
+            metrics.append(metric)
+            timestamps.append(timestamp)
+            values.append(value)
+
+    positions = np.array(positions, dtype=np.int64)
+    device_codes, devices = pd.factorize(np.array(device_ids, dtype=object))
+    registered = np.array([device_id in device_registry for device_id in devices], dtype=bool)
+    timestamps, values = numeric_column(timestamps), numeric_column(values)
+    checks = (
+        (registered[device_codes] if len(devices) else np.zeros(len(positions), bool), 'Device not registered'),
+        (np.isfinite(timestamps), "'timestamp' must be a finite number."),
+        (in_window(timestamps, now), "'timestamp' is past retention or ahead of the server clock."),
+        (np.isfinite(values), 'Readings must be finite numbers.'),
+    )
+    valid = np.ones(len(positions), dtype=bool)
+    for passed, error in checks:
+        failed = valid & ~passed
+        for index in np.unique(positions[failed]).tolist():
+            errors.setdefault(index, error)
+        valid &= passed
+    # An item is rejected as a whole if any of its readings failed
+    valid &= ~np.isin(positions, np.unique(positions[~valid]))
+    columns = (np.array(device_ids, dtype=object)[valid], np.array(metrics, dtype=object)[valid],
+               timestamps[valid], values[valid])
+    return columns, errors
+
+def pick_resolution(name, start, end):
+    """Resolve a resolution name; 'auto' is the finest one with at most MAX_POINTS buckets."""
+    if name == 'auto':
+        for resolution in sorted(ROLLUPS):
+            if (end - start) / resolution <= MAX_POINTS:
+                return resolution
+        return max(ROLLUPS)
+    if name not in RESOLUTIONS:
+        raise ValueError(f"'resolution' must be 'auto' or one of {sorted(RESOLUTIONS)}.")
+    return RESOLUTIONS[name]
+
+def to_json_series(rows, resolution):
+    """Columnar JSON for one metric: raw timestamps/values, or per-bucket count/mean/min/max."""
+    rows = rows[:MAX_POINTS]
+    if resolution is None:
+        return {'t': rows['t'].tolist(), 'value': rows['value'].tolist()}
+    return {'t': rows['t'].tolist(), 'count': rows['count'].tolist(),
+            'mean': (rows['sum'] / rows['count']).tolist(), 'min': rows['min'].tolist(), 'max': rows['max'].tolist()}
+
 @app.route('/register_device', methods=['POST'])
 def register_device():
     """Register a new IoT device."""
@@ -30,25 +163,71 @@ def send_data():
     data = request.json
     device_id = data.get('device_id')
     sensor_data = data.get('sensor_data')
+    timestamp = as_number(data.get('timestamp', time.time()))
 
     if device_id not in device_registry:
         return jsonify({'status': 'Device not registered'}), 400
 
-    if device_id not in device_data:
-        device_data[device_id] = []
+    try:
+        if not math.isfinite(timestamp):
+            raise ValueError("'timestamp' must be a finite number.")
+        device_data.append_metrics(device_id, parse_readings(sensor_data), timestamp)
+    except (TypeError, ValueError, OverflowError) as e:
+        return jsonify({'status': 'Invalid data', 'error': str(e)}), 400
 
-    device_data[device_id].append(sensor_data)
-    logging.info(f"Data received from {device_id}: {sensor_data}")
+    logging.debug("Data received from %s: %s", device_id, sensor_data)
     return jsonify({'status': 'Data received successfully'}), 200
 
+@app.route('/send_data_bulk', methods=['POST'])
+def send_data_bulk():
+    """Receive readings from many devices at once, as a JSON array, NDJSON or msgpack.
+
+    Each item looks like a /send_data body. Items are validated together and handed to
+    the background writer; the response only says which items were accepted.
+    """
+    try:
+        items = read_bulk_items()
+    except Exception as e:
+        return jsonify({'status': 'Invalid body', 'error': str(e)}), 400
+    if len(items) > MAX_BULK_ITEMS:
+        return jsonify({'status': f'At most {MAX_BULK_ITEMS} items per request'}), 413
+
+    columns, errors = validate_bulk(items, time.time())
+    if len(columns[0]) and not ingest_queue.submit(*columns):
+        return jsonify({'status': 'Ingest queue full, retry later'}), 503
+    logging.debug("Bulk batch: %d readings queued, %d items rejected", len(columns[0]), len(errors))
+    reported = sorted(errors.items())[:MAX_REPORTED_ERRORS]
+    return jsonify({'status': 'Accepted', 'accepted': len(columns[0]), 'rejected': len(errors),
+                    'errors': [{'index': index, 'error': error} for index, error in reported]}), 202
+
 @app.route('/get_device_data/<device_id>', methods=['GET'])
 def get_device_data(device_id):
-    """Retrieve data for a specific device."""
+    """Retrieve data for a specific device over a time range, at a given resolution.
+
+    Query parameters: start and end (Unix seconds, default the last hour), metric
+    (default all) and resolution ('auto', 'raw', '1m' or '1h'; default 'auto').
+    """
     if device_id not in device_registry:
         return jsonify({'status': 'Device not registered'}), 400
 
-    data = device_data.get(device_id, [])
-    return jsonify({'device_id': device_id, 'data': data}), 200
+    try:
+        end = float(request.args.get('end', time.time()))
+        start = float(request.args.get('start', end - DEFAULT_RANGE))
+        resolution = pick_resolution(request.args.get('resolution', 'auto'), start, end)
+    except ValueError as e:
+        return jsonify({'status': 'Invalid query', 'error': str(e)}), 400
+
+    metric = request.args.get('metric')
+    metrics = [metric] if metric else device_data.device_metrics(device_id)
+    series = {}
+    truncated = False
+    for name in metrics:
+        rows = device_data.query(device_id, name, start, end, resolution)
+        truncated = truncated or len(rows) > MAX_POINTS
+        series[name] = to_json_series(rows, resolution)
+    return jsonify({'device_id': device_id, 'start': start, 'end': end,
+                    'resolution': next(name for name, seconds in RESOLUTIONS.items() if seconds == resolution),
+                    'truncated': truncated, 'data': series}), 200
 
 @app.route('/get_all_devices', methods=['GET'])
 def get_all_devices():
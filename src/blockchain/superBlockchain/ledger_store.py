@@ -0,0 +1,265 @@
+import json
+import os
+import struct
+import threading
+from bisect import bisect_right
+
+import numpy as np
+
+CHUNK_SIZE = 65536  # Records buffered in memory before they are flushed to disk as one chunk
+
+LOG_RECORD = struct.Struct('<idi')  # Owner code, amount, type code: one buffered record in a buffer log
+
+
+class Dictionary:
+    """Append-only dictionary encoding of owner/type values, persisted as one JSON value per line."""
+
+    def __init__(self, path):
+        self.path = path
+        self.values = []  # code -> value
+        self.codes = {}   # value -> code
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    self.code(json.loads(line))
+        self.persisted = len(self.values)
+
+    def code(self, value):
+        """Return the code of a value, assigning the next one to values not seen before."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, values):
+        """Return the codes of many values as an int32 array."""
+        return np.fromiter(map(self.code, values), np.int32, len(values))
+
+    def persist(self):
+        """Append the values assigned since the last call to the dictionary file."""
+        if self.persisted < len(self.values):
+            with open(self.path, 'a') as f:
+                f.writelines(json.dumps(value) + '\n' for value in self.values[self.persisted:])
+            self.persisted = len(self.values)
+
+
+class LedgerStore:
+    """Append-only ledger of (owner, amount, type) records, stored column by column.
+
+    Appends are written into preallocated column buffers of `chunk_size` rows; a full
+    buffer is flushed to `path/chunk-<first row>/` as one .npy file per column and
+    memory-mapped back for reads, so an append never copies earlier records. Owner and
+    type values are dictionary encoded: the columns hold int32 codes and every new value
+    is appended once to owners.jsonl or types.jsonl. Record ids are 1-based row numbers.
+    Per-owner totals are updated on every append and rebuilt from the chunks on open.
+
+    Every buffered record is also written, unbuffered, to `buffer-<first row>.log` before
+    its id is returned, and the log is replayed into the buffer on open, so records
+    survive a crash of the process before their chunk is flushed. The log is not fsynced.
+    """
+
+    COLUMNS = (('owner', np.int32), ('amount', np.float64), ('type', np.int32))
+    LOG_DTYPE = np.dtype([('owner', '<i4'), ('amount', '<f8'), ('type', '<i4')])  # Layout of LOG_RECORD
+
+    def __init__(self, path, chunk_size=None):
+        self.path = path
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self.owners = Dictionary(os.path.join(path, 'owners.jsonl'))
+        self.types = Dictionary(os.path.join(path, 'types.jsonl'))
+        self.totals = np.zeros(max(len(self.owners.values), 1024))  # Indexed by owner code
+        self.chunks = []        # Memory-mapped columns of each flushed chunk
+        self.chunk_starts = []  # First row of each flushed chunk
+        self.flushed = 0
+        for name in sorted(os.listdir(path)):
+            if name.startswith('chunk-') and not name.endswith('.tmp'):  # .tmp: flush interrupted by a crash
+                self.load_chunk(os.path.join(path, name))
+        self.buffer = {name: np.empty(self.chunk_size, dtype) for name, dtype in self.COLUMNS}
+        self.buffered = 0
+        for name in os.listdir(path):
+            if name.startswith('buffer-') and int(name[len('buffer-'):-len('.log')]) < self.flushed:
+                os.remove(os.path.join(path, name))  # Its records reached a chunk before the log was removed
+        if os.path.exists(self.log_path()):
+            self.replay_log()
+        else:
+            self.log = open(self.log_path(), 'ab', buffering=0)
+
+    def __len__(self):
+        return self.flushed + self.buffered
+
+    def log_path(self):
+        """Path of the log of the records buffered since the last flush."""
+        return os.path.join(self.path, f'buffer-{self.flushed:012d}.log')
+
+    def replay_log(self):
+        """Load the records of an existing buffer log into the buffer, dropping a torn last record."""
+        with open(self.log_path(), 'rb') as f:
+            data = f.read()
+        records = np.frombuffer(data, self.LOG_DTYPE, len(data) // LOG_RECORD.size)
+        os.truncate(self.log_path(), records.nbytes)
+        self.log = open(self.log_path(), 'ab', buffering=0)
+        # The codes were persisted before the records were logged; re-logging starts after a flush
+        self.add_rows(records['owner'], records['amount'], records['type'], log=False)
+
+    def load_chunk(self, chunk_path):
+        columns = {name: np.load(os.path.join(chunk_path, f'{name}.npy'), mmap_mode='r') for name, _ in self.COLUMNS}
+        self.add_totals(columns['owner'], columns['amount'])
+        self.chunks.append(columns)
+        self.chunk_starts.append(self.flushed)
+        self.flushed += len(columns['owner'])
+
+    def grow_totals(self):
+        """Make room in the totals array for every owner code assigned so far."""
+        size = len(self.totals)
+        while size < len(self.owners.values):
+            size *= 2
+        if size > len(self.totals):
+            self.totals = np.concatenate([self.totals, np.zeros(size - len(self.totals))])
+
+    def add_totals(self, owner_codes, amounts):
+        self.grow_totals()
+        self.totals += np.bincount(owner_codes, weights=amounts, minlength=len(self.totals))
+
+    def append(self, owner, amount, record_type):
+        """Append one record and return its id."""
+        with self.lock:
+            code = self.owners.code(owner)
+            if code >= len(self.totals):
+                self.grow_totals()
+            row = self.buffered
+            self.buffer['owner'][row] = code
+            self.buffer['amount'][row] = amount
+            self.buffer['type'][row] = self.types.code(record_type)
+            self.totals[code] += amount
+            self.owners.persist()
+            self.types.persist()
+            self.log.write(LOG_RECORD.pack(code, amount, self.buffer['type'][row]))
+            self.buffered += 1
+            record_id = self.flushed + self.buffered
+            if self.buffered == self.chunk_size:
+                self.flush()
+            return record_id
+
+    def append_many(self, owners, amounts, record_types):
+        """Append many records given as equal-length columns; return the range of their ids."""
+        with self.lock:
+            owner_codes = self.owners.encode(owners)
+            amounts = np.asarray(amounts, dtype=np.float64)
+            type_codes = self.types.encode(record_types)
+            self.owners.persist()
+            self.types.persist()
+            first_id = len(self) + 1
+            self.add_rows(owner_codes, amounts, type_codes)
+            return range(first_id, len(self) + 1)
+
+    def add_rows(self, owner_codes, amounts, type_codes, log=True):
+        """Buffer encoded records, logging them unless `log` is false, and flush every full chunk."""
+        self.add_totals(owner_codes, amounts)
+        written = 0
+        while written < len(owner_codes):
+            count = min(self.chunk_size - self.buffered, len(owner_codes) - written)
+            rows = slice(self.buffered, self.buffered + count)
+            self.buffer['owner'][rows] = owner_codes[written:written + count]
+            self.buffer['amount'][rows] = amounts[written:written + count]
+            self.buffer['type'][rows] = type_codes[written:written + count]
+            if log:
+                records = np.empty(count, self.LOG_DTYPE)
+                for name, _ in self.COLUMNS:
+                    records[name] = self.buffer[name][rows]
+                self.log.write(records.tobytes())
+            self.buffered += count
+            written += count
+            if self.buffered == self.chunk_size:
+                self.flush()
+                log = True  # Records after a flush belong to the new, empty log
+
+    def flush(self):
+        """Write the buffered records to disk as a new chunk."""
+        with self.lock:
+            if not self.buffered:
+                return
+            # Dictionaries first, so every code in a chunk on disk can be decoded
+            self.owners.persist()
+            self.types.persist()
+            chunk_path = os.path.join(self.path, f'chunk-{self.flushed:012d}')
+            staging_path = chunk_path + '.tmp'
+            os.makedirs(staging_path, exist_ok=True)
+            for name, _ in self.COLUMNS:
+                np.save(os.path.join(staging_path, f'{name}.npy'), self.buffer[name][:self.buffered])
+            os.replace(staging_path, chunk_path)
+            self.chunks.append({name: np.load(os.path.join(chunk_path, f'{name}.npy'), mmap_mode='r')
+                                for name, _ in self.COLUMNS})
+            self.chunk_starts.append(self.flushed)
+            self.flushed += self.buffered
+            self.buffered = 0
+            # The chunk is in place, so the log of its records can go
+            self.log.close()
+            os.remove(self.log.name)
+            self.log = open(self.log_path(), 'ab', buffering=0)
+
+    def close(self):
+        """Flush any buffered records."""
+        self.flush()
+
+    def total(self, owner):
+        """Return the sum of the amounts recorded for an owner."""
+        code = self.owners.codes.get(owner)
+        return 0.0 if code is None else float(self.totals[code])
+
+    def all_totals(self):
+        """Return the total amount recorded per owner."""
+        return dict(zip(self.owners.values, self.totals[:len(self.owners.values)].tolist()))
+
+    def segments(self, offset, limit):
+        """Return the column slices covering rows [offset, offset + limit), with their first row."""
+        end = min(offset + limit, len(self))
+        segments = []
+        index = max(bisect_right(self.chunk_starts, offset) - 1, 0)
+        while offset < min(end, self.flushed):
+            start, columns = self.chunk_starts[index], self.chunks[index]
+            rows = slice(offset - start, min(end, start + len(columns['owner'])) - start)
+            segments.append((offset, {name: column[rows] for name, column in columns.items()}))
+            offset = start + rows.stop
+            index += 1
+        if offset < end:
+            rows = slice(offset - self.flushed, end - self.flushed)
+            # Buffer rows are copied, as they are overwritten once the buffer is flushed
+            segments.append((offset, {name: column[rows].copy() for name, column in self.buffer.items()}))
+        return segments
+
+    def iter_records(self, offset=0, limit=None):
+        """Yield records from `offset` on, at most `limit` of them, as dicts in id order.
+
+        The rows are fixed when the call is made; records appended while iterating are
+        not included.
+        """
+        with self.lock:
+            segments = self.segments(offset, len(self) if limit is None else limit)
+        owners, types = self.owners.values, self.types.values
+        for first_row, columns in segments:
+            for row, owner, amount, record_type in zip(range(first_row + 1, first_row + 1 + len(columns['owner'])),
+                                                       columns['owner'].tolist(), columns['amount'].tolist(),
+                                                       columns['type'].tolist()):
+                yield {'id': row, 'owner': owners[owner], 'amount': amount, 'type': types[record_type]}
+
+    def page(self, offset=0, limit=1000):
+        """Return up to `limit` records starting at `offset`."""
+        return list(self.iter_records(offset, limit))
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as path:
+        store = LedgerStore(path, chunk_size=4)
+        for i in range(10):
+            store.append(f"owner{i % 3}", 1.5 * i, 'forestry')
+        store.append_many(['owner0', 'owner1'], [10, 20], ['solar', 'solar'])
+        print(f"{len(store)} records, {len(store.chunks)} chunks on disk, {store.buffered} buffered")
+        print("Page 2:", store.page(offset=4, limit=4))
+        print("Totals:", store.all_totals())
+        store.close()
+        print("Reopened totals:", LedgerStore(path).all_totals())
@@ -2,9 +2,13 @@ from web3 import Web3
 from solcx import compile_source
 import json
 
+import src.blockchain.piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from transaction_sender import get_receipt_tracker
+
 class SmartContract:
     def __init__(self, w3, contract_source):
         self.w3 = w3
+        self.receipts = get_receipt_tracker(w3)
         self.contract_source = contract_source
         self.contract = None
         self.contract_address = None
@@ -24,13 +28,13 @@ class SmartContract:
             'from': account,
             'gas': gas_limit
         })
-        self.w3.eth.waitForTransactionReceipt(tx_hash)
-        self.contract_address = self.w3.eth.getTransactionReceipt(tx_hash)['contractAddress']
+        self.contract_address = self.receipts.track(tx_hash).result()['contractAddress']
         return self.contract_address
 
-    def execute_function(self, function_name, *args, account=None):
+    def execute_function(self, function_name, *args, account=None, callback=None):
+        """Send a contract call; return a Future for its receipt (callback(future) runs when mined)."""
         tx_hash = getattr(self.contract.functions, function_name)(*args).transact({'from': account})
-        return self.w3.eth.waitForTransactionReceipt(tx_hash)
+        return self.receipts.track(tx_hash, callback)
 
     def log_event(self, event_name):
         event_filter = self.contract.events[event_name].createFilter(fromBlock='latest')
@@ -43,7 +47,7 @@ class SmartContract:
             abi=new_contract_interface['abi']
         )
         tx_hash = new_contract.constructor().transact({'from': account})
-        self.w3.eth.waitForTransactionReceipt(tx_hash)
+        self.receipts.track(tx_hash).result()
         self.contract = new_contract
         return self.contract.address
 
@@ -72,7 +76,8 @@ if __name__ == "__main__":
     print("Contract deployed at:", contract_address)
 
     # Execute function
-    smart_contract.execute_function('setData', 'Hello, Blockchain!', account)
+    receipt = smart_contract.execute_function('setData', 'Hello, Blockchain!', account=account).result()
+    print("Mined in block:", receipt['blockNumber'])
 
     # Log events
     events = smart_contract.log_event('DataUpdated')
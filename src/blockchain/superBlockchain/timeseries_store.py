@@ -0,0 +1,465 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+from src.blockchain.superBlockchain.ledger_store import Dictionary
+
+RING_CAPACITY = 4096          # Raw readings buffered in memory per series before they are spilled
+SPILL_INTERVAL = 10           # Seconds between maintenance passes (spill, retention, save rollups)
+SEGMENT_DURATION = 24 * 3600  # Seconds of raw readings per segment file
+RAW_RETENTION = 7 * 24 * 3600  # Seconds raw readings are kept on disk
+MAX_CLOCK_SKEW = 300          # Seconds a reading's timestamp may be ahead of the server clock
+ROLLUPS = {60: 2 * 24 * 3600, 3600: 90 * 24 * 3600}  # Rollup resolution -> retention, in seconds
+WRITE_QUEUE_SIZE = 256        # Batches an IngestQueue holds before submit() reports it full
+
+READING = np.dtype([('t', 'f8'), ('value', 'f8')])
+BUCKET = np.dtype([('t', 'f8'), ('count', 'i8'), ('sum', 'f8'), ('min', 'f8'), ('max', 'f8')])
+
+
+class RingBuffer:
+    """Bounded FIFO of NumPy records: grows up to `capacity` rows, then overwrites its oldest ones."""
+
+    def __init__(self, dtype, capacity):
+        self.capacity = capacity
+        self.rows = np.zeros(min(capacity, 64), dtype)
+        self.start = 0  # Index of the oldest row
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, count):
+        """Grow the backing array (up to capacity) so `count` more rows fit without overwriting."""
+        needed = min(self.size + count, self.capacity)
+        if needed > len(self.rows):
+            rows = np.zeros(min(self.capacity, max(needed, 2 * len(self.rows))), self.rows.dtype)
+            rows[:self.size] = self.ordered()
+            self.rows, self.start = rows, 0
+
+    def last_index(self):
+        """Index of the newest row in the backing array."""
+        return (self.start + self.size - 1) % len(self.rows)
+
+    def append(self, row):
+        self.reserve(1)
+        self.rows[(self.start + self.size) % len(self.rows)] = row
+        if self.size == len(self.rows):
+            self.start = (self.start + 1) % len(self.rows)
+        else:
+            self.size += 1
+
+    def extend(self, rows):
+        self.reserve(len(rows))
+        length = len(self.rows)
+        rows = rows[-length:]
+        end = (self.start + self.size) % length
+        first = min(len(rows), length - end)
+        self.rows[end:end + first] = rows[:first]
+        self.rows[:len(rows) - first] = rows[first:]
+        overflow = max(self.size + len(rows) - length, 0)
+        self.start = (self.start + overflow) % length
+        self.size = min(self.size + len(rows), length)
+
+    def discard(self, count):
+        """Drop the `count` oldest rows."""
+        count = min(count, self.size)
+        self.start = (self.start + count) % len(self.rows)
+        self.size -= count
+
+    def ordered(self):
+        """Return the rows oldest first (a view unless the buffer has wrapped)."""
+        end = self.start + self.size
+        if end <= len(self.rows):
+            return self.rows[self.start:end]
+        return np.concatenate((self.rows[self.start:], self.rows[:end - len(self.rows)]))
+
+
+def changes(column):
+    """Boolean mask of the positions where a sorted column starts a new run of values."""
+    return np.concatenate((np.ones(min(len(column), 1), dtype=bool), column[1:] != column[:-1]))
+
+
+def in_window(timestamps, now):
+    """Mask of the timestamps no older than RAW_RETENTION and at most MAX_CLOCK_SKEW past `now`."""
+    return (timestamps >= now - RAW_RETENTION) & (timestamps <= now + MAX_CLOCK_SKEW)
+
+
+def aggregate(timestamps, values, resolution, groups=None):
+    """Fold time-ordered readings into rollup buckets of `resolution` seconds.
+
+    With `groups` (e.g. series numbers, sorted), a bucket never spans two groups.
+    Returns the bucket rows and the index of the first reading of each.
+    """
+    buckets = timestamps - timestamps % resolution
+    new_bucket = changes(buckets)
+    if groups is not None:
+        new_bucket |= changes(groups)
+    starts = np.flatnonzero(new_bucket)
+    rows = np.zeros(len(starts), BUCKET)
+    rows['t'] = buckets[starts]
+    rows['count'] = np.diff(starts, append=len(buckets))
+    rows['sum'] = np.add.reduceat(values, starts)
+    rows['min'] = np.minimum.reduceat(values, starts)
+    rows['max'] = np.maximum.reduceat(values, starts)
+    return rows, starts
+
+
+class Series:
+    """Readings of one device metric.
+
+    Raw readings collect in a ring buffer and are spilled by appending them to one
+    segment file per SEGMENT_DURATION window, read back through np.memmap. Every
+    reading also updates the rollups, which keep count/sum/min/max per bucket for
+    their retention period and are saved next to the segments. Readings must arrive
+    in time order per series.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.buffer = RingBuffer(READING, RING_CAPACITY)
+        self.rollups = {resolution: RingBuffer(BUCKET, retention // resolution)
+                        for resolution, retention in ROLLUPS.items()}
+        for resolution, rollup in self.rollups.items():
+            rollup_path = os.path.join(path, f'rollup-{resolution}.npy')
+            if os.path.exists(rollup_path):
+                rollup.extend(np.load(rollup_path))
+        segments = self.segments()
+        self.last_timestamp = self.load_segment(segments[-1][1])['t'][-1] if segments else -np.inf
+
+    def segments(self):
+        """Return (window, path) of the non-empty segment files, oldest first."""
+        segments = []
+        for name in os.listdir(self.path):
+            if name.startswith('segment-') and os.path.getsize(os.path.join(self.path, name)):
+                segments.append((int(name[len('segment-'):-len('.bin')]), os.path.join(self.path, name)))
+        return sorted(segments)
+
+    @staticmethod
+    def load_segment(segment_path):
+        return np.memmap(segment_path, dtype=READING, mode='r')
+
+    @staticmethod
+    def check_window(first, last, now):
+        """Reject readings between `first` and `last` that are past retention or too far in the future."""
+        if not in_window(np.array([first, last]), now).all():
+            raise ValueError(f"Reading timestamps must be within {RAW_RETENTION} s before and "
+                             f"{MAX_CLOCK_SKEW} s after the current time ({now}).")
+
+    def check_order(self, timestamp):
+        if timestamp < self.last_timestamp:
+            raise ValueError(f"Reading at {timestamp} is older than the latest one ({self.last_timestamp}).")
+
+    def append(self, timestamp, value, now=None):
+        self.check_window(timestamp, timestamp, time.time() if now is None else now)
+        self.check_order(timestamp)
+        if len(self.buffer) == self.buffer.capacity:
+            self.spill()
+        self.buffer.append((timestamp, value))
+        self.last_timestamp = timestamp
+        for resolution, rollup in self.rollups.items():
+            bucket = timestamp - timestamp % resolution
+            rows, index = rollup.rows, rollup.last_index()
+            if len(rollup) and rows['t'][index] == bucket:
+                rows['count'][index] += 1
+                rows['sum'][index] += value
+                rows['min'][index] = min(rows['min'][index], value)
+                rows['max'][index] = max(rows['max'][index], value)
+            else:
+                rollup.append((bucket, 1, value, value, value))
+
+    def append_many(self, timestamps, values, now=None):
+        """Append time-ordered arrays of readings."""
+        if not len(timestamps):
+            return
+        if not np.all(timestamps[1:] >= timestamps[:-1]):
+            raise ValueError("Readings must be in time order.")
+        self.check_window(timestamps[0], timestamps[-1], time.time() if now is None else now)
+        self.check_order(timestamps[0])
+        readings = np.empty(len(timestamps), READING)
+        readings['t'], readings['value'] = timestamps, values
+        self.extend(readings, {resolution: aggregate(timestamps, values, resolution)[0] for resolution in self.rollups})
+
+    def extend(self, readings, buckets):
+        """Add checked, time-ordered readings and their rollup buckets (resolution -> rows)."""
+        written = 0
+        while written < len(readings):
+            if len(self.buffer) == self.buffer.capacity:
+                self.spill()
+            count = min(self.buffer.capacity - len(self.buffer), len(readings) - written)
+            self.buffer.extend(readings[written:written + count])
+            written += count
+        self.last_timestamp = readings['t'][-1]
+        for resolution, rollup in self.rollups.items():
+            rows = buckets[resolution]
+            index = rollup.last_index()
+            if len(rollup) and rollup.rows['t'][index] == rows['t'][0]:
+                last = rollup.rows[index:index + 1]
+                last['count'] += rows['count'][0]
+                last['sum'] += rows['sum'][0]
+                last['min'] = np.minimum(last['min'], rows['min'][0])
+                last['max'] = np.maximum(last['max'], rows['max'][0])
+                rows = rows[1:]
+            rollup.extend(rows)
+
+    def spill(self):
+        """Append the buffered readings to their segment files and empty the buffer."""
+        readings = self.buffer.ordered()
+        windows = (readings['t'] // SEGMENT_DURATION).astype(np.int64)
+        bounds = np.flatnonzero(np.append(changes(windows), True))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            with open(os.path.join(self.path, f'segment-{windows[start]:08d}.bin'), 'ab') as f:
+                f.write(readings[start:end].tobytes())
+        self.buffer.discard(len(readings))
+
+    def save_rollups(self):
+        for resolution, rollup in self.rollups.items():
+            rollup_path = os.path.join(self.path, f'rollup-{resolution}.npy')
+            np.save(rollup_path + '.tmp.npy', rollup.ordered())
+            os.replace(rollup_path + '.tmp.npy', rollup_path)
+
+    def apply_retention(self, now):
+        """Delete raw segments and drop rollup buckets that are past their retention."""
+        for window, segment_path in self.segments():
+            if (window + 1) * SEGMENT_DURATION <= now - RAW_RETENTION:
+                os.remove(segment_path)
+        for resolution, rollup in self.rollups.items():
+            rollup.discard(np.searchsorted(rollup.ordered()['t'], now - ROLLUPS[resolution] - resolution, 'right'))
+
+    def query(self, start, end, resolution=None):
+        """Return raw readings (resolution None) or rollup buckets with start <= t < end, oldest first."""
+        if resolution is not None:
+            rows = self.rollups[resolution].ordered()
+            first, last = np.searchsorted(rows['t'], [start - start % resolution, end])
+            return rows[first:last].copy()
+        parts = []
+        for window, segment_path in self.segments():
+            if window * SEGMENT_DURATION < end and (window + 1) * SEGMENT_DURATION > start:
+                rows = self.load_segment(segment_path)
+                first, last = np.searchsorted(rows['t'], [start, end])
+                parts.append(np.array(rows[first:last]))
+        rows = self.buffer.ordered()
+        first, last = np.searchsorted(rows['t'], [start, end])
+        parts.append(rows[first:last].copy())
+        return np.concatenate(parts)
+
+
+class TimeSeriesStore:
+    """Per-device, per-metric time series with bounded memory, retention and 1m/1h rollups.
+
+    Series are numbered through a dictionary file (series.jsonl) and kept under
+    `path/<number>/`; they are opened on first use. A maintenance thread started with
+    start_maintenance() periodically spills buffered readings, saves the rollups and
+    applies retention.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self.index = Dictionary(os.path.join(path, 'series.jsonl'))
+        self.series = {}  # Series number -> Series, for series opened so far
+        self.metrics = defaultdict(set)  # Device id -> metric names
+        for key in self.index.values:
+            device_id, metric = json.loads(key)
+            self.metrics[device_id].add(metric)
+        self.stop_event = threading.Event()
+        self.maintenance_thread = None
+
+    def get_series(self, device_id, metric, create=True):
+        """Return the Series of a device metric, or None if it does not exist and `create` is false."""
+        key = json.dumps([device_id, metric])
+        number = self.index.codes.get(key)
+        if number is None:
+            if not create:
+                return None
+            number = self.index.code(key)
+            self.index.persist()
+            self.metrics[device_id].add(metric)
+        series = self.series.get(number)
+        if series is None:
+            series = self.series[number] = Series(os.path.join(self.path, str(number)))
+        return series
+
+    def device_metrics(self, device_id):
+        return sorted(self.metrics.get(device_id, ()))
+
+    def append(self, device_id, metric, timestamp, value, now=None):
+        """Record one reading; raises ValueError if it is older than the series' latest reading or in_window() rejects it."""
+        with self.lock:
+            self.get_series(device_id, metric).append(float(timestamp), float(value), now)
+
+    def append_metrics(self, device_id, readings, timestamp, now=None):
+        """Record one reading of several metrics ({metric: value}); all are checked before any is written."""
+        timestamp = float(timestamp)
+        Series.check_window(timestamp, timestamp, time.time() if now is None else now)
+        with self.lock:
+            for metric in readings:
+                series = self.get_series(device_id, metric, create=False)
+                if series is not None:
+                    series.check_order(timestamp)
+            for metric, value in readings.items():
+                self.get_series(device_id, metric).append(timestamp, float(value), now)
+
+    def append_many(self, device_id, metric, timestamps, values, now=None):
+        """Record time-ordered arrays of readings for one device metric, checked like append()."""
+        with self.lock:
+            self.get_series(device_id, metric).append_many(np.asarray(timestamps, dtype=np.float64),
+                                                           np.asarray(values, dtype=np.float64), now)
+
+    def append_columns(self, device_ids, metrics, timestamps, values, now=None):
+        """Record readings of many series given as equal-length columns, in any order.
+
+        Readings are grouped by series and sorted by time, and their rollup buckets are
+        computed for the whole batch at once; each series then receives its slices.
+        Readings older than their series' latest reading, or outside the window append()
+        accepts, are skipped; returns how many were.
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        window = in_window(timestamps, time.time() if now is None else now)
+        device_ids, metrics = np.asarray(device_ids, dtype=object)[window], np.asarray(metrics, dtype=object)[window]
+        timestamps, values = timestamps[window], np.asarray(values, dtype=np.float64)[window]
+        device_codes, devices = pd.factorize(device_ids)
+        metric_codes, metric_names = pd.factorize(metrics)
+        series_codes = device_codes.astype(np.int64) * len(metric_names) + metric_codes
+        order = np.lexsort((timestamps, series_codes))
+        series_codes, timestamps, values = series_codes[order], timestamps[order], values[order]
+        firsts = np.flatnonzero(changes(series_codes))
+        with self.lock:
+            series_list = [self.get_series(devices[code // len(metric_names)], metric_names[code % len(metric_names)])
+                           for code in series_codes[firsts].tolist()]
+            groups = np.repeat(np.arange(len(series_list)), np.diff(firsts, append=len(series_codes)))
+            fresh = timestamps >= np.array([series.last_timestamp for series in series_list])[groups]
+            groups, timestamps, values = groups[fresh], timestamps[fresh], values[fresh]
+            readings = np.empty(len(timestamps), READING)
+            readings['t'], readings['value'] = timestamps, values
+            group_bounds = np.searchsorted(groups, np.arange(len(series_list) + 1)).tolist()
+            buckets = {}
+            for resolution in ROLLUPS:
+                rows, starts = aggregate(timestamps, values, resolution, groups)
+                buckets[resolution] = rows, np.searchsorted(groups[starts], np.arange(len(series_list) + 1)).tolist()
+            for index, series in enumerate(series_list):
+                start, end = group_bounds[index], group_bounds[index + 1]
+                if start < end:
+                    series.extend(readings[start:end], {resolution: rows[bounds[index]:bounds[index + 1]]
+                                                        for resolution, (rows, bounds) in buckets.items()})
+        return len(window) - int(fresh.sum())
+
+    def query(self, device_id, metric, start, end, resolution=None):
+        """Return readings (resolution None) or rollup buckets (60 or 3600) in [start, end)."""
+        if resolution is not None and resolution not in ROLLUPS:
+            raise ValueError(f"Unsupported resolution {resolution}, expected None or one of {sorted(ROLLUPS)}.")
+        with self.lock:
+            series = self.get_series(device_id, metric, create=False)
+            if series is None:
+                return np.zeros(0, READING if resolution is None else BUCKET)
+            return series.query(start, end, resolution)
+
+    def maintain(self, now=None):
+        """Spill buffered readings, apply retention and save rollups for every open series."""
+        now = time.time() if now is None else now
+        with self.lock:
+            for series in self.series.values():
+                if len(series.buffer):
+                    series.spill()
+                series.apply_retention(now)
+                series.save_rollups()
+
+    def start_maintenance(self, interval=None):
+        """Run maintain() every `interval` seconds (default SPILL_INTERVAL) in a daemon thread."""
+        interval = interval or SPILL_INTERVAL
+
+        def run():
+            while not self.stop_event.wait(interval):
+                self.maintain()
+
+        self.maintenance_thread = threading.Thread(target=run, daemon=True)
+        self.maintenance_thread.start()
+
+    def close(self):
+        """Stop the maintenance thread and persist everything buffered."""
+        self.stop_event.set()
+        if self.maintenance_thread is not None:
+            self.maintenance_thread.join()
+        self.maintain()
+
+
+class IngestQueue:
+    """Background writer for a TimeSeriesStore.
+
+    Request threads hand over validated batches of reading columns with submit() and
+    return at once; a single writer thread drains the queue into append_columns().
+    `stats` counts readings written and skipped (out of order, or outside in_window()).
+    """
+
+    def __init__(self, store, max_batches=None):
+        self.store = store
+        self.queue = queue.Queue(max_batches or WRITE_QUEUE_SIZE)
+        self.stats = Counter()  # Only updated by the writer thread
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, device_ids, metrics, timestamps, values):
+        """Queue a batch for writing; returns False without queueing it if the queue is full."""
+        try:
+            self.queue.put_nowait((device_ids, metrics, timestamps, values))
+        except queue.Full:
+            return False
+        return True
+
+    def run(self):
+        while True:
+            batch = self.queue.get()
+            try:
+                if batch is None:
+                    return
+                skipped = self.store.append_columns(*batch)
+                self.stats['written'] += len(batch[0]) - int(skipped)
+                self.stats['skipped'] += int(skipped)
+            except Exception:
+                logging.exception("Failed to write a batch of %d readings", len(batch[0]))
+                self.stats['failed'] += len(batch[0])
+            finally:
+                self.queue.task_done()
+
+    def join(self):
+        """Wait until every batch submitted so far has been written."""
+        self.queue.join()
+
+    def close(self):
+        """Write the queued batches, then stop the writer thread."""
+        self.queue.put(None)
+        self.thread.join()
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as path:
+        store = TimeSeriesStore(path)
+        start = (int(time.time()) // 3600 - 7) * 3600  # Recent enough to be within retention
+        timestamps = start + np.arange(0, 6 * 3600, 5.0)  # A reading every 5 s for six hours
+        store.append_many('thermostat-1', 'temperature', timestamps, 20 + np.sin(timestamps / 3600))
+        store.append('thermostat-1', 'temperature', start + 6 * 3600, 21.0)
+        print("Metrics:", store.device_metrics('thermostat-1'))
+        print("Raw readings in the first minute:", len(store.query('thermostat-1', 'temperature', start, start + 60)))
+        print("1m buckets in the first hour:", len(store.query('thermostat-1', 'temperature', start, start + 3600, 60)))
+        hourly = store.query('thermostat-1', 'temperature', start, start + 7 * 3600, 3600)
+        print("Hourly means:", (hourly['sum'] / hourly['count']).round(2).tolist())
+        store.close()
+        reopened = TimeSeriesStore(path)
+        print("Hourly buckets after reopening:", len(reopened.query('thermostat-1', 'temperature', start, start + 7 * 3600, 3600)))
+
+        writer = IngestQueue(reopened)
+        now = time.time()
+        writer.submit(['fan-1', 'fan-2', 'fan-1'], ['rpm'] * 3, [now + 2, now + 1, now + 1], [900, 1200, 880])
+        writer.close()
+        print("Readings written by the background writer:", dict(writer.stats))
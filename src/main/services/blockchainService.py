@@ -1,41 +1,49 @@
 import json
-from web3 import Web3
 from web3.exceptions import ContractLogicError
 
+import src.blockchain.piOpenChain  # Makes piOpenChain's modules importable by their flat names
+from transaction_sender import get_sender
+from web3_provider import get_web3, is_connected
+
 class BlockchainService:
     def __init__(self, provider_url, contract_address, abi):
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
+        self.provider_url = provider_url
+        self.web3 = get_web3(provider_url)
         self.contract = self.web3.eth.contract(address=contract_address, abi=abi)
+        self.sender = get_sender(self.web3)
 
     def is_connected(self):
         """Check if the service is connected to the blockchain."""
-        return self.web3.isConnected()
+        return is_connected(self.provider_url)
 
     def get_balance(self, address):
         """Get the balance of a specific address."""
         try:
             balance = self.contract.functions.balanceOf(address).call()
-            return self.web3.fromWei(balance, 'ether')
+            return self.web3.from_wei(balance, 'ether')
         except Exception as e:
             print(f"Error getting balance: {e}")
             return None
 
+    def send(self, function, account, private_key):
+        """Send a contract call as a transaction, with a locally managed nonce; return its hash."""
+        transaction = function.build_transaction({
+            'from': account,
+            'chainId': self.sender.chain_id,
+            'gas': 2000000,
+            'gasPrice': self.web3.to_wei('50', 'gwei'),
+        })
+        return self.web3.to_hex(self.sender.send(account, private_key, transaction))
+
+    def track_receipt(self, tx_hash):
+        """Return a Future that resolves to the receipt of a sent transaction."""
+        return self.sender.receipts.track(tx_hash)
+
     def transfer(self, from_address, to_address, amount, private_key):
         """Transfer tokens from one address to another."""
         try:
-            amount_wei = self.web3.toWei(amount, 'ether')
-            nonce = self.web3.eth.getTransactionCount(from_address)
-
-            transaction = self.contract.functions.transfer(to_address, amount_wei).buildTransaction({
-                'chainId': 1,  # Mainnet ID, change as needed
-                'gas': 2000000,
-                'gasPrice': self.web3.toWei('50', 'gwei'),
-                'nonce': nonce,
-            })
-
-            signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-            return self.web3.toHex(tx_hash)
+            amount_wei = self.web3.to_wei(amount, 'ether')
+            return self.send(self.contract.functions.transfer(to_address, amount_wei), from_address, private_key)
         except Exception as e:
             print(f"Error during transfer: {e}")
             return None
@@ -43,19 +51,8 @@ class BlockchainService:
     def approve(self, owner_address, spender_address, amount, private_key):
         """Approve a spender to spend tokens on behalf of the owner."""
         try:
-            amount_wei = self.web3.toWei(amount, 'ether')
-            nonce = self.web3.eth.getTransactionCount(owner_address)
-
-            transaction = self.contract.functions.approve(spender_address, amount_wei).buildTransaction({
-                'chainId': 1,  # Mainnet ID, change as needed
-                'gas': 2000000,
-                'gasPrice': self.web3.toWei('50', 'gwei'),
-                'nonce': nonce,
-            })
-
-            signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-            return self.web3.toHex(tx_hash)
+            amount_wei = self.web3.to_wei(amount, 'ether')
+            return self.send(self.contract.functions.approve(spender_address, amount_wei), owner_address, private_key)
         except Exception as e:
             print(f"Error during approval: {e}")
             return None
@@ -63,19 +60,8 @@ class BlockchainService:
     def stake(self, address, amount, private_key):
         """Stake tokens."""
         try:
-            amount_wei = self.web3.toWei(amount, 'ether')
-            nonce = self.web3.eth.getTransactionCount(address)
-
-            transaction = self.contract.functions.stake(amount_wei).buildTransaction({
-                'chainId': 1,  # Mainnet ID, change as needed
-                'gas': 2000000,
-                'gasPrice': self.web3.toWei('50', 'gwei'),
-                'nonce': nonce,
-            })
-
-            signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-            return self.web3.toHex(tx_hash)
+            amount_wei = self.web3.to_wei(amount, 'ether')
+            return self.send(self.contract.functions.stake(amount_wei), address, private_key)
         except Exception as e:
             print(f"Error during staking: {e}")
             return None
@@ -83,19 +69,8 @@ class BlockchainService:
     def withdraw_stake(self, address, amount, private_key):
         """Withdraw staked tokens."""
         try:
-            amount_wei = self.web3.toWei(amount, 'ether')
-            nonce = self.web3.eth.getTransactionCount(address)
-
-            transaction = self.contract.functions.withdrawStake(amount_wei).buildTransaction({
-                'chainId': 1,  # Mainnet ID, change as needed
-                'gas': 2000000,
-                'gasPrice': self.web3.toWei('50', 'gwei'),
-                'nonce': nonce,
-            })
-
-            signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-            return self.web3.toHex(tx_hash)
+            amount_wei = self.web3.to_wei(amount, 'ether')
+            return self.send(self.contract.functions.withdrawStake(amount_wei), address, private_key)
         except Exception as e:
             print(f"Error during withdraw stake: {e}")
             return None
@@ -103,19 +78,8 @@ class BlockchainService:
     def add_liquidity(self, address, amount, private_key):
         """Add liquidity to the pool."""
         try:
-            amount_wei = self.web3.toWei(amount, 'ether')
-            nonce = self.web3.eth.getTransactionCount(address)
-
-            transaction = self.contract.functions.addLiquidity(amount_wei).buildTransaction({
-                'chainId': 1,  # Mainnet ID, change as needed
-                'gas': 2000000,
-                'gasPrice': self.web3.toWei('50', 'gwei'),
-                'nonce': nonce,
-            })
-
-            signed_txn = self.web3.eth.account.signTransaction(transaction, private_key)
-            tx_hash = self.web3.eth.sendRawTransaction(signed_txn.rawTransaction)
-            return self.web3.toHex(tx_hash)
+            amount_wei = self.web3.to_wei(amount, 'ether')
+            return self.send(self.contract.functions.addLiquidity(amount_wei), address, private_key)
         except Exception as e:
             print(f"Error during adding liquidity: {e}")
             return None
@@ -0,0 +1,39 @@
+# tests/test_ai_consensus.py
+
+import unittest
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from src.blockchain.superBlockchain.ai_consensus import AdaptiveConsensus, SlidingWindowTrend
+
+class TestSlidingWindowTrend(unittest.TestCase):
+    def batch_prediction(self, values):
+        X = np.arange(len(values)).reshape(-1, 1)
+        return LinearRegression().fit(X, values).predict([[len(values)]])[0]
+
+    def test_matches_batch_fit_as_the_window_slides(self):
+        rng = np.random.default_rng(3)
+        conditions = 0.5 + 0.001 * np.arange(5000) + rng.normal(0, 0.1, 5000)
+        trend = SlidingWindowTrend(window=250)
+        self.assertIsNone(trend.predict())
+        for i, condition in enumerate(conditions):
+            trend.update(condition)
+            if i in (1, 100, 249, 250, 777, 4999):
+                window = conditions[max(0, i - 249):i + 1]
+                self.assertAlmostEqual(trend.predict(), self.batch_prediction(window), places=9)
+        self.assertEqual(len(trend), 250)
+
+    def test_adaptive_consensus_predicts_without_training(self):
+        consensus = AdaptiveConsensus(window=50)
+        self.assertEqual(consensus.decide_consensus(), "No consensus")
+        for i in range(200):
+            consensus.update_network_conditions(0.2 + 0.005 * i)
+        self.assertEqual(len(consensus.network_conditions), 50)
+        self.assertAlmostEqual(consensus.predict_network_condition(), 0.2 + 0.005 * 200)
+        self.assertEqual(consensus.decide_consensus(), "Consensus reached")
+
+        consensus.train_model()
+        consensus.online = False
+        self.assertAlmostEqual(consensus.predict_network_condition(), 0.2 + 0.005 * 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_async_network.py
+
+import asyncio
+import unittest
+from async_network import AsyncNetwork, encode_frame, read_frame
+
+class TestAsyncNetwork(unittest.IsolatedAsyncioTestCase):
+    async def test_frames_round_trip_when_split_or_coalesced(self):
+        reader = asyncio.StreamReader()
+        data = encode_frame({'type': 'a'}, b'\x00body') + encode_frame({'type': 'b', 'n': 2})
+        reader.feed_data(data[:5])
+        reader.feed_data(data[5:])
+        self.assertEqual(await read_frame(reader), ({'type': 'a'}, b'\x00body'))
+        self.assertEqual(await read_frame(reader), ({'type': 'b', 'n': 2}, b''))
+
+    async def test_broadcast_over_persistent_connections(self):
+        hub = AsyncNetwork(port=0)
+        nodes = [AsyncNetwork(port=0) for _ in range(3)]
+        received = []
+        done = asyncio.Event()
+
+        async def on_tx(peer, message, body):
+            received.append((message['seq'], body))
+            if len(received) == 30:
+                done.set()
+
+        for node in nodes:
+            node.register_handler('tx', on_tx)
+            await node.start_server()
+            await hub.add_peer((node.host, node.port))
+        first_connections = dict(hub.peers)
+
+        for seq in range(10):
+            self.assertEqual(await hub.broadcast({'type': 'tx', 'seq': seq}, b'payload'), 3)
+        await asyncio.wait_for(done.wait(), 5)
+        self.assertEqual(sorted(received), sorted((seq, b'payload') for seq in range(10) for _ in range(3)))
+        self.assertEqual(hub.peers, first_connections)
+        # Inbound peers are keyed by the hub's announced listening address
+        self.assertIn((hub.host, hub.port), nodes[0].peers)
+
+        for node in [hub] + nodes:
+            await node.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# tests/test_block_fetcher.py
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from block_fetcher import BlockFetcher
+from config import Config
+
+class FlakyRPC(BaseHTTPRequestHandler):
+    """Serves tiny synthetic blocks; fails configured heights and rejects batches over a size limit."""
+
+    def answer(self, request):
+        height = int(request['params'][0], 16)
+        failures_left = self.server.failures.get(height, 0)
+        if failures_left:
+            self.server.failures[height] = failures_left - 1
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32000, 'message': 'busy'}}
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': {'number': hex(height), 'transactions': []}}
+
+    def do_POST(self):
+        batch = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if len(batch) > self.server.max_batch:
+            self.send_response(413)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.server.largest_batch = max(self.server.largest_batch, len(batch))
+        body = json.dumps([self.answer(request) for request in batch]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestBlockFetcher(unittest.TestCase):
+    def setUp(self):
+        self.retry_delay = Config.RPC_RETRY_DELAY
+        Config.RPC_RETRY_DELAY = 0.01
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyRPC)
+        self.server.failures = {}
+        self.server.max_batch = 10 ** 6
+        self.server.largest_batch = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        Config.RPC_RETRY_DELAY = self.retry_delay
+        self.server.shutdown()
+        self.server.server_close()
+
+    def heights(self, blocks):
+        return [int(block['number'], 16) for block in blocks]
+
+    def test_yields_in_order_and_grows_batches(self):
+        fetcher = BlockFetcher(self.url, max_in_flight=4, batch_size=10, max_batch_size=200, target_latency=5)
+        self.assertEqual(self.heights(fetcher.fetch_blocks(100, 2099)), list(range(100, 2100)))
+        self.assertEqual(fetcher.batch_size, 200)
+
+    def test_failed_items_are_retried_individually(self):
+        self.server.failures = {5: 1, 777: 2}
+        fetcher = BlockFetcher(self.url, batch_size=50)
+        self.assertEqual(self.heights(fetcher.fetch_blocks(0, 999)), list(range(1000)))
+
+        self.server.failures = {3: 10}
+        with self.assertRaises(RuntimeError):
+            list(BlockFetcher(self.url, retries=2).fetch_blocks(0, 9))
+
+    def test_rejected_batches_are_split(self):
+        self.server.max_batch = 32
+        fetcher = BlockFetcher(self.url, batch_size=200, max_batch_size=200, target_latency=5)
+        self.assertEqual(self.heights(fetcher.fetch_blocks(0, 1999)), list(range(2000)))
+        self.assertLessEqual(self.server.largest_batch, 32)
+
+if __name__ == '__main__':
+    unittest.main()
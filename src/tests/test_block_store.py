@@ -0,0 +1,90 @@
+# tests/test_block_store.py
+
+import os
+import tempfile
+import unittest
+import block_store
+from blockchain import Blockchain
+from block_store import BlockStore, HASH_HEADER, INDEX_RECORD
+
+class TestBlockStore(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        # Small segments so that the tests cover segment rollover
+        self.store = BlockStore(self.path, segment_size=512)
+        self.blockchain = Blockchain(store=self.store)
+        for i in range(20):
+            self.blockchain.create_block(data={'n': i}, previous_hash=self.blockchain.get_last_block().hash)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_lookup_by_height_and_hash(self):
+        block = self.store.get_block(7)
+        self.assertEqual(block.index, 8)
+        self.assertEqual(block.data, {'n': 6})
+        self.assertEqual(self.store.get_block_by_hash(block.hash).index, 8)
+        self.assertIsNone(self.store.get_block_by_hash('ab' * 32))
+        self.assertGreater(len(self.store.segments), 1)
+
+    def test_reopen_preserves_chain(self):
+        last_hash = self.blockchain.get_last_block().hash
+        self.store.close()
+        self.store = BlockStore(self.path, segment_size=512)
+        reopened = Blockchain(store=self.store)
+        self.assertEqual(len(reopened.chain), 21)
+        self.assertEqual(reopened.get_last_block().hash, last_hash)
+        self.assertEqual(reopened.get_block(0).previous_hash, '0')
+        self.assertTrue(reopened.is_chain_valid())
+
+    def test_torn_index_entry_is_discarded(self):
+        self.store.close()
+        with open(os.path.join(self.path, BlockStore.INDEX_FILE), 'ab') as index_file:
+            index_file.write(b'\x00' * (INDEX_RECORD.size // 2))
+        self.store = BlockStore(self.path, segment_size=512)
+        self.assertEqual(len(self.store), 21)
+        self.assertEqual(self.store.get_last_block().data, {'n': 19})
+
+    def test_hash_index_persists_and_recovers(self):
+        hashes = [block.hash for block in self.store]
+        self.store.close()
+        hash_index_path = os.path.join(self.path, BlockStore.HASH_INDEX_FILE)
+
+        # Reopening maps the table instead of scanning the height index
+        self.store = BlockStore(self.path, segment_size=512)
+        self.assertEqual(self.store.hash_index.count, 21)
+        self.store.hash_index.hash_at = lambda height: block_store.pack_hash(hashes[height])
+        self.assertEqual(self.store.get_height(hashes[13]), 13)
+        self.store.close()
+
+        # A header that trails the height index is caught up on open
+        with open(hash_index_path, 'r+b') as f:
+            slots, _ = HASH_HEADER.unpack(f.read(HASH_HEADER.size))
+            f.seek(0)
+            f.write(HASH_HEADER.pack(slots, 15))
+        self.store = BlockStore(self.path, segment_size=512)
+        self.assertEqual([self.store.get_height(h) for h in hashes], list(range(21)))
+        self.store.close()
+
+        # A damaged table is rebuilt from the height index
+        with open(hash_index_path, 'r+b') as f:
+            f.truncate(100)
+        self.store = BlockStore(self.path, segment_size=512)
+        self.assertEqual([self.store.get_height(h) for h in hashes], list(range(21)))
+
+    def test_hash_index_grows(self):
+        original_slots = block_store.HASH_INDEX_MIN_SLOTS
+        block_store.HASH_INDEX_MIN_SLOTS = 8
+        try:
+            store = BlockStore(tempfile.mkdtemp(), segment_size=512)
+            blockchain = Blockchain(store=store)
+            for i in range(40):
+                blockchain.create_block(data={'n': i}, previous_hash=blockchain.get_last_block().hash)
+            self.assertGreaterEqual(store.hash_index.slots, 2 * len(store))
+            self.assertEqual([store.get_height(block.hash) for block in store], list(range(41)))
+            store.close()
+        finally:
+            block_store.HASH_INDEX_MIN_SLOTS = original_slots
+
+if __name__ == '__main__':
+    unittest.main()
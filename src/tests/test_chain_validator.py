@@ -0,0 +1,41 @@
+# tests/test_chain_validator.py
+
+import unittest
+from blockchain import Blockchain
+from chain_validator import ChainValidator
+
+class TestChainValidator(unittest.TestCase):
+    def setUp(self):
+        self.blockchain = Blockchain()
+        for i in range(99):
+            self.blockchain.create_block(data=f"Block {i}", previous_hash=self.blockchain.get_last_block().hash)
+
+    def test_valid_chain(self):
+        self.assertTrue(self.blockchain.is_chain_valid())
+        self.assertEqual(self.blockchain.validator.validated_height, 99)
+
+    def test_incremental_validation_checks_only_new_blocks(self):
+        validator = ChainValidator(self.blockchain.chain)
+        self.assertIsNone(validator.validate())
+        # Tampering below the checkpoint is only caught by a full re-validation
+        self.blockchain.chain[10].data = "Tampered"
+        self.blockchain.create_block(data="New block", previous_hash=self.blockchain.get_last_block().hash)
+        self.assertIsNone(validator.validate())
+        self.assertEqual(validator.validate(full=True), 10)
+
+    def test_parallel_validation_reports_first_invalid_height(self):
+        validator = ChainValidator(self.blockchain.chain, workers=2, chunk_size=16)
+        self.assertIsNone(validator.validate(full=True))
+        self.blockchain.chain[70].data = "Tampered"
+        self.blockchain.chain[40].previous_hash = '0'
+        self.assertEqual(validator.validate(full=True), 40)
+
+    def test_broken_link_at_range_boundary(self):
+        validator = ChainValidator(self.blockchain.chain, workers=2, chunk_size=16)
+        block = self.blockchain.chain[32]
+        block.previous_hash = '0'
+        block.hash = self.blockchain.calculate_hash(block.index, block.previous_hash, block.timestamp, block.data)
+        self.assertEqual(validator.validate(full=True), 32)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+# tests/test_difficulty.py
+
+import unittest
+from difficulty import DifficultyAdjuster
+from miner import difficulty_to_target
+
+class TestDifficultyAdjuster(unittest.TestCase):
+    def setUp(self):
+        self.adjuster = DifficultyAdjuster(target_block_time=10, window=5, max_adjustment=4, initial_difficulty=4)
+
+    def record_blocks(self, count, interval, timestamp=1700000000):
+        for _ in range(count):
+            timestamp += interval
+            self.adjuster.record_block(timestamp)
+        return timestamp
+
+    def test_on_target_blocks_keep_difficulty(self):
+        self.record_blocks(10, 10)
+        self.assertEqual(self.adjuster.get_target(), difficulty_to_target(4))
+
+    def test_fast_blocks_raise_and_slow_blocks_lower_difficulty(self):
+        timestamp = self.record_blocks(10, 2)
+        self.assertGreater(self.adjuster.get_difficulty(), 4)
+        self.record_blocks(30, 60, timestamp)
+        self.assertLess(self.adjuster.get_difficulty(), 4)
+
+    def test_single_retarget_is_bounded(self):
+        self.adjuster.record_block(1700000000)
+        self.adjuster.record_block(1700100000)
+        self.assertEqual(self.adjuster.get_target(), difficulty_to_target(4) * 4)
+
+    def test_block_interval_stats(self):
+        timestamp = 1700000000
+        for interval in [5, 10, 10, 15, 60]:
+            timestamp += interval
+            self.adjuster.record_block(timestamp)
+        stats = self.adjuster.get_block_interval_stats()
+        self.assertEqual(stats['count'], 4)
+        self.assertEqual(stats['p50'], 10)
+        self.assertEqual(stats['p95'], 60)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_fraud_detection.py
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.blockchain.superBlockchain import fraud_detection
+from src.blockchain.superBlockchain.fraud_detection import (
+    BatchScorer, FraudDetectionModel, compute_normalization, preprocess_data, train_model)
+
+class TestFraudDetection(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.directory, 'model.pkl')
+        self.stats_path = os.path.join(self.directory, 'stats.json')
+        rng = np.random.default_rng(5)
+        data = pd.DataFrame(rng.normal(100, 20, (500, 4)), columns=['Time', 'V1', 'V2', 'Amount'])
+        data['Class'] = (data['Amount'] > 120).astype(int)
+        self.stats = compute_normalization(data)
+        self.raw = data.drop('Class', axis=1)
+        self.trained = train_model(preprocess_data(data.copy(), self.stats), self.stats,
+                                   self.model_path, self.stats_path)
+        self.model = FraudDetectionModel(self.model_path, self.stats_path)
+        self.model.load_model()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_scores_with_training_statistics(self):
+        self.assertNotIn('Class', self.stats['columns'])
+        expected = self.trained.predict_proba(preprocess_data(self.raw.copy(), self.stats))
+        # A single row would normalize to zeros with its own statistics
+        np.testing.assert_allclose(self.model.predict_proba(self.raw.to_numpy()[:1]), expected[:1])
+        reordered = self.raw[['Amount', 'V2', 'Time', 'V1']]
+        np.testing.assert_array_equal(self.model.predict(reordered), expected.argmax(axis=1))
+
+    def test_batch_scorer_splits_results_per_request(self):
+        scorer = BatchScorer(self.model, max_rows=64, max_delay=0.05)
+        features = self.raw.to_numpy()
+        futures = [scorer.submit(features[i:i + size]) for i, size in zip(range(0, 100, 10), [1, 3, 10] * 4)]
+        expected = self.model.predict_proba(features)
+        for (i, size), future in zip(zip(range(0, 100, 10), [1, 3, 10] * 4), futures):
+            np.testing.assert_allclose(future.result(timeout=5), expected[i:i + size])
+
+        with self.assertRaises(ValueError):
+            scorer.submit(np.zeros((1, 2))).result(timeout=5)
+
+    def test_batch_scorer_fails_only_the_bad_request(self):
+        scorer = BatchScorer(self.model, max_delay=0.2)
+        features = self.raw.to_numpy()
+        futures = [scorer.submit(features[:2]), scorer.submit([[1e308, -1e308, 0, 0]]), scorer.submit(features[2:3])]
+        np.testing.assert_allclose(futures[0].result(timeout=5), self.model.predict_proba(features[:2]))
+        with self.assertRaises(ValueError):
+            futures[1].result(timeout=5)
+        np.testing.assert_allclose(futures[2].result(timeout=5), self.model.predict_proba(features[2:3]))
+
+    def test_predict_route_rejects_invalid_input(self):
+        saved = fraud_detection.fraud_model, fraud_detection.scorer
+        self.addCleanup(setattr, fraud_detection, 'scorer', saved[1])
+        self.addCleanup(setattr, fraud_detection, 'fraud_model', saved[0])
+        fraud_detection.fraud_model, fraud_detection.scorer = self.model, BatchScorer(self.model)
+        client = fraud_detection.app.test_client()
+        for body in ({}, {'Amount': []}, [], [{'Amount': 1e308, 'Time': -1e308}]):
+            self.assertEqual(client.post('/predict', json=body).status_code, 400)
+        self.assertEqual(client.post('/predict', json=[{'Amount': 1.0}] * 2 + [{'V1': 2.0}]).status_code, 200)
+        for array, error in ((np.array([[np.inf, np.nan, 0, 0]]), 'infinite'), (np.zeros((1, 2)), 'features per row')):
+            npy = io.BytesIO()
+            np.save(npy, array)
+            response = client.post('/predict', data=npy.getvalue(), content_type='application/x-npy')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(error, response.get_json()['error'])
+        response = client.post('/predict', json={'Amount': [150.0, 80.0], 'Time': [1.0, 2.0]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['prediction']), 2)
+
+    def test_predict_requires_a_loaded_model(self):
+        unloaded = FraudDetectionModel(self.model_path, self.stats_path)
+        with self.assertRaisesRegex(Exception, 'Model not loaded'):
+            unloaded.predict(self.raw.to_numpy()[:1])
+
+if __name__ == '__main__':
+    unittest.main()
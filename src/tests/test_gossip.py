@@ -0,0 +1,78 @@
+# tests/test_gossip.py
+
+import asyncio
+import unittest
+from async_network import AsyncNetwork
+from gossip import Gossip, SeenCache
+
+class TestSeenCache(unittest.TestCase):
+    def test_evicts_least_recently_seen(self):
+        cache = SeenCache(max_size=2)
+        self.assertTrue(cache.add('a'))
+        self.assertTrue(cache.add('b'))
+        self.assertFalse(cache.add('a'))  # Refreshes 'a'
+        self.assertTrue(cache.add('c'))  # Evicts 'b'
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(len(cache), 2)
+
+class TestGossip(unittest.IsolatedAsyncioTestCase):
+    async def test_item_reaches_every_node_once(self):
+        nodes = [AsyncNetwork(port=0) for _ in range(5)]
+        received = []
+        done = asyncio.Event()
+        gossips = []
+        for index, node in enumerate(nodes):
+            await node.start_server()
+
+            async def on_item(kind, body, peer, index=index):
+                received.append((index, kind, body))
+                if len(received) == 4:
+                    done.set()
+
+            gossips.append(Gossip(node, on_item=on_item))
+        # Fully connected, so every node hears the announcement from several peers
+        for i, node in enumerate(nodes):
+            for other in nodes[i + 1:]:
+                await node.add_peer((other.host, other.port))
+
+        await gossips[0].publish('tx', b'transaction bytes')
+        await asyncio.wait_for(done.wait(), 5)
+        await asyncio.sleep(0.1)
+        self.assertEqual(sorted(index for index, _, _ in received), [1, 2, 3, 4])
+        self.assertTrue(all((kind, body) == ('tx', b'transaction bytes') for _, kind, body in received))
+        for node in nodes:
+            await node.close()
+
+    async def test_unanswered_request_is_retried_with_another_announcer(self):
+        nodes = [AsyncNetwork(port=0) for _ in range(3)]
+        received = asyncio.Event()
+        for node in nodes:
+            await node.start_server()
+
+        async def on_item(kind, body, peer):
+            received.set()
+
+        silent, fetcher, holder = [Gossip(node, request_timeout=0.2) for node in nodes]
+        fetcher.on_item = on_item
+        for other in (nodes[0], nodes[2]):
+            await nodes[1].add_peer((other.host, other.port))
+        await asyncio.sleep(0.1)
+
+        item_hash = Gossip.item_hash(b'transaction bytes')
+        silent.seen.add(item_hash)  # Announces the item first but never answers the getdata
+        await silent.announce('tx', item_hash)
+        await asyncio.sleep(0.05)
+        self.assertIn(item_hash, fetcher.requests)
+        self.assertNotIn(item_hash, fetcher.seen)
+        await holder.publish('tx', b'transaction bytes')
+        await asyncio.sleep(0.05)
+        self.assertFalse(received.is_set())
+        await asyncio.wait_for(received.wait(), 5)
+        self.assertIn(item_hash, fetcher.seen)
+        self.assertEqual(fetcher.requests, {})
+        for node in nodes:
+            await node.close()
+
+if __name__ == '__main__':
+    unittest.main()
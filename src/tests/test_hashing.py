@@ -0,0 +1,49 @@
+# tests/test_hashing.py
+
+import hashlib
+import unittest
+import hashing
+from config import Config
+from merkle import merkle_root
+from transaction import Transaction
+from utils import calculate_block_digest, calculate_block_hash, hash_string
+
+class TestHashing(unittest.TestCase):
+    def setUp(self):
+        self.algorithm = Config.HASH_ALGORITHM
+
+    def tearDown(self):
+        Config.HASH_ALGORITHM = self.algorithm
+
+    def test_digests_match_hashlib(self):
+        self.assertEqual(hashing.digest(b'pi'), hashlib.sha256(b'pi').digest())
+        self.assertEqual(hashing.hexdigest(b'pi', 'blake2b'), hashlib.blake2b(b'pi', digest_size=32).hexdigest())
+        self.assertEqual(hash_string('pi'), hashlib.sha256(b'pi').hexdigest())
+
+    def test_hash_many_matches_per_call_digests(self):
+        items = [b'item %d' % i for i in range(100)]
+        for algorithm in hashing.ALGORITHMS:
+            self.assertEqual(hashing.hash_many(items, algorithm=algorithm),
+                             [hashing.digest(item, algorithm) for item in items])
+            self.assertEqual(hashing.hash_many(items, prefix=b'\x01', algorithm=algorithm),
+                             [hashing.digest(b'\x01' + item, algorithm) for item in items])
+        self.assertEqual(hashing.hash_many([]), [])
+
+    def test_configured_algorithm_is_used_everywhere(self):
+        tx = Transaction(sender="Alice", recipient="Bob", amount=5, timestamp=1700000000)
+        sha256_root = merkle_root([tx])
+        Config.HASH_ALGORITHM = 'blake2b'
+
+        blake2b_tx = Transaction(sender="Alice", recipient="Bob", amount=5, timestamp=1700000000)
+        self.assertEqual(blake2b_tx.transaction_id, hashlib.blake2b(tx.to_bytes(), digest_size=32).hexdigest())
+        self.assertNotEqual(merkle_root([tx]), sha256_root)
+        block_digest = calculate_block_digest(1, '0', 1700000000, "data", nonce=7)
+        self.assertEqual(len(block_digest), 32)
+        self.assertEqual(calculate_block_hash(1, '0', 1700000000, "data", nonce=7), block_digest.hex())
+
+    def test_unknown_algorithm_is_rejected(self):
+        with self.assertRaises(ValueError):
+            hashing.digest(b'pi', 'md5')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+# tests/test_iot_integration.py
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+
+os.environ.setdefault('IOT_DATA_DIR', tempfile.mkdtemp())  # The app opens its store on import
+from src.blockchain.superBlockchain import iot_integration
+from src.blockchain.superBlockchain.iot_integration import app, numeric_column
+from src.blockchain.superBlockchain.timeseries_store import IngestQueue, TimeSeriesStore
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+class TestIngestion(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.saved = (iot_integration.device_data, iot_integration.ingest_queue, iot_integration.MAX_BULK_ITEMS)
+        self.store = iot_integration.device_data = TimeSeriesStore(self.path)
+        iot_integration.ingest_queue = IngestQueue(self.store, max_batches=1)
+        iot_integration.device_registry.clear()
+        iot_integration.device_registry.update({'d1': 'Thermostat', 'd2': 'Fan'})
+        self.client = app.test_client()
+        self.now = time.time()
+
+    def tearDown(self):
+        iot_integration.ingest_queue.close()
+        iot_integration.device_data, iot_integration.ingest_queue, iot_integration.MAX_BULK_ITEMS = self.saved
+        iot_integration.device_registry.clear()
+        shutil.rmtree(self.path)
+
+    def written(self, device_id, metric):
+        iot_integration.ingest_queue.join()
+        return self.store.query(device_id, metric, self.now - 3600, self.now + 3600)['value'].tolist()
+
+    def test_send_data_rejects_bad_readings_without_partial_writes(self):
+        for body in ({'device_id': 'd1', 'sensor_data': 10 ** 400},
+                     {'device_id': 'd1', 'sensor_data': {'temp': 1.0, 'rpm': 10 ** 400}},
+                     {'device_id': 'd1', 'sensor_data': 1.0, 'timestamp': 10 ** 400},
+                     {'device_id': 'd1', 'sensor_data': 1.0, 'timestamp': self.now + 3600}):
+            self.assertEqual(self.client.post('/send_data', json=body).status_code, 400)
+        self.assertEqual(self.written('d1', 'temp'), [])
+
+        body = {'device_id': 'd1', 'sensor_data': {'temp': 20.0, 'rpm': 900}, 'timestamp': self.now}
+        self.assertEqual(self.client.post('/send_data', json=body).status_code, 200)
+        # rpm's series is ahead of this timestamp, so neither metric may be written
+        self.store.append('d1', 'rpm', self.now + 10, 950)
+        body = {'device_id': 'd1', 'sensor_data': {'temp': 21.0, 'rpm': 910}, 'timestamp': self.now + 5}
+        self.assertEqual(self.client.post('/send_data', json=body).status_code, 400)
+        self.assertEqual(self.written('d1', 'temp'), [20.0])
+        self.assertEqual(self.written('d1', 'rpm'), [900.0, 950.0])
+
+    def test_numeric_column_handles_malformed_values(self):
+        self.assertEqual(numeric_column([1, 2.5]).tolist(), [1.0, 2.5])
+        for column in ([[1], 2], [[1], [2]], [True, 1.5], [10 ** 400, 2], ['1', None], [{}, 3]):
+            converted = numeric_column(column)
+            self.assertEqual(converted.shape, (len(column),))
+            self.assertFalse(np.isfinite(converted[0]))
+        self.assertEqual(numeric_column([]).shape, (0,))
+
+    def test_json_body_accepts_valid_items_and_reports_the_rest(self):
+        items = [
+            {'device_id': 'd1', 'sensor_data': {'temp': 20.5, 'humidity': 40}, 'timestamp': self.now},
+            {'device_id': 'unknown', 'sensor_data': 1.0},
+            {'device_id': 'd1', 'sensor_data': {'temp': [1, 2]}},
+            {'device_id': 'd2', 'sensor_data': {'rpm': 900, 'fault': True}},
+            {'device_id': 'd2', 'sensor_data': 1.0, 'timestamp': 'yesterday'},
+            {'device_id': 'd2', 'sensor_data': 1.0, 'timestamp': 1e30},
+            'not an object',
+            {'device_id': 'd2', 'sensor_data': {'rpm': 10 ** 400}},
+            {'device_id': 'd2', 'sensor_data': 1200, 'timestamp': self.now},
+        ]
+        response = self.client.post('/send_data_bulk', json=items)
+        self.assertEqual(response.status_code, 202)
+        body = response.get_json()
+        self.assertEqual((body['accepted'], body['rejected']), (3, 7))
+        self.assertEqual([error['index'] for error in body['errors']], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(body['errors'][0]['error'], 'Device not registered')
+        self.assertEqual(self.written('d1', 'temp'), [20.5])
+        self.assertEqual(self.written('d1', 'humidity'), [40.0])
+        self.assertEqual(self.written('d2', 'value'), [1200.0])
+        self.assertEqual(self.written('d2', 'rpm'), [])
+
+    def test_items_whose_values_are_all_lists_are_rejected(self):
+        items = [{'device_id': 'd1', 'sensor_data': [1, 2]}, {'device_id': 'd1', 'sensor_data': {'temp': [3]}}]
+        response = self.client.post('/send_data_bulk', json=items)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.get_json()['accepted'], response.get_json()['rejected']), (0, 2))
+
+    def test_ndjson_body(self):
+        lines = [json.dumps({'device_id': 'd1', 'sensor_data': value, 'timestamp': self.now + i})
+                 for i, value in enumerate([1.0, 'bad', 3.0])]
+        response = self.client.post('/send_data_bulk', data='\n'.join(lines) + '\n\n',
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json()['errors'], [{'index': 1, 'error': 'Readings must be finite numbers.'}])
+        self.assertEqual(self.written('d1', 'value'), [1.0, 3.0])
+
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_body(self):
+        items = [{'device_id': 'd1', 'sensor_data': 1.0, 'timestamp': self.now},
+                 {'device_id': 'd2', 'sensor_data': 2.0, 'timestamp': self.now}]
+        for body in (msgpack.packb(items), b''.join(msgpack.packb(item) for item in items)):
+            response = self.client.post('/send_data_bulk', data=body, content_type='application/msgpack')
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.get_json()['accepted'], 2)
+        self.assertEqual(self.written('d1', 'value'), [1.0, 1.0])
+
+    def test_rejects_malformed_and_oversized_bodies(self):
+        for data in ('[{"device_id": ', '{"device_id": "d1"}'):
+            response = self.client.post('/send_data_bulk', data=data, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        iot_integration.MAX_BULK_ITEMS = 2
+        response = self.client.post('/send_data_bulk', json=[{'device_id': 'd1', 'sensor_data': 1.0}] * 3)
+        self.assertEqual(response.status_code, 413)
+
+    def test_full_ingest_queue_returns_503(self):
+        item = {'device_id': 'd1', 'sensor_data': 1.0}
+        with self.store.lock:  # Hold the writer up, so the one-batch queue fills
+            self.assertEqual(self.client.post('/send_data_bulk', json=[item]).status_code, 202)
+            time.sleep(0.05)
+            self.assertEqual(self.client.post('/send_data_bulk', json=[item]).status_code, 202)
+            self.assertEqual(self.client.post('/send_data_bulk', json=[item]).status_code, 503)
+
+if __name__ == '__main__':
+    unittest.main()
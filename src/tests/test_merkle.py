@@ -0,0 +1,46 @@
+# tests/test_merkle.py
+
+import unittest
+from blockchain import Block, Blockchain
+from merkle import MerkleTree, merkle_root, verify_proof
+from transaction import Transaction
+
+class TestMerkleTree(unittest.TestCase):
+    def make_transactions(self, count):
+        return [Transaction(sender=f"sender{i}", recipient="Bob", amount=i + 1, timestamp=1700000000)
+                for i in range(count)]
+
+    def test_proofs_verify_for_every_leaf(self):
+        for count in range(1, 10):
+            transactions = self.make_transactions(count)
+            tree = MerkleTree(transactions)
+            self.assertEqual(tree.root, merkle_root(transactions))
+            for index, tx in enumerate(transactions):
+                proof = tree.get_proof(index)
+                self.assertLessEqual(len(proof), max(1, (count - 1).bit_length()))
+                self.assertTrue(verify_proof(tx, proof, tree.root))
+
+    def test_proof_rejects_other_transaction(self):
+        transactions = self.make_transactions(5)
+        tree = MerkleTree(transactions)
+        self.assertFalse(verify_proof(transactions[1], tree.get_proof(2), tree.root))
+
+    def test_block_with_transactions(self):
+        blockchain = Blockchain()
+        transactions = self.make_transactions(6)
+        block = blockchain.create_block("Transfers", blockchain.get_last_block().hash, transactions)
+        decoded = Block.from_bytes(block.to_bytes())
+        self.assertEqual(decoded.merkle_root, block.merkle_root)
+        self.assertEqual([tx.transaction_id for tx in decoded.transactions],
+                         [tx.transaction_id for tx in transactions])
+
+        proof, root = blockchain.get_transaction_proof(1, transactions[3].transaction_id)
+        self.assertTrue(verify_proof(transactions[3], proof, root))
+        self.assertTrue(blockchain.is_chain_valid())
+
+        # Swapping a transaction out breaks the block even though its hash fields are untouched
+        block.transactions[2] = Transaction(sender="Mallory", recipient="Bob", amount=1)
+        self.assertEqual(blockchain.find_first_invalid_block(full=True), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+# tests/test_miner.py
+
+import unittest
+from miner import Miner, difficulty_to_target, search_nonces, target_to_bytes
+from utils import block_hash_prefix, calculate_block_hash
+
+class TestMiner(unittest.TestCase):
+    def test_solution_matches_block_hash(self):
+        nonce, block_hash = Miner(workers=1).mine(2, 'ab' * 32, 1700000000, "data", difficulty_to_target(3))
+        self.assertTrue(block_hash.startswith('000'))
+        self.assertEqual(block_hash, calculate_block_hash(2, 'ab' * 32, 1700000000, "data", nonce))
+
+    def test_multi_process_mining(self):
+        nonce, block_hash = Miner(workers=2).mine(3, 'cd' * 32, 1700000000, "data", difficulty_to_target(3))
+        self.assertEqual(block_hash, calculate_block_hash(3, 'cd' * 32, 1700000000, "data", nonce))
+        self.assertLessEqual(int(block_hash, 16), difficulty_to_target(3))
+
+    def test_search_gives_up_after_limit(self):
+        prefix = block_hash_prefix(1, '0', 0, "data")
+        self.assertIsNone(search_nonces(prefix, target_to_bytes(0), 0, 1, limit=4096))
+
+if __name__ == '__main__':
+    unittest.main()
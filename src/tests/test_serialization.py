@@ -0,0 +1,39 @@
+# tests/test_serialization.py
+
+import unittest
+from blockchain import Block, BLOCK_HEADER
+from transaction import Transaction
+from utils import calculate_block_hash
+
+class TestSerialization(unittest.TestCase):
+    def test_transaction_round_trip(self):
+        tx = Transaction(sender="Alice", recipient="Bøb", amount=5000000000, fee=1000000)
+        decoded = Transaction.from_bytes(memoryview(tx.to_bytes()))
+        self.assertEqual(decoded.to_dict(), tx.to_dict())
+        self.assertEqual(tx.size(), len(tx.to_bytes()))
+
+    def test_transaction_id_is_unambiguous(self):
+        # "recipient1" + "23" and "recipient12" + "3" concatenate identically as strings
+        first = Transaction(sender="Alice", recipient="recipient1", amount=23, timestamp=1700000000)
+        second = Transaction(sender="Alice", recipient="recipient12", amount=3, timestamp=1700000000)
+        self.assertNotEqual(first.transaction_id, second.transaction_id)
+
+    def test_slots_reject_unknown_attributes(self):
+        tx = Transaction(sender="Alice", recipient="Bob", amount=1)
+        with self.assertRaises(AttributeError):
+            tx.memo = "not a field"
+
+    def test_block_round_trip(self):
+        data = {'transfers': [1, 2, 3], 'memo': 'payroll'}
+        block_hash = calculate_block_hash(7, 'ab' * 32, 1700000000, data, 42)
+        block = Block(7, 'ab' * 32, 1700000000, data, block_hash, nonce=42)
+        encoded = block.to_bytes()
+        self.assertEqual(len(encoded) - BLOCK_HEADER.size, len(b'{"memo":"payroll","transfers":[1,2,3]}'))
+        self.assertEqual(Block.from_bytes(encoded).to_dict(), block.to_dict())
+
+    def test_block_hash_ignores_key_order(self):
+        self.assertEqual(calculate_block_hash(1, '0', 0, {'a': 1, 'b': 2}),
+                         calculate_block_hash(1, '0', 0, {'b': 2, 'a': 1}))
+
+if __name__ == '__main__':
+    unittest.main()
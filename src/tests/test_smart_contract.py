@@ -0,0 +1,114 @@
+# tests/test_smart_contract.py
+
+import tempfile
+import unittest
+from smart_contract import CODE_CACHE, ContractStateStore, SmartContract, SmartContractManager
+
+COUNTER = """
+def increment(amount):
+    state['count'] = state.get('count', 0) + amount
+
+increment(args[0])
+"""
+
+class TestSmartContract(unittest.TestCase):
+    def test_compiled_once_and_state_kept_between_calls(self):
+        manager = SmartContractManager()
+        contract_id = manager.deploy_contract(COUNTER)
+        compiled = CODE_CACHE[contract_id]
+        manager.execute_contract(contract_id, 2)
+        self.assertEqual(manager.execute_contract(contract_id, 3), {'count': 5})
+        self.assertIs(SmartContract(COUNTER).compiled, compiled)
+
+    def test_each_call_gets_a_fresh_namespace(self):
+        contract = SmartContract("try:\n    leftover\n    state['leaked'] = True\nexcept NameError:\n    pass\n"
+                                 "leftover = args")
+        contract.execute(1)
+        # Names assigned by one call are gone in the next; only `state` persists.
+        self.assertEqual(contract.execute(2), {})
+
+    def test_step_and_time_limits(self):
+        self.assertIsNone(SmartContract("while True: pass", max_steps=1000).execute())
+        self.assertIsNone(SmartContract("x = [i for i in range(10 ** 9)]", max_steps=1000).execute())
+        swallowing = SmartContract("try:\n    while True: pass\nexcept Exception:\n    state['caught'] = True",
+                                   max_steps=10 ** 12, time_limit=0.05)
+        self.assertIsNone(swallowing.execute())
+        self.assertEqual(swallowing.state, {})
+        # The limit exception dropped by a `return` in `finally` still fails the call
+        dropping = SmartContract("def run():\n    try:\n        while True: pass\n    finally:\n        return 1\n"
+                                 "run()\nstate['finished'] = True", max_steps=1000)
+        self.assertEqual(dropping.call(()), "Contract exceeded its step limit.")
+        self.assertEqual(dropping.state, {})
+
+    def test_rejects_imports_and_dunder_access(self):
+        for code in ("import os", "x = ().__class__", "__step__ = None", "def f(:\n    pass",
+                     "try:\n    while True: pass\nexcept:\n    state['caught'] = True",
+                     "try:\n    pass\nexcept (ValueError, BaseException):\n    pass"):
+            with self.assertRaises(ValueError):
+                SmartContract(code)
+        self.assertIsNone(SmartContract("open('/etc/passwd')").execute())
+
+    def test_state_persists_in_store(self):
+        with tempfile.TemporaryDirectory() as path:
+            manager = SmartContractManager(ContractStateStore(path))
+            contract_id = manager.deploy_contract(COUNTER)
+            manager.execute_contract(contract_id, 7)
+            manager.state_store.flush()
+            reopened = SmartContractManager(ContractStateStore(path))
+            reopened.deploy_contract(COUNTER)
+            self.assertEqual(reopened.get_contract_state(contract_id), {'count': 7})
+
+    def test_failed_call_rolls_back_nested_changes(self):
+        contract = SmartContract("state.setdefault('log', []).append(args[0])\nstate['last'] = args[0]\n"
+                                 "if args[0] < 0:\n    raise ValueError('negative')")
+        contract.execute(1)
+        self.assertIsNone(contract.execute(-1))
+        self.assertEqual(contract.state, {'log': [1], 'last': 1})
+
+    def test_contracts_cannot_reach_past_the_snapshot(self):
+        for code in ("state.base['x'] = 1\nraise ValueError('rollback me')",
+                     "state.commit()\nstate['y'] = 2\nstate.commit()\nwhile True: pass",
+                     "s = state\ns._base['x'] = 1", "state._commit()"):
+            with self.assertRaises(ValueError):
+                SmartContract(code)
+        # Aliasing `state` only reaches the mapping interface
+        contract = SmartContract("s = state\ns['x'] = 1\ns.base['x'] = 2", max_steps=1000)
+        self.assertEqual(contract.call(()), "'StateSnapshot' object has no attribute 'base'")
+        self.assertEqual(contract.state, {})
+
+class TestExecuteBatch(unittest.TestCase):
+    def run_batch(self, workers):
+        manager = SmartContractManager(workers=workers, parallel_min_calls=1)
+        counter = manager.deploy_contract(COUNTER)
+        ledger = manager.deploy_contract("state.setdefault('entries', []).append(args[0])\n"
+                                         "if args[0] == 'bad':\n    raise ValueError('bad entry')\n"
+                                         "if args[0] == 'reset':\n    del state['entries']")
+        calls = [(counter, (1,)), (ledger, ('a',)), (counter, (2,)), (ledger, ('bad',)),
+                 (ledger, ('b',)), ('missing', ()), (ledger, ('reset',)), (ledger, ('c',))]
+        errors = manager.execute_batch(calls)
+        executor = manager.executor
+        # A second batch reuses the pool started by the first
+        manager.execute_batch([(counter, (4,)), (ledger, ('d',))])
+        self.assertIs(manager.executor, executor)
+        manager.close()
+        return errors, manager.get_contract_state(counter), manager.get_contract_state(ledger)
+
+    def test_each_call_commits_or_rolls_back_in_order(self):
+        errors, counter_state, ledger_state = self.run_batch(workers=1)
+        self.assertEqual(errors, [None, None, None, 'bad entry', None, 'Contract not found.', None, None])
+        self.assertEqual(counter_state, {'count': 7})
+        self.assertEqual(ledger_state, {'entries': ['c', 'd']})
+
+    def test_small_batches_run_serially(self):
+        manager = SmartContractManager(workers=2)
+        first = manager.deploy_contract(COUNTER)
+        second = manager.deploy_contract("state['n'] = args[0]")
+        self.assertEqual(manager.execute_batch([(first, (1,)), (second, (2,))]), [None, None])
+        self.assertIsNone(manager.executor)
+        self.assertEqual(manager.get_contract_state(second), {'n': 2})
+
+    def test_process_pool_matches_serial(self):
+        self.assertEqual(self.run_batch(workers=2), self.run_batch(workers=1))
+
+if __name__ == '__main__':
+    unittest.main()
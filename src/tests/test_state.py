@@ -0,0 +1,91 @@
+# tests/test_state.py
+
+import tempfile
+import unittest
+from blockchain import Blockchain
+from config import Config
+from consensus import Consensus
+from state import AccountState
+from transaction import Transaction, TransactionPool
+from utils import to_units
+
+class TestAccountState(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.state = AccountState(path=self.path, snapshot_interval=2, undo_depth=2)
+        self.blockchain = Blockchain(state=self.state)
+        self.reward = to_units(Config.MINING_REWARD)
+        self.add_block([Transaction(Config.COINBASE_ADDRESS, "Alice", self.reward, fee=0, nonce=1)])
+
+    def add_block(self, transactions):
+        return self.blockchain.create_block("block", self.blockchain.get_last_block().hash, transactions)
+
+    def pay(self, amount, nonce, sender="Alice", recipient="Bob"):
+        return Transaction(sender, recipient, amount, fee=10, nonce=nonce)
+
+    def test_apply_and_validate(self):
+        self.assertEqual(self.state.get_balance("Alice"), self.reward)
+        self.assertTrue(self.state.validate_transaction(self.pay(100, 0)))
+        self.assertFalse(self.state.validate_transaction(self.pay(self.reward, 0)))
+        self.add_block([self.pay(100, 0), self.pay(200, 1)])
+        self.assertEqual(self.state.get_balance("Bob"), 300)
+        self.assertEqual(self.state.get_nonce("Alice"), 2)
+        self.assertFalse(self.state.validate_transaction(self.pay(100, 1)))
+
+    def test_invalid_block_is_rejected_without_side_effects(self):
+        with self.assertRaises(ValueError):
+            self.add_block([self.pay(100, 0), self.pay(100, 0)])
+        self.assertEqual(len(self.blockchain.chain), 2)
+        self.assertEqual(self.state.get_balance("Bob"), 0)
+        self.assertEqual(self.state.get_nonce("Alice"), 0)
+
+    def test_rollback_with_undo_log_and_snapshot(self):
+        for nonce in range(4):
+            self.add_block([self.pay(100, nonce)])
+        self.assertEqual(self.state.height, 5)
+        self.state.rollback(4)
+        self.assertEqual(self.state.get_balance("Bob"), 300)
+        # Height 1 is beyond the undo log, so it is rebuilt from the snapshot at height 1
+        self.state.rollback(1, self.blockchain.chain)
+        self.assertEqual(self.state.get_balance("Bob"), 0)
+        self.assertEqual(self.state.get_balance("Alice"), self.reward)
+
+    def test_pool_checks_pending_spend(self):
+        pool = TransactionPool(state=self.state)
+        self.assertTrue(pool.add_transaction(self.pay(self.reward // 2, 0)))
+        self.assertFalse(pool.add_transaction(self.pay(self.reward // 2, 1)))
+        self.assertFalse(pool.add_transaction(self.pay(100, 0, recipient="Carol")))
+        self.assertTrue(pool.add_transaction(self.pay(100, 1)))
+
+    def test_rollback_deletes_snapshots_of_abandoned_blocks(self):
+        for nonce in range(3):
+            self.add_block([self.pay(100, nonce)])
+        self.assertEqual(self.state.snapshot_heights(), [1, 3])
+        self.state.rollback(2)
+        self.assertEqual(self.state.snapshot_heights(), [1])
+        self.assertEqual(AccountState(path=self.path).height, 1)
+
+    def test_pool_selects_in_nonce_order(self):
+        pool = TransactionPool(state=self.state)
+        later = Transaction("Alice", "Bob", 100, fee=500, nonce=1)
+        first = Transaction("Alice", "Bob", 100, fee=10, nonce=0)
+        gapped = Transaction("Alice", "Bob", 100, fee=900, nonce=3)
+        for tx in (later, first, gapped):
+            self.assertTrue(pool.add_transaction(tx))
+        self.assertEqual(pool.select_transactions(5), [first, later])
+        self.assertEqual(len(pool), 3)
+        # The selection is a valid block
+        self.add_block(pool.select_transactions(5))
+        self.assertEqual(self.state.get_nonce("Alice"), 2)
+
+    def test_invalid_transactions_fail_before_mining(self):
+        class UnusedMiner:
+            def mine(self, *args):
+                raise AssertionError("Proof of work started for an invalid block.")
+        consensus = Consensus(self.blockchain, miner=UnusedMiner())
+        with self.assertRaises(ValueError):
+            consensus.mine_block("Miner", "block", [self.pay(100, 1)])
+        self.assertEqual(len(self.blockchain.chain), 2)
+
+if __name__ == '__main__':
+    unittest.main()
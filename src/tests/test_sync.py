@@ -0,0 +1,70 @@
+# tests/test_sync.py
+
+import unittest
+from async_network import AsyncNetwork
+from blockchain import Blockchain
+from sync import BlockSync, encode_items
+from transaction import Transaction
+
+class TestBlockSync(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.source = Blockchain()
+        for i in range(300):
+            transactions = [Transaction(sender=f"sender{i}", recipient="Bob", amount=i + 1)] if i % 3 else None
+            self.source.create_block(f"Block {i}", self.source.get_last_block().hash, transactions)
+        self.nodes = []
+
+    async def asyncTearDown(self):
+        for node in self.nodes:
+            await node.close()
+
+    async def start_peers(self, count):
+        peers = []
+        for _ in range(count):
+            node = AsyncNetwork(port=0)
+            peers.append(BlockSync(node, self.source))
+            await node.start_server()
+            self.nodes.append(node)
+        return peers
+
+    async def connect_new_node(self):
+        node = AsyncNetwork(port=0)
+        self.nodes.append(node)
+        chain = Blockchain()
+        block_sync = BlockSync(node, chain, window_size=16, timeout=0.2)
+        for peer_node in self.nodes[:-1]:
+            await node.add_peer((peer_node.host, peer_node.port))
+        return chain, block_sync
+
+    def assert_synced(self, chain):
+        self.assertEqual(len(chain.chain), len(self.source.chain))
+        self.assertEqual([block.hash for block in chain.chain], [block.hash for block in self.source.chain])
+        self.assertEqual(chain.chain[-1].transactions[0].transaction_id,
+                         self.source.chain[-1].transactions[0].transaction_id)
+        self.assertTrue(chain.is_chain_valid())
+
+    async def test_sync_from_several_peers(self):
+        await self.start_peers(3)
+        chain, block_sync = await self.connect_new_node()
+        self.assertEqual(await block_sync.sync(), 300)
+        self.assert_synced(chain)
+        self.assertEqual(await block_sync.sync(), 0)
+
+    async def test_stalled_and_lying_peers_are_routed_around(self):
+        stalled, lying, honest = await self.start_peers(3)
+
+        async def never_answer(peer, message, body):
+            pass
+
+        async def wrong_bodies(peer, message, body):
+            bodies = [encode_items([Transaction("Mallory", "Mallory", 1).to_bytes()])] * message['count']
+            await peer.send({'type': 'bodies', 'id': message['id']}, encode_items(bodies))
+
+        stalled.network.register_handler('getbodies', never_answer)
+        lying.network.register_handler('getbodies', wrong_bodies)
+        chain, block_sync = await self.connect_new_node()
+        self.assertEqual(await block_sync.sync(), 300)
+        self.assert_synced(chain)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# tests/test_timeseries_store.py
+
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+from src.blockchain.superBlockchain import timeseries_store
+from src.blockchain.superBlockchain.timeseries_store import READING, IngestQueue, RingBuffer, TimeSeriesStore
+
+START = int(time.time()) // 3600 * 3600 - 24 * 3600  # On the hour, a day ago
+
+class TestTimeSeriesStore(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.ring_capacity = timeseries_store.RING_CAPACITY
+        timeseries_store.RING_CAPACITY = 100
+
+    def tearDown(self):
+        timeseries_store.RING_CAPACITY = self.ring_capacity
+        shutil.rmtree(self.path)
+
+    def test_ring_buffer_keeps_the_newest_rows(self):
+        ring = RingBuffer(READING, 100)
+        for i in range(70):
+            ring.append((i, i))
+        rows = np.zeros(45, READING)
+        rows['t'] = np.arange(70, 115)
+        ring.extend(rows)
+        self.assertEqual(ring.ordered()['t'].tolist(), list(range(15, 115)))
+        ring.extend(np.zeros(250, READING))
+        self.assertEqual(len(ring), 100)
+        ring.discard(40)
+        self.assertEqual(len(ring.ordered()), 60)
+
+    def test_rollups_match_the_raw_readings(self):
+        store = TimeSeriesStore(self.path)
+        timestamps = START + np.arange(0, 3 * 3600, 7.0)
+        values = np.random.default_rng(1).normal(20, 5, len(timestamps))
+        half = len(timestamps) // 2
+        for timestamp, value in zip(timestamps[:half], values[:half]):
+            store.append('d1', 'temp', timestamp, value)
+        store.append_many('d1', 'temp', timestamps[half:], values[half:])
+
+        raw = store.query('d1', 'temp', START, START + 4 * 3600)
+        self.assertEqual(raw['t'].tolist(), timestamps.tolist())  # Spilled segments and the ring, in order
+        for resolution in (60, 3600):
+            buckets = store.query('d1', 'temp', START, START + 4 * 3600, resolution)
+            self.assertEqual(buckets['count'].sum(), len(timestamps))
+            keys = timestamps - timestamps % resolution
+            for bucket in buckets[:3]:
+                in_bucket = values[keys == bucket['t']]
+                self.assertAlmostEqual(bucket['sum'], in_bucket.sum())
+                self.assertEqual((bucket['min'], bucket['max']), (in_bucket.min(), in_bucket.max()))
+
+        with self.assertRaises(ValueError):
+            store.append('d1', 'temp', START, 1.0)  # Older than the latest reading
+        with self.assertRaises(ValueError):
+            store.query('d1', 'temp', START, START + 60, 300)
+
+    def test_reopen_and_retention(self):
+        store = TimeSeriesStore(self.path)
+        now = time.time()
+        timestamps = now - 10 * 24 * 3600 + np.arange(0, 10 * 24 * 3600, 600.0)  # The last ten days, every 10 minutes
+        early = timestamps < now - 3 * 24 * 3600  # Written three days ago, while still within retention
+        store.append_many('d1', 'temp', timestamps[early], np.ones(early.sum()), now=now - 3 * 24 * 3600)
+        store.append_many('d1', 'temp', timestamps[~early], np.ones((~early).sum()))
+        self.assertEqual(len(store.query('d1', 'temp', timestamps[0], now)), len(timestamps))
+        store.close()  # Spills, saves the rollups and applies retention
+
+        reopened = TimeSeriesStore(self.path)
+        self.assertEqual(reopened.device_metrics('d1'), ['temp'])
+        raw = reopened.query('d1', 'temp', timestamps[0], now)
+        cutoff = now - timeseries_store.RAW_RETENTION
+        self.assertTrue(cutoff - timeseries_store.SEGMENT_DURATION < raw['t'][0] <= cutoff)
+        self.assertEqual(raw['t'][-1], timestamps[-1])
+        self.assertEqual(reopened.query('d1', 'temp', timestamps[0], now, 3600)['count'].sum(), len(timestamps))
+        minutes = reopened.query('d1', 'temp', timestamps[0], now, 60)
+        self.assertGreater(minutes['t'][0], now - timeseries_store.ROLLUPS[60] - 60)
+        with self.assertRaises(ValueError):
+            reopened.append('d1', 'temp', timestamps[-2], 1.0)
+        self.assertEqual(len(reopened.query('missing', 'temp', timestamps[0], now)), 0)
+
+    def test_rejects_readings_outside_the_time_window(self):
+        store = TimeSeriesStore(self.path)
+        now = time.time()
+        for timestamp in (now + timeseries_store.MAX_CLOCK_SKEW + 1, 1e30, now - timeseries_store.RAW_RETENTION - 1, np.nan):
+            with self.assertRaises(ValueError):
+                store.append('d1', 'temp', timestamp, 1.0)
+        with self.assertRaises(ValueError):
+            store.append_many('d1', 'temp', [now - 1, 1e30], [1.0, 2.0])
+        store.append('d1', 'temp', now, 1.0)
+        self.assertEqual(store.get_series('d1', 'temp').last_timestamp, now)
+
+        skipped = store.append_columns(['d1', 'd1', 'd2', 'd2'], ['temp'] * 4, [1e30, now + 1, -1.0, now], [9, 2, 9, 3])
+        self.assertEqual(skipped, 2)
+        store.close()  # Spilling would overflow the segment window of a far-future reading
+        self.assertEqual(store.query('d1', 'temp', now - 60, now + 60)['value'].tolist(), [1.0, 2.0])
+        self.assertEqual(store.query('d2', 'temp', 0, 2e30)['value'].tolist(), [3.0])
+
+    def test_append_columns_matches_per_series_appends(self):
+        rng = np.random.default_rng(2)
+        count = 3000
+        devices = rng.integers(0, 40, count)
+        timestamps = START + rng.uniform(0, 7200, count)
+        values = rng.normal(size=count)
+        batched = TimeSeriesStore(self.path)
+        half = count // 2  # Two batches, so buckets and buffers are merged across calls
+        self.assertEqual(batched.append_columns(devices[:half].tolist(), ['temp'] * half, timestamps[:half], values[:half]), 0)
+        late = timestamps[half:] < timestamps[:half].max()
+        skipped = batched.append_columns(devices[half:].tolist(), ['temp'] * (count - half), timestamps[half:], values[half:])
+        self.assertGreater(skipped, 0)
+
+        expected = TimeSeriesStore(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, expected.path)
+        for part in (slice(0, half), slice(half, count)):
+            for device in range(40):
+                mask = devices[part] == device
+                order = np.argsort(timestamps[part][mask], kind='stable')
+                ts, vs = timestamps[part][mask][order], values[part][mask][order]
+                if device in expected.metrics:
+                    fresh = ts >= expected.get_series(device, 'temp').last_timestamp
+                    ts, vs = ts[fresh], vs[fresh]
+                expected.append_many(device, 'temp', ts, vs)
+        written = 0
+        for device in range(40):
+            raw = batched.query(device, 'temp', START, START + 7200)
+            self.assertEqual(raw.tolist(), expected.query(device, 'temp', START, START + 7200).tolist())
+            written += len(raw)
+            for resolution in (60, 3600):
+                np.testing.assert_allclose(batched.query(device, 'temp', START, START + 7200, resolution).tolist(),
+                                           expected.query(device, 'temp', START, START + 7200, resolution).tolist())
+        self.assertEqual(written + skipped, count)
+        self.assertLessEqual(skipped, late.sum())
+
+    def test_ingest_queue_writes_in_the_background(self):
+        store = TimeSeriesStore(self.path)
+        writer = IngestQueue(store, max_batches=1)
+        with store.lock:  # Hold the writer up, so the queue fills
+            self.assertTrue(writer.submit(['d1', 'd2'], ['temp', 'temp'], [START, START], [1.0, 2.0]))
+            time.sleep(0.05)
+            self.assertTrue(writer.submit(['d1'], ['temp'], [START - 1], [0.0]))
+            self.assertFalse(writer.submit(['d1'], ['temp'], [START + 1], [3.0]))
+        writer.close()
+        self.assertEqual(dict(writer.stats), {'written': 2, 'skipped': 1})
+        self.assertEqual(store.query('d2', 'temp', START, START + 1)['value'].tolist(), [2.0])
+
+if __name__ == '__main__':
+    unittest.main()
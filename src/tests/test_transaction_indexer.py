@@ -0,0 +1,99 @@
+# tests/test_transaction_indexer.py
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from blockchain_explorer import BlockchainExplorer
+
+ADDRESSES = ['0x' + f'{i:040x}' for i in range(1, 6)]
+
+def synthetic_block(number):
+    """A block with three transactions between the test addresses; every fifth block creates a contract."""
+    transactions = []
+    for position in range(3):
+        sender = ADDRESSES[(number + position) % len(ADDRESSES)]
+        recipient = None if number % 5 == 0 and position == 0 else ADDRESSES[(number * 2 + position) % len(ADDRESSES)]
+        transactions.append({
+            'hash': '0x' + f'{number:032x}{position:032x}',
+            'blockNumber': hex(number),
+            'blockHash': '0x' + f'{number:064x}',
+            'transactionIndex': hex(position),
+            'from': sender,
+            'to': recipient,
+            'value': hex(number * 10 + position),
+            'gas': hex(21000),
+            'gasPrice': hex(1),
+            'nonce': hex(number),
+            'input': '0x',
+        })
+    return {
+        'number': hex(number),
+        'hash': '0x' + f'{number:064x}',
+        'parentHash': '0x' + f'{max(number - 1, 0):064x}',
+        'timestamp': hex(1700000000 + number),
+        'transactions': transactions,
+    }
+
+class StandInRPC(BaseHTTPRequestHandler):
+    """Answers eth_blockNumber and eth_getBlockByNumber (singly or batched) with synthetic blocks."""
+
+    def answer(self, request):
+        if request['method'] == 'eth_blockNumber':
+            result = hex(self.server.height)
+        else:
+            self.server.block_requests += 1
+            result = synthetic_block(int(request['params'][0], 16))
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        reply = [self.answer(item) for item in request] if isinstance(request, list) else self.answer(request)
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestTransactionIndexer(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInRPC)
+        self.server.height = 120
+        self.server.block_requests = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.explorer = BlockchainExplorer(f"http://127.0.0.1:{self.server.server_port}", index_path=':memory:')
+
+    def tearDown(self):
+        self.explorer.indexer.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def expected_history(self, address, start_block, end_block):
+        return [txn['hash'] for number in range(start_block, end_block + 1)
+                for txn in synthetic_block(number)['transactions']
+                if address in (txn['from'], txn['to'])]
+
+    def test_history_matches_a_full_scan(self):
+        address = ADDRESSES[2]
+        history = self.explorer.get_transaction_history(address.upper().replace('0X', '0x'), 10, 'latest')
+        self.assertEqual([txn['hash'] for txn in history], self.expected_history(address, 10, 120))
+        # Confirmed blocks came from the index; only the unconfirmed tail was scanned live
+        self.assertEqual(self.explorer.indexer.last_indexed_block, 120 - self.explorer.indexer.confirmations)
+
+    def test_indexing_is_incremental(self):
+        indexer = self.explorer.indexer
+        self.assertEqual(indexer.sync(), 121 - indexer.confirmations)
+        requests_after_first_sync = self.server.block_requests
+        self.assertEqual(indexer.sync(), 0)
+        self.server.height = 150
+        self.assertEqual(indexer.sync(), 30)
+        self.assertEqual(self.server.block_requests, requests_after_first_sync + 30)
+        history = indexer.get_transaction_history(ADDRESSES[0], 0, 100)
+        self.assertEqual([txn['hash'] for txn in history], self.expected_history(ADDRESSES[0], 0, 100))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# tests/test_transaction_pool.py
+
+import unittest
+from transaction import Transaction, TransactionPool
+
+class TestTransactionPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = TransactionPool(max_count=3)
+        self.low = Transaction(sender="Alice", recipient="Bob", amount=10, fee=1000)
+        self.mid = Transaction(sender="Alice", recipient="Carol", amount=20, fee=5000)
+        self.high = Transaction(sender="Dave", recipient="Bob", amount=30, fee=10000)
+        for tx in (self.low, self.mid, self.high):
+            self.assertTrue(self.pool.add_transaction(tx))
+
+    def test_duplicates_are_rejected(self):
+        self.assertFalse(self.pool.add_transaction(self.mid))
+        self.assertEqual(len(self.pool), 3)
+
+    def test_select_orders_by_fee_without_removing(self):
+        self.assertEqual(self.pool.select_transactions(2), [self.high, self.mid])
+        self.assertEqual(len(self.pool), 3)
+        self.assertEqual(len(self.pool.get_transactions_by_sender("Alice")), 2)
+
+    def test_remove_included_transactions(self):
+        self.assertEqual(self.pool.remove_transactions([self.high, self.low.transaction_id]), 2)
+        self.assertEqual(self.pool.select_transactions(5), [self.mid])
+        self.assertEqual(self.pool.get_transactions_by_sender("Dave"), [])
+
+    def test_full_pool_evicts_cheapest(self):
+        richer = Transaction(sender="Erin", recipient="Bob", amount=40, fee=7000)
+        self.assertTrue(self.pool.add_transaction(richer))
+        self.assertNotIn(self.low.transaction_id, self.pool)
+        cheaper = Transaction(sender="Frank", recipient="Bob", amount=50, fee=100)
+        self.assertFalse(self.pool.add_transaction(cheaper))
+        self.assertEqual(len(self.pool), 3)
+
+    def test_nothing_is_evicted_when_the_new_transaction_still_would_not_fit(self):
+        pool = TransactionPool(max_bytes=sum(tx.size() for tx in (self.low, self.mid, self.high)))
+        for tx in (self.low, self.mid, self.high):
+            self.assertTrue(pool.add_transaction(tx))
+        # Only low and mid pay less; evicting both does not free enough bytes
+        large = Transaction(sender="X" * 300, recipient="Bob", amount=40, fee=7000)
+        self.assertFalse(pool.add_transaction(large))
+        self.assertEqual(len(pool), 3)
+        self.assertEqual(pool.select_transactions(3), [self.high, self.mid, self.low])
+
+    def test_timestamp_order(self):
+        pool = TransactionPool(order='timestamp')
+        for tx in (self.high, self.low):
+            pool.add_transaction(tx)
+        self.assertEqual(pool.select_transactions(1), [self.high])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,291 @@
+# tests/test_transaction_sender.py
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import rlp
+from eth_account import Account
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+import transaction_sender
+from config import Config
+from identity_management import IdentityManagement
+from token_management import TokenManagement
+from transaction_sender import ReceiptTracker, get_receipt_tracker
+from web3_provider import get_web3
+
+TOKEN_ABI = json.loads('[{"constant":true,"inputs":[{"name":"","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"payable":false,"stateMutability":"view","type":"function"},{"constant":false,"inputs":[{"name":"to","type":"address"},{"name":"amount","type":"uint256"}],"name":"mint","outputs":[],"payable":false,"stateMutability":"nonpayable","type":"function"},{"constant":false,"inputs":[{"name":"to","type":"address"},{"name":"amount","type":"uint256"}],"name":"transfer","outputs":[],"payable":false,"stateMutability":"nonpayable","type":"function"}]')
+TOKEN_ADDRESS = Web3.to_checksum_address('0x' + '12' * 20)
+CHAIN_ID = 1337
+REJECTED = '0x' + '66' * 20  # Transfers to this address are refused by the stand-in node
+
+class StandInChain(BaseHTTPRequestHandler):
+    """Minimal local EVM node: checks nonces of raw transactions and mines pooled ones on server.mine().
+
+    Token balances are derived from the address, and eth_call fails for REJECTED.
+    """
+
+    def rpc(self, method, params):
+        chain = self.server
+        if method == 'eth_chainId':
+            return hex(CHAIN_ID)
+        if method == 'eth_blockNumber':
+            return hex(len(chain.blocks) - 1)
+        if method == 'eth_getTransactionCount':
+            return hex(chain.pending_nonce(params[0].lower()) if params[1] == 'pending' else chain.nonces.get(params[0].lower(), 0))
+        if method == 'eth_sendRawTransaction':
+            raw = bytes.fromhex(params[0][2:])
+            sender = Account.recover_transaction(raw).lower()
+            nonce = int.from_bytes(rlp.decode(raw)[0], 'big')
+            txn_hash = Web3.to_hex(Web3.keccak(raw))
+            if REJECTED[2:] in rlp.decode(raw)[5].hex():
+                raise ValueError('insufficient funds for transfer')
+            if nonce < chain.nonces.get(sender, 0):
+                raise ValueError('nonce too low')
+            if nonce in chain.pool.setdefault(sender, {}):
+                raise ValueError('replacement transaction underpriced')
+            chain.pool[sender][nonce] = txn_hash
+            return txn_hash
+        if method == 'eth_getBlockByNumber':
+            number = int(params[0], 16)
+            return {'number': hex(number), 'hash': '0x%064x' % number, 'transactions': chain.blocks[number]}
+        if method == 'eth_getTransactionReceipt':
+            return chain.receipts.get(params[0])
+        if method == 'eth_call':
+            address = params[0]['data'][-40:]
+            if address == REJECTED[2:]:
+                raise ValueError('execution reverted')
+            return '0x%064x' % int(address[-4:], 16)
+        raise ValueError(f"Unsupported method {method}")
+
+    def answer(self, request):
+        with self.server.lock:
+            self.server.calls[request['method']] += 1
+            try:
+                reply = {'result': self.rpc(request['method'], request['params'])}
+            except ValueError as e:
+                reply = {'error': {'code': -32000, 'message': str(e)}}
+        return dict(reply, jsonrpc='2.0', id=request['id'])
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        reply = [self.answer(item) for item in request] if isinstance(request, list) else self.answer(request)
+        body = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class ChainServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInChain)
+        self.lock = threading.Lock()
+        self.nonces = {}
+        self.pool = {}
+        self.blocks = [[]]
+        self.receipts = {}
+        self.mined_nonces = []
+        self.calls = Counter()
+
+    def pending_nonce(self, sender):
+        nonce = self.nonces.get(sender, 0)
+        while nonce in self.pool.get(sender, {}):
+            nonce += 1
+        return nonce
+
+    def mine(self):
+        """Mine every pooled transaction whose nonce follows its sender's last mined one."""
+        with self.lock:
+            number = len(self.blocks)
+            block = []
+            for sender, pooled in self.pool.items():
+                nonce = self.nonces.get(sender, 0)
+                while nonce in pooled:
+                    txn_hash = pooled.pop(nonce)
+                    self.receipts[txn_hash] = {
+                        'transactionHash': txn_hash, 'transactionIndex': hex(len(block)), 'blockNumber': hex(number),
+                        'blockHash': '0x%064x' % number, 'from': sender, 'to': TOKEN_ADDRESS.lower(),
+                        'gasUsed': '0x5208', 'cumulativeGasUsed': '0x5208', 'effectiveGasPrice': '0x1',
+                        'contractAddress': None, 'logs': [], 'logsBloom': '0x' + '00' * 256, 'status': '0x1',
+                    }
+                    block.append(txn_hash)
+                    self.mined_nonces.append((sender, nonce))
+                    nonce += 1
+                self.nonces[sender] = nonce
+            self.blocks.append(block)
+
+class FlakyEth:
+    """Minimal stand-in for web3.eth whose node fails some calls and serves some receipts late."""
+
+    def __init__(self):
+        self.blocks = [[]]  # Transaction hashes (bytes) per block
+        self.receipts = {}
+        self.failures = 0  # block_number calls that fail before the node answers again
+        self.lagging = set()  # Hashes whose receipt the node does not return on the first lookup
+
+    @property
+    def block_number(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("node hiccup")
+        return len(self.blocks) - 1
+
+    def get_block(self, number):
+        return {'transactions': self.blocks[number]}
+
+    def get_transaction_receipt(self, txn_hash):
+        if txn_hash in self.lagging:
+            self.lagging.discard(txn_hash)
+            raise TransactionNotFound(txn_hash)
+        if txn_hash not in self.receipts:
+            raise TransactionNotFound(txn_hash)
+        return self.receipts[txn_hash]
+
+class TestReceiptTracker(unittest.TestCase):
+    def test_hashes_survive_failed_polls_and_late_receipts(self):
+        eth = FlakyEth()
+        tracker = ReceiptTracker(SimpleNamespace(eth=eth), poll_interval=0.01, timeout=5)
+
+        # Mined before it was tracked, so only the direct lookup after the failed polls can find it
+        early = '0x' + '01' * 32
+        eth.blocks.append([bytes.fromhex('01' * 32)])
+        eth.receipts[early] = {'status': 1}
+        eth.failures = 2
+        self.assertEqual(tracker.track(early).result(timeout=5)['status'], 1)
+
+        # Listed in a block before the node serves its receipt
+        late = '0x' + '02' * 32
+        future = tracker.track(late)
+        time.sleep(0.1)
+        eth.lagging.add(late)
+        eth.receipts[late] = {'status': 1}
+        eth.blocks.append([bytes.fromhex('02' * 32)])
+        self.assertEqual(future.result(timeout=5)['status'], 1)
+
+class TestTransactionSender(unittest.TestCase):
+    def setUp(self):
+        self.poll_interval = transaction_sender.RECEIPT_POLL_INTERVAL
+        self.retry_delay = Config.RPC_RETRY_DELAY
+        transaction_sender.RECEIPT_POLL_INTERVAL = 0.02
+        Config.RPC_RETRY_DELAY = 0.01
+        self.server = ChainServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.stop_mining = threading.Event()
+        threading.Thread(target=self.mine, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.account = Account.from_key('0x' + '42' * 32)
+        self.recipient = Web3.to_checksum_address('0x' + '34' * 20)
+
+    def tearDown(self):
+        transaction_sender.RECEIPT_POLL_INTERVAL = self.poll_interval
+        Config.RPC_RETRY_DELAY = self.retry_delay
+        self.stop_mining.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def mine(self):
+        while not self.stop_mining.wait(0.05):
+            self.server.mine()
+
+    def test_concurrent_transfers_use_consecutive_nonces(self):
+        token = TokenManagement(self.url, TOKEN_ADDRESS, TOKEN_ABI)
+        submit = lambda amount: token.submit_transfer(self.account.address, self.account.key, self.recipient, amount)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = list(executor.map(submit, range(40)))
+        receipts = [future.result(timeout=30) for future in futures]
+
+        self.assertTrue(all(receipt['status'] == 1 for receipt in receipts))
+        self.assertEqual(len({receipt['transactionHash'] for receipt in receipts}), 40)
+        self.assertEqual(self.server.mined_nonces, [(self.account.address.lower(), nonce) for nonce in range(40)])
+
+    def test_resyncs_after_an_outside_send(self):
+        token = TokenManagement(self.url, TOKEN_ADDRESS, TOKEN_ABI)
+        token.transfer_token(self.account.address, self.account.key, self.recipient, 1)
+
+        # Another process sends nonce 1 behind the manager's back
+        outside = self.account.sign_transaction({'nonce': 1, 'to': self.recipient, 'value': 0, 'gas': 21000,
+                                                 'gasPrice': 1, 'chainId': CHAIN_ID})
+        token.web3.eth.send_raw_transaction(outside.rawTransaction)
+
+        receipt = token.transfer_token(self.account.address, self.account.key, self.recipient, 2)
+        self.assertEqual(receipt['status'], 1)
+        self.assertEqual([nonce for _, nonce in self.server.mined_nonces], [0, 1, 2])
+
+    def test_get_balances_reports_failures_per_address(self):
+        token = TokenManagement(self.url, TOKEN_ADDRESS, TOKEN_ABI)
+        addresses = [Web3.to_checksum_address('0x%040x' % i) for i in range(1, 301)]
+        addresses[7] = Web3.to_checksum_address(REJECTED)
+        balances = token.get_balances(addresses)
+
+        self.assertEqual(len(balances), 300)
+        self.assertEqual(balances[0], (1, None))
+        self.assertEqual(balances[299], (300, None))
+        self.assertIsNone(balances[7][0])
+        self.assertIn('execution reverted', str(balances[7][1]))
+
+    def test_transfer_many_reports_partial_failures(self):
+        token = TokenManagement(self.url, TOKEN_ADDRESS, TOKEN_ABI)
+        transfers = [(self.recipient, amount) for amount in range(30)]
+        transfers[10] = (Web3.to_checksum_address(REJECTED), 10)
+        results = token.transfer_many(self.account.address, self.account.key, transfers)
+
+        self.assertEqual(len(results), 30)
+        self.assertIn('insufficient funds', str(results[10][1]))
+        self.assertTrue(all(receipt['status'] == 1 and error is None
+                            for i, (receipt, error) in enumerate(results) if i != 10))
+        # The rejected nonce was filled, so everything after it still got mined
+        self.assertEqual([nonce for _, nonce in self.server.mined_nonces], list(range(30)))
+
+        receipts = token.mint_many(self.account.address, self.account.key, [(self.recipient, 5)] * 5)
+        self.assertEqual([error for _, error in receipts], [None] * 5)
+
+    def test_shared_tracker_resolves_callbacks_and_awaits(self):
+        web3 = get_web3(self.url)
+        tracker = get_receipt_tracker(web3)
+        self.assertIs(get_receipt_tracker(web3), tracker)
+
+        hashes = []
+        for nonce in range(20):
+            signed = self.account.sign_transaction({'nonce': nonce, 'to': self.recipient, 'value': 0, 'gas': 21000,
+                                                    'gasPrice': 1, 'chainId': CHAIN_ID})
+            hashes.append(web3.eth.send_raw_transaction(signed.rawTransaction))
+        mined = []
+        called = threading.Semaphore(0)
+
+        def callback(future):
+            mined.append(future.result()['status'])
+            called.release()
+
+        for txn_hash in hashes:
+            tracker.track(txn_hash, callback)
+        receipt = asyncio.run(tracker.wait(hashes[-1]))
+
+        self.assertEqual(receipt['transactionHash'], hashes[-1])
+        for _ in hashes:
+            self.assertTrue(called.acquire(timeout=10))
+        self.assertEqual(mined, [1] * 20)
+        self.assertLessEqual(self.server.calls['eth_getTransactionReceipt'], 40)  # At most twice per transaction
+
+    def test_create_identity_waits_on_the_tracker(self):
+        abi = json.loads('[{"constant":false,"inputs":[{"name":"identityData","type":"string"}],"name":"createIdentity","outputs":[],"payable":false,"stateMutability":"nonpayable","type":"function"}]')
+        identities = IdentityManagement(self.url, TOKEN_ADDRESS, abi)
+        receipt = identities.create_identity(self.account.address, self.account.key, "alice")
+        self.assertEqual(receipt['status'], 1)
+
+    def test_tracker_times_out_unmined_transactions(self):
+        tracker = ReceiptTracker(get_web3(self.url), poll_interval=0.01, timeout=0.1)
+        with self.assertRaises(TimeExhausted):
+            tracker.track('0x' + 'ab' * 32).result(timeout=5)
+
+if __name__ == '__main__':
+    unittest.main()
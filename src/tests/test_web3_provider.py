@@ -0,0 +1,101 @@
+# tests/test_web3_provider.py
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from transaction_manager import TransactionManager
+from web3_provider import ProviderRegistry, get_session, get_web3
+
+class CountingRPC(BaseHTTPRequestHandler):
+    """Answers every JSON-RPC call with block number 0x2a (or server.status) and counts connections and requests."""
+
+    protocol_version = 'HTTP/1.1'  # Keep connections alive between requests
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.requests += 1
+        body = json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': '0x2a'}).encode()
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class TestWeb3Provider(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), CountingRPC)
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.requests = 0
+        self.server.status = 200
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_one_instance_and_session_per_endpoint(self):
+        registry = ProviderRegistry()
+        web3 = registry.get_web3(self.url)
+        self.assertIs(registry.get_web3(self.url), web3)
+        self.assertIs(web3.provider.session, registry.get_session(self.url))
+        self.assertIsNot(registry.get_web3(self.url + '/other'), web3)
+        self.assertEqual(self.server.requests, 0)  # Nothing is sent until the instance is used
+        registry.close()
+
+    def test_objects_share_pooled_connections(self):
+        managers = [TransactionManager(self.url) for _ in range(20)]
+        self.assertTrue(all(manager.web3 is get_web3(self.url) for manager in managers))
+        self.assertIs(managers[0].fetcher.session, get_session(self.url))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            numbers = list(executor.map(lambda manager: manager.web3.eth.block_number, managers * 10))
+        self.assertEqual(numbers, [42] * 200)
+        self.assertEqual(self.server.requests, 200)
+        self.assertLessEqual(self.server.connections, 4)
+
+    def test_health_check_is_lazy_and_cached(self):
+        registry = ProviderRegistry(health_check_interval=60)
+        registry.get_web3(self.url)
+        self.assertEqual(self.server.requests, 0)
+        self.assertTrue(registry.is_connected(self.url))
+        self.assertTrue(registry.is_connected(self.url))
+        self.assertEqual(self.server.requests, 1)
+
+        registry.health_check_interval = 0
+        self.assertTrue(registry.is_connected(self.url))
+        self.assertEqual(self.server.requests, 2)
+
+        self.server.status = 503
+        self.assertFalse(registry.is_connected(self.url))
+        registry.close()
+
+    def test_other_packages_share_the_flat_module(self):
+        # Without piOpenChain on PYTHONPATH, as when running from the repository root
+        code = ("import sys\n"
+                "from src.blockchain.piCryptoConnect import pi_crypto_connect\n"
+                "import transaction_manager, web3_provider\n"
+                "assert pi_crypto_connect.get_web3 is transaction_manager.get_web3 is web3_provider.get_web3\n"
+                "assert [name for name in sys.modules if name.endswith('web3_provider')] == ['web3_provider']\n")
+        root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+        env = {key: value for key, value in os.environ.items() if key != 'PYTHONPATH'}
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()